@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+K8sQuest Auto-Validation
+Re-validates a level in the background whenever an object it cares about changes
+"""
+
+import os
+import select
+import sys
+import threading
+import time
+
+import yaml
+
+try:
+    from visualizer.informer import NamespaceInformer
+    from visualizer.snapshot import KIND_TO_KEY, SNAPSHOT_KINDS
+except ImportError:
+    try:
+        from informer import NamespaceInformer
+        from snapshot import KIND_TO_KEY, SNAPSHOT_KINDS
+    except ImportError:
+        NamespaceInformer = None
+        KIND_TO_KEY, SNAPSHOT_KINDS = {}, {}
+
+AUTO_VALIDATE_ENABLED = os.environ.get("K8SQUEST_AUTO_VALIDATE", "off").lower() == "on"
+
+# Quiet time after the last change before validating, so a burst of events
+# from one `kubectl apply` leads to one run
+DEBOUNCE_SECONDS = 0.3
+
+# How often a waiting prompt checks whether the level was solved
+PROMPT_POLL_SECONDS = 0.1
+
+# Kinds whose changes decide most levels even when no file names them
+ALWAYS_WATCHED = ("pods",)
+
+# How often to re-validate anyway when the fix may be in a kind the informer
+# cannot watch (PodDisruptionBudget, Role, ResourceQuota, ...)
+POLL_UNWATCHED_SECONDS = 15.0
+
+
+def mentioned_kinds(level_path):
+    """Kinds named by a level's manifests and validate.yaml"""
+    kinds = set()
+    for name in ("broken.yaml", "solution.yaml"):
+        try:
+            with open(level_path / name) as f:
+                documents = list(yaml.safe_load_all(f))
+        except (OSError, yaml.YAMLError):
+            continue
+        kinds.update(doc.get("kind") for doc in documents if isinstance(doc, dict))
+    try:
+        with open(level_path / "validate.yaml") as f:
+            checks = (yaml.safe_load(f) or {}).get("checks") or []
+        kinds.update("Endpoints" if c.get("check") == "endpoints" else c.get("kind")
+                     for c in checks if isinstance(c, dict))
+    except (OSError, yaml.YAMLError, AttributeError):
+        pass
+    kinds.discard(None)
+    return kinds
+
+
+def level_kinds(level_path):
+    """State keys (pods, services, ...) of the kinds a level's files mention"""
+    kinds = mentioned_kinds(level_path)
+    keys = {KIND_TO_KEY[kind] for kind in kinds if kind in KIND_TO_KEY}
+    if "Service" in kinds:
+        keys.add("endpoints")
+    return keys | set(ALWAYS_WATCHED) if keys else set(SNAPSHOT_KINDS)
+
+
+def unwatched_kinds(level_path):
+    """Kinds a level mentions whose changes the informer cannot see"""
+    return sorted(kind for kind in mentioned_kinds(level_path) if kind not in KIND_TO_KEY and kind != "Namespace")
+
+
+class AutoValidator:
+    """Runs ``check`` whenever the watched kinds change, until it passes
+
+    Changes come from a NamespaceInformer. Every notification is reduced to
+    the names and resourceVersions of the watched kinds, so changes to other
+    objects in the namespace are ignored. Bursts are debounced and one
+    worker thread runs the checks, so only one validation is ever in flight.
+    Changes made while a check runs are its own (validate.sh may create and
+    delete a test pod), so they are ignored: once the check's events have
+    settled the fingerprint is taken again as the new baseline.
+
+    ``check`` returns ``(passed, show)``; the passing pair is kept in
+    ``result`` and ``solved`` is set. With ``poll_interval`` the checks
+    also run that long after the last run, for fixes the informer misses.
+    """
+
+    def __init__(self, check, keys, informer_factory=None, debounce=DEBOUNCE_SECONDS, poll_interval=None):
+        self.check = check
+        self.keys = sorted(keys)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.informer_factory = informer_factory or (
+            lambda on_change: NamespaceInformer(on_change=on_change)
+        )
+        self.solved = threading.Event()
+        self.result = None
+        self.runs = 0
+        self.informer = None
+
+        self._fingerprint = None
+        self._due = None
+        self._checking = False
+        self._changed = threading.Condition()
+        self._stopped = False
+        self._worker = None
+
+    def start(self):
+        self.informer = self.informer_factory(self.notify)
+        self._worker = threading.Thread(target=self._run, name="auto-validate", daemon=True)
+        self._worker.start()
+        self.informer.start()
+        return self
+
+    def stop(self):
+        with self._changed:
+            self._stopped = True
+            self._changed.notify()
+        if self.informer is not None:
+            self.informer.stop()
+        if self._worker is not None:
+            self._worker.join(timeout=2)
+
+    def fingerprint(self):
+        store = self.informer.store
+        return tuple(
+            tuple(sorted((o["metadata"].get("name"), o["metadata"].get("resourceVersion"))
+                         for o in store.items(key)))
+            for key in self.keys
+        )
+
+    def notify(self):
+        """Informer callback: schedule a run if a watched object changed"""
+        if not self.informer.synced:
+            return
+        fingerprint = self.fingerprint()
+        with self._changed:
+            if self._checking:
+                return  # the check's own changes
+            if self._fingerprint is None:
+                self._fingerprint = fingerprint  # the state the level was deployed in
+                return
+            if fingerprint == self._fingerprint:
+                return
+            self._fingerprint = fingerprint
+            self._due = time.monotonic() + self.debounce
+            self._changed.notify()
+
+    def _run(self):
+        while True:
+            with self._changed:
+                if self.poll_interval is not None and self._due is None:
+                    self._due = time.monotonic() + self.poll_interval
+                while not self._stopped and self._due is None:
+                    self._changed.wait()
+                # Later changes push the deadline back
+                while not self._stopped and self._due is not None and time.monotonic() < self._due:
+                    self._changed.wait(self._due - time.monotonic())
+                if self._stopped:
+                    return
+                self._due = None
+                self._checking = True
+
+            self.runs += 1
+            try:
+                passed, show = self.check()
+            except Exception:
+                passed, show = False, None  # a failed run is retried on the next change
+            if passed:
+                self.result = (passed, show)
+                self.solved.set()
+                return
+            self._rebaseline()
+
+    def _rebaseline(self):
+        """Wait for the events the check caused, then take them as the unchanged state"""
+        with self._changed:
+            deadline = time.monotonic() + self.debounce
+            while not self._stopped and time.monotonic() < deadline:
+                self._changed.wait(deadline - time.monotonic())
+            self._fingerprint = self.fingerprint()
+            self._due = None
+            self._checking = False
+
+
+def prompt_action(message, choices, default, solved):
+    """Ask for one of ``choices`` like rich's Prompt.ask, returning "solved" once ``solved`` is set
+
+    Waits on stdin with select(), so it only works on a POSIX terminal;
+    elsewhere the caller should use Prompt.ask.
+    """
+    from rich.console import Console
+    console = Console()
+    while True:
+        console.print(f"{message} [magenta][{'/'.join(choices)}][/magenta] "
+                      f"[cyan bold]({default})[/cyan bold]: ", end="")
+        sys.stdout.flush()
+        while True:
+            if solved.is_set():
+                console.print()
+                return "solved"
+            readable, _, _ = select.select([sys.stdin], [], [], PROMPT_POLL_SECONDS)
+            if readable:
+                break
+        line = sys.stdin.readline()
+        if not line:
+            raise EOFError
+        answer = line.strip() or default
+        if answer in choices:
+            return answer
+        console.print("[prompt.invalid.choice]Please select one of the available options")
+
+
+def can_prompt_in_background():
+    """True when stdin is a terminal select() can wait on"""
+    try:
+        return os.name == "posix" and sys.stdin.isatty()
+    except (AttributeError, ValueError):
+        return False
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+K8sQuest Level Catalog
+One index of every world and level, built by a single walk of worlds/ and cached on disk
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+import yaml
+
+try:
+    from engine.images import level_images
+except ImportError:
+    from images import level_images
+
+WORLDS_DIR = Path(__file__).parent.parent / "worlds"
+
+# Written next to the worlds directory it indexes
+CACHE_NAME = "catalog.json"
+
+# Bumped whenever the layout of the index changes, so old caches are rebuilt
+CATALOG_VERSION = 1
+
+# Titles and difficulty of each world, which no file in worlds/ records
+WORLD_INFO = {
+    "world-1-basics": ("Core Kubernetes Basics", "Beginner"),
+    "world-2-deployments": ("Deployments & Scaling", "Intermediate"),
+    "world-3-networking": ("Networking & Services", "Intermediate"),
+    "world-4-storage": ("Storage & Stateful Apps", "Advanced"),
+    "world-5-security": ("Security & Production Ops", "Advanced"),
+}
+
+
+def natural_key(name):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+def level_dirs(worlds_dir):
+    """(world, level directories) in play order; levels are directories holding a mission.yaml"""
+    worlds = []
+    for world in sorted((e for e in os.scandir(worlds_dir) if e.is_dir()), key=lambda e: natural_key(e.name)):
+        levels = [e for e in os.scandir(world.path) if e.is_dir() and e.name.startswith("level-")
+                  and os.path.exists(os.path.join(e.path, "mission.yaml"))]
+        if levels:
+            worlds.append((world.name, sorted(levels, key=lambda e: natural_key(e.name))))
+    return worlds
+
+
+def signature(worlds_dir=WORLDS_DIR):
+    """Hash of the name, size and mtime of every level file; changes whenever a level is edited"""
+    digest = hashlib.sha256(str(CATALOG_VERSION).encode())
+    for world, levels in level_dirs(worlds_dir):
+        for level in levels:
+            for entry in sorted(os.scandir(level.path), key=lambda e: e.name):
+                if entry.is_file():
+                    stat = entry.stat()
+                    digest.update(f"{world}/{level.name}/{entry.name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def describe_level(world, path):
+    """Index entry for one level directory"""
+    files = sorted(p for p in path.iterdir() if p.is_file())
+    digest = hashlib.sha256()
+    for file in files:
+        digest.update(file.name.encode() + b"\0" + file.read_bytes() + b"\0")
+    names = {file.name for file in files}
+    with open(path / "mission.yaml") as f:
+        mission = yaml.safe_load(f) or {}
+    return {
+        "id": f"{world}/{path.name}",
+        "world": world,
+        "name": path.name,
+        "number": int(natural_key(path.name)[1]),
+        "mission": mission,
+        "xp": int(mission.get("xp", 0)),
+        "hints": sum(1 for i in range(1, 4) if f"hint-{i}.txt" in names),
+        "debrief": "debrief.md" in names,
+        "solution": "solution.yaml" in names,
+        "validator": "yaml" if "validate.yaml" in names else ("script" if "validate.sh" in names else None),
+        "diagram": "diagram.yaml" in names,
+        "images": level_images(path),
+        "hash": digest.hexdigest(),
+    }
+
+
+def build_index(worlds_dir=WORLDS_DIR, stamp=None):
+    """Walk worlds/ once and describe every world and level"""
+    worlds, levels = [], []
+    for number, (world, entries) in enumerate(level_dirs(worlds_dir), 1):
+        described = [describe_level(world, Path(entry.path)) for entry in entries]
+        title, difficulty = WORLD_INFO.get(world, (world.split("-", 2)[-1].replace("-", " ").title(), "Unknown"))
+        worlds.append({
+            "name": world,
+            "number": number,
+            "title": title,
+            "difficulty": difficulty,
+            "levels": [level["id"] for level in described],
+            "xp": sum(level["xp"] for level in described),
+        })
+        levels += described
+    return {
+        "version": CATALOG_VERSION,
+        "signature": stamp or signature(worlds_dir),
+        "worlds": worlds,
+        "levels": levels,
+    }
+
+
+class Catalog:
+    """Read-only view of the index: worlds and levels in play order, with totals"""
+
+    def __init__(self, index, worlds_dir=WORLDS_DIR):
+        self.index = index
+        self.worlds_dir = Path(worlds_dir)
+        self.worlds = index["worlds"]
+        self.levels = index["levels"]
+        self._by_name = {}
+        for level in self.levels:
+            self._by_name[level["id"]] = level
+            self._by_name.setdefault(level["name"], level)
+        self._worlds = {world["name"]: world for world in self.worlds}
+
+    @property
+    def level_count(self):
+        return len(self.levels)
+
+    @property
+    def total_xp(self):
+        return sum(level["xp"] for level in self.levels)
+
+    def level(self, name):
+        """Entry for a level id (world/level), directory name or path; None if unknown"""
+        if isinstance(name, Path):
+            name = f"{name.parent.name}/{name.name}"
+        return self._by_name.get(name)
+
+    def world(self, name):
+        return self._worlds.get(name)
+
+    def world_levels(self, world):
+        """Entries of one world's levels, in play order"""
+        if world not in self._worlds:
+            return []
+        return [self._by_name[level_id] for level_id in self._worlds[world]["levels"]]
+
+    def path(self, level):
+        return self.worlds_dir / level["world"] / level["name"]
+
+    def next_level(self, name):
+        """The level after ``name``, crossing into the next world; None after the last"""
+        level = self.level(name)
+        if level is None:
+            return None
+        index = self.levels.index(level)
+        return self.levels[index + 1] if index + 1 < len(self.levels) else None
+
+    def world_of(self, number):
+        """World entry holding the level with this number"""
+        for level in self.levels:
+            if level["number"] == number:
+                return self._worlds[level["world"]]
+        return None
+
+    def image_manifest(self):
+        """{"world/level": [images]} for every level"""
+        return {level["id"]: level["images"] for level in self.levels}
+
+
+_loaded = {}
+
+
+def load_catalog(worlds_dir=WORLDS_DIR, cache_file=None):
+    """The catalog, from the cache file when its signature still matches worlds/
+
+    A stale or unreadable cache is rebuilt and written back; a read-only
+    checkout just skips the write.
+    """
+    cache_file = cache_file or Path(worlds_dir).parent / CACHE_NAME
+    stamp = signature(worlds_dir)
+    key = (str(worlds_dir), str(cache_file))
+    cached = _loaded.get(key)
+    if cached is not None and cached.index["signature"] == stamp:
+        return cached
+
+    index = None
+    try:
+        with open(cache_file) as f:
+            index = json.load(f)
+        if index.get("version") != CATALOG_VERSION or index.get("signature") != stamp:
+            index = None
+    except (OSError, ValueError):
+        index = None
+
+    if index is None:
+        index = build_index(worlds_dir, stamp)
+        try:
+            temporary = Path(f"{cache_file}.{os.getpid()}.tmp")
+            temporary.write_text(json.dumps(index, indent=1))
+            os.replace(temporary, cache_file)
+        except OSError:
+            pass
+
+    catalog = Catalog(index, worlds_dir)
+    _loaded[key] = catalog
+    return catalog
+
+
+def main():
+    """Summarize the catalog; --images prints each level's images, --images --all the unique ones"""
+    catalog = load_catalog()
+    args = sys.argv[1:]
+    if "--images" in args:
+        manifest = catalog.image_manifest()
+        if "--all" in args:
+            print("\n".join(sorted({image for images in manifest.values() for image in images})))
+        else:
+            print(yaml.safe_dump(manifest, sort_keys=False), end="")
+        return
+    for world in catalog.worlds:
+        print(f"{world['name']}: {len(world['levels'])} levels, {world['xp']} XP ({world['title']})")
+    print(f"total: {catalog.level_count} levels, {catalog.total_xp} XP")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,49 +8,49 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
-def generate_certificate(world_num, player_name, total_xp):
+try:
+    from engine.catalog import load_catalog
+except ImportError:
+    from catalog import load_catalog
+
+# Hand-written skill lists; other worlds list their missions instead
+WORLD_SKILLS = {
+    1: [
+        "Debug CrashLoopBackOff errors",
+        "Fix ImagePullBackOff issues",
+        "Resolve Pending pod problems",
+        "Work with label selectors",
+        "Debug port mismatches",
+        "Manage multi-container pods",
+        "Navigate container logs",
+        "Understand init containers",
+        "Work with namespaces",
+        "Handle resource quotas"
+    ],
+    2: [
+        "Rollback failed deployments",
+        "Configure liveness probes",
+        "Configure readiness probes",
+        "Set up HorizontalPodAutoscaler",
+        "Optimize rollout strategies",
+        "Work with PodDisruptionBudgets",
+        "Implement blue-green deployments",
+        "Implement canary deployments",
+        "Choose StatefulSet vs Deployment",
+        "Understand ReplicaSet management"
+    ]
+}
+
+def generate_certificate(world_num, player_name, total_xp, catalog=None):
     """Generate a completion certificate for a world"""
-    
-    world_info = {
-        1: {
-            "name": "Core Kubernetes Basics",
-            "levels": 10,
-            "skills": [
-                "Debug CrashLoopBackOff errors",
-                "Fix ImagePullBackOff issues",
-                "Resolve Pending pod problems",
-                "Work with label selectors",
-                "Debug port mismatches",
-                "Manage multi-container pods",
-                "Navigate container logs",
-                "Understand init containers",
-                "Work with namespaces",
-                "Handle resource quotas"
-            ]
-        },
-        2: {
-            "name": "Deployments & Scaling",
-            "levels": 10,
-            "skills": [
-                "Rollback failed deployments",
-                "Configure liveness probes",
-                "Configure readiness probes",
-                "Set up HorizontalPodAutoscaler",
-                "Optimize rollout strategies",
-                "Work with PodDisruptionBudgets",
-                "Implement blue-green deployments",
-                "Implement canary deployments",
-                "Choose StatefulSet vs Deployment",
-                "Understand ReplicaSet management"
-            ]
-        }
-    }
-    
-    if world_num not in world_info:
+    catalog = catalog or load_catalog()
+    world = next((w for w in catalog.worlds if w["number"] == world_num), None)
+    if world is None:
         print(f"❌ World {world_num} not found")
         return
     
-    world = world_info[world_num]
+    levels = catalog.world_levels(world["name"])
+    skills = WORLD_SKILLS.get(world_num) or [level["mission"].get("name", level["name"]) for level in levels]
     date = datetime.now().strftime("%B %d, %Y")
     
     certificate = f"""
@@ -61,25 +61,24 @@ def generate_certificate(world_num, player_name, total_xp):
 ╚═══════════════════════════════════════════════════════════════╝
 
 Player: {player_name}
-World: {world_info[world_num]['name']}
+World: {world['title']}
 Date: {date}
 
 📊 Achievement:
-   • {world['levels']} Levels Completed
+   • {len(levels)} Levels Completed
    • {total_xp} XP Earned
 
 🎯 Skills Mastered:
 """
     
-    for i, skill in enumerate(world['skills'], 1):
+    for i, skill in enumerate(skills, 1):
         certificate += f"   {i:2d}. {skill}\n"
     
     certificate += "\n"
     
-    if world_num == 1:
-        certificate += "Next: World 2 - Deployments & Scaling\n"
-    elif world_num == 2:
-        certificate += "Next: World 3 - Networking & Services\n"
+    next_world = next((w for w in catalog.worlds if w["number"] == world_num + 1), None)
+    if next_world:
+        certificate += f"Next: World {next_world['number']} - {next_world['title']}\n"
     
     certificate += """
 🎮 Keep learning, keep fixing Kubernetes! 🎮
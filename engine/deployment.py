@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+K8sQuest Background Deploy
+Deploys a level on a worker thread while the intro and briefing screens are shown
+"""
+
+import threading
+import time
+
+POLL_INTERVAL = 0.1
+
+
+class BackgroundDeploy:
+    """Runs ``deploy(report)`` on a daemon thread and lets the game wait for it later
+
+    ``deploy`` calls ``report(description)`` as it finishes each of its
+    ``steps``; ``step`` and ``description`` are what a progress bar shows
+    if the player gets to the level before the cluster does. Warnings are
+    collected rather than printed, since the worker must not write over
+    the screen the player is reading.
+    """
+
+    def __init__(self, deploy, steps=3):
+        self.deploy = deploy
+        self.steps = steps
+        self.step = 0
+        self.description = "Setting up namespace..."
+        self.warnings = []
+        self.error = None
+        self.started = None
+        self.elapsed = None
+        self._done = threading.Event()
+        self._worker = None
+
+    def start(self):
+        self.started = time.monotonic()
+        self._worker = threading.Thread(target=self._run, name="level-deploy", daemon=True)
+        self._worker.start()
+        return self
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def report(self, description, advance=1):
+        """Called by the deploy function after each step"""
+        self.step = min(self.step + advance, self.steps)
+        self.description = description
+
+    def warn(self, message):
+        self.warnings.append(message)
+
+    def wait(self, timeout=None, on_progress=None):
+        """Block until the deploy is finished; re-raises its exception
+
+        ``on_progress(step, description)`` is called every poll while
+        waiting, and not at all when the deploy was already done.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._done.wait(POLL_INTERVAL if on_progress else timeout):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError("level deploy still running")
+            if on_progress:
+                on_progress(self.step, self.description)
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        try:
+            self.deploy(self)
+        except Exception as e:  # re-raised in the thread that waits
+            self.error = e
+        finally:
+            self.elapsed = time.monotonic() - self.started
+            self._done.set()
@@ -10,6 +10,7 @@ import json
 import yaml
 import subprocess
 import time
+import threading
 import argparse
 import webbrowser
 from pathlib import Path
@@ -23,7 +24,9 @@ from rich.text import Text
 from rich.markdown import Markdown
 from rich.live import Live
 from rich.align import Align
+from rich.console import Group
 from rich import box
+from contextlib import nullcontext
 from datetime import datetime
 
 # Import retro UI components
@@ -71,47 +74,146 @@ except ImportError:
         SAFETY_ENABLED = False
         print("⚠️  Warning: Safety guards module not found. Running without protection.")
 
+# Import declarative validation (levels without validate.yaml use validate.sh)
+try:
+    from engine.validation import ValidationError, validate_level
+    DECLARATIVE_VALIDATION_ENABLED = True
+except ImportError:
+    try:
+        from validation import ValidationError, validate_level
+        DECLARATIVE_VALIDATION_ENABLED = True
+    except ImportError:
+        DECLARATIVE_VALIDATION_ENABLED = False
+
+# Import the kubectl shim that answers validate.sh reads from one snapshot
+try:
+    from engine.kubectl_shim import KubectlShim
+except ImportError:
+    try:
+        from kubectl_shim import KubectlShim
+    except ImportError:
+        KubectlShim = None
+
+# Import the warm namespace pool (opt-in; levels otherwise use k8squest itself)
+try:
+    from engine.namespace_pool import (
+        NAMESPACE, NAMESPACE_POOL_ENABLED, NamespacePool, localize_text, rebind_manifest
+    )
+except ImportError:
+    try:
+        from namespace_pool import (
+            NAMESPACE, NAMESPACE_POOL_ENABLED, NamespacePool, localize_text, rebind_manifest
+        )
+    except ImportError:
+        NAMESPACE, NAMESPACE_POOL_ENABLED, NamespacePool = "k8squest", False, None
+        localize_text = lambda text, namespace: text
+
+# Import incremental level reset (undoes the player's changes without a new namespace)
+try:
+    from engine.reset import diff_reset, remember_deployed_state
+    INCREMENTAL_RESET_ENABLED = True
+except ImportError:
+    try:
+        from reset import diff_reset, remember_deployed_state
+        INCREMENTAL_RESET_ENABLED = True
+    except ImportError:
+        INCREMENTAL_RESET_ENABLED = False
+
+# Import the level catalog (every world and level, indexed once and cached)
+try:
+    from engine.catalog import load_catalog
+except ImportError:
+    from catalog import load_catalog
+
+# Import the background deploy worker (overlaps kubectl with the briefing screens)
+try:
+    from engine.deployment import BackgroundDeploy
+except ImportError:
+    from deployment import BackgroundDeploy
+
+# Import the progress store (journaled progress.json with per-attempt history)
+try:
+    from engine.progress_store import ProgressStore
+except ImportError:
+    from progress_store import ProgressStore
+
+# Import image pre-pull (caches the next level's images while the current one is played)
+try:
+    from engine.images import IMAGE_PREPULL_ENABLED, ImagePrepuller
+except ImportError:
+    try:
+        from images import IMAGE_PREPULL_ENABLED, ImagePrepuller
+    except ImportError:
+        IMAGE_PREPULL_ENABLED, ImagePrepuller = False, None
+
 # Import visualization server
 try:
     sys.path.insert(0, str(Path(__file__).parent.parent / "visualizer"))
     from server import VisualizationServer
+    from timeline import TIMELINES_ENABLED
     VISUALIZER_ENABLED = True
 except ImportError as e:
-    VISUALIZER_ENABLED = False
+    VISUALIZER_ENABLED = TIMELINES_ENABLED = False
     print(f"ℹ️  Visualization server not available: {e}")
 
+# Import the API server client (status checks fall back to kubectl without it)
+try:
+    from kube_client import ApiError, default_client
+    from snapshot import api_path
+    KUBE_CLIENT_ENABLED = True
+except ImportError:
+    KUBE_CLIENT_ENABLED = False
+
+# Import background auto-validation (watches the level's objects)
+try:
+    from engine.auto_validate import (
+        AUTO_VALIDATE_ENABLED, POLL_UNWATCHED_SECONDS, AutoValidator, NamespaceInformer,
+        can_prompt_in_background, level_kinds, prompt_action, unwatched_kinds
+    )
+except ImportError:
+    try:
+        from auto_validate import (
+            AUTO_VALIDATE_ENABLED, POLL_UNWATCHED_SECONDS, AutoValidator, NamespaceInformer,
+            can_prompt_in_background, level_kinds, prompt_action, unwatched_kinds
+        )
+    except ImportError:
+        AUTO_VALIDATE_ENABLED = False
+        NamespaceInformer = None
+
 console = Console()
 
 class K8sQuest:
-    def __init__(self, enable_visualizer=True):
+    def __init__(self, enable_visualizer=True, auto_validate=AUTO_VALIDATE_ENABLED,
+                 namespace_pool=NAMESPACE_POOL_ENABLED, prepull_images=IMAGE_PREPULL_ENABLED,
+                 record_timelines=TIMELINES_ENABLED):
         self.base_dir = Path(__file__).parent.parent
         self.progress_file = self.base_dir / "progress.json"
+        self.store = ProgressStore(self.progress_file)
         self.progress = self.load_progress()
+        self.catalog = load_catalog(self.base_dir / "worlds")
         self.current_mission = None
         self.visualizer = None
         self.enable_visualizer = enable_visualizer and VISUALIZER_ENABLED
+        self.record_timelines = record_timelines
+        self.auto_validate = auto_validate
+        self.validation_lock = threading.Lock()
+        # The namespace the current level lives in; a fresh pool namespace per level when enabled
+        self.namespace = NAMESPACE
+        self.namespace_pool = NamespacePool() if namespace_pool and NamespacePool else None
+        self.prepuller = ImagePrepuller() if prepull_images and ImagePrepuller else None
+        self.deployment = None
+        self.validator = None
         
     def load_progress(self):
-        """Load player progress from JSON file"""
-        if self.progress_file.exists():
-            with open(self.progress_file, 'r') as f:
-                progress = json.load(f)
-                # Ensure current_level exists for resume functionality
-                if "current_level" not in progress:
-                    progress["current_level"] = None
-                return progress
-        return {
-            "total_xp": 0,
-            "completed_levels": [],
-            "current_world": "world-1-basics",
-            "current_level": None,
-            "player_name": "Padawan"
-        }
+        """Load player progress from the snapshot and journal"""
+        progress = self.store.load()
+        # Attempt history stays in the store; see self.store.history()
+        progress.pop("history", None)
+        return progress
     
     def save_progress(self):
-        """Save player progress"""
-        with open(self.progress_file, 'w') as f:
-            json.dump(self.progress, indent=2, fp=f)
+        """Save player progress (journals only the fields that changed)"""
+        self.store.update(self.progress)
 
     def get_game_state(self):
         """Get current game state for visualization"""
@@ -121,7 +223,9 @@ class K8sQuest:
             'current_world': self.progress.get('current_world', 'world-1-basics'),
             'current_level': self.progress.get('current_level'),
             'player_name': self.progress.get('player_name', 'Padawan'),
-            'current_mission': self.current_mission.get('name', '') if self.current_mission else None
+            'current_mission': self.current_mission.get('name', '') if self.current_mission else None,
+            'total_levels': self.catalog.level_count,
+            'max_xp': self.catalog.total_xp
         }
 
     def start_visualizer(self, port=8080):
@@ -133,7 +237,9 @@ class K8sQuest:
             self.visualizer = VisualizationServer(
                 port=port,
                 game_state_callback=self.get_game_state,
-                verbose=False
+                verbose=False,
+                timeline_dir=self.base_dir / "timelines",
+                record_timelines=self.record_timelines
             )
             url = self.visualizer.start()
 
@@ -199,10 +305,10 @@ class K8sQuest:
         stats.add_column("Value", style="yellow bold")
         stats.add_row("🎮 PLAYER", self.progress["player_name"])
         stats.add_row("💎 TOTAL XP", str(self.progress["total_xp"]))
-        stats.add_row("⭐ LEVELS CLEARED", f"{len(self.progress['completed_levels'])}/50")
+        stats.add_row("⭐ LEVELS CLEARED", f"{len(self.progress['completed_levels'])}/{self.catalog.level_count}")
         
         # Calculate completion percentage
-        completion = (len(self.progress['completed_levels']) / 50) * 100
+        completion = (len(self.progress['completed_levels']) / max(self.catalog.level_count, 1)) * 100
         progress_bar = "█" * int(completion / 5) + "░" * (20 - int(completion / 5))
         stats.add_row("📊 PROGRESS", f"[{progress_bar}] {completion:.0f}%")
         
@@ -219,13 +325,17 @@ class K8sQuest:
         viz_status = "📊 ENABLED" if self.enable_visualizer else "⚙️  DISABLED"
         viz_color = "cyan" if self.enable_visualizer else "dim"
         stats.add_row("🌐 VISUAL MODE", f"[{viz_color}]{viz_status}[/{viz_color}]")
+
+        # Images of the level about to be played, pulled in the background
+        if self.prepuller:
+            stats.add_row("📦 IMAGE CACHE", f"[cyan]{self.prepuller.describe()}[/cyan]")
         
         console.print(Panel(stats, title="[bold yellow]⚡ PLAYER STATUS ⚡[/bold yellow]", border_style="yellow", box=box.HEAVY))
         
         # Show XP progress bar
         if RETRO_UI_ENABLED:
             console.print()
-            console.print(show_xp_bar(self.progress["total_xp"], 10200))
+            console.print(show_xp_bar(self.progress["total_xp"], self.catalog.total_xp))
         
         # Show safety reminder if enabled with gaming theme
         if SAFETY_ENABLED:
@@ -241,8 +351,22 @@ class K8sQuest:
             ))
         console.print()
     
+    def upcoming_level(self):
+        """The level play resumes at, for pre-pulling its images before it is chosen"""
+        levels = [self.catalog.path(level) for level in self.catalog.levels]
+        completed = self.progress["completed_levels"]
+        for i, level_path in enumerate(levels):
+            if level_path.name == self.progress.get("current_level"):
+                if level_path.name in completed:
+                    return levels[i + 1] if i + 1 < len(levels) else None
+                return level_path
+        return next((l for l in levels if l.name not in completed), None)
+
     def load_mission(self, level_path):
-        """Load mission metadata"""
+        """Load mission metadata, from the catalog when the level is indexed"""
+        level = self.catalog.level(level_path)
+        if level is not None:
+            return dict(level["mission"])
         mission_file = level_path / "mission.yaml"
         with open(mission_file, 'r') as f:
             return yaml.safe_load(f)
@@ -291,7 +415,7 @@ class K8sQuest:
         for i, hint_file in hints_available:
             if i <= hint_level:
                 with open(hint_file, 'r') as f:
-                    hint_content = f.read().strip()
+                    hint_content = localize_text(f.read().strip(), self.namespace)
                 
                 hint_style = "cyan" if i == 1 else ("yellow" if i == 2 else "green")
                 console.print(f"\n[bold {hint_style}]Hint {i}:[/bold {hint_style}] {hint_content}")
@@ -332,7 +456,7 @@ class K8sQuest:
             return
         
         with open(solution_file, 'r') as f:
-            solution_content = f.read()
+            solution_content = localize_text(f.read(), self.namespace)
         
         console.print(Panel(
             f"[cyan]{solution_content}[/cyan]",
@@ -366,7 +490,7 @@ class K8sQuest:
         hint_table.add_column("Hint", style="cyan")
         
         for hint in level_hints:
-            hint_table.add_row(hint)
+            hint_table.add_row(localize_text(hint, self.namespace))
         
         console.print(hint_table)
         console.print()
@@ -378,27 +502,34 @@ class K8sQuest:
                 self.show_solution_file(level_path)
                 console.print("[dim]💡 Tip: You can use this as a reference to fix the issue[/dim]\n")
     
+    def get_resource(self, key, name, namespace=None):
+        """Fetch one object as a dict, straight from the API server when possible"""
+        namespace = namespace or self.namespace
+        client = default_client() if KUBE_CLIENT_ENABLED else None
+        if client is not None:
+            try:
+                return client.get(f"{api_path(key, namespace)}/{name}")
+            except ApiError:
+                return None
+            except OSError:
+                pass  # API server unreachable directly; try kubectl
+        result = subprocess.run(
+            ["kubectl", "get", key, name, "-n", namespace, "-o", "json"],
+            capture_output=True,
+            text=True,
+            timeout=5
+        )
+        return json.loads(result.stdout) if result.returncode == 0 else None
+
     def get_resource_status(self, level_name):
         """Get current status of the Kubernetes resource"""
         try:
             if "pod" in level_name:
-                result = subprocess.run(
-                    ["kubectl", "get", "pod", "nginx-broken", "-n", "k8squest", 
-                     "-o", "jsonpath={.status.phase}"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                return result.stdout.strip() or "Unknown"
+                pod = self.get_resource("pods", "nginx-broken") or {}
+                return pod.get("status", {}).get("phase") or "Unknown"
             elif "deployment" in level_name:
-                result = subprocess.run(
-                    ["kubectl", "get", "deployment", "web", "-n", "k8squest",
-                     "-o", "jsonpath={.status.readyReplicas}"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                ready = result.stdout.strip() or "0"
+                deployment = self.get_resource("deployments", "web") or {}
+                ready = deployment.get("status", {}).get("readyReplicas") or 0
                 return f"{ready} replicas ready"
         except:
             return "Unknown"
@@ -406,9 +537,14 @@ class K8sQuest:
     
     def show_terminal_instructions(self, level_name):
         """Show clear instructions about opening another terminal"""
+        namespace_note = ""
+        if self.namespace != NAMESPACE:
+            namespace_note = (f"[bold cyan]🏷️  This level runs in namespace {self.namespace}[/bold cyan] "
+                              f"[dim](already your kubectl default; use -n {self.namespace})[/dim]\n\n")
         instructions = Panel(
             Text.from_markup(
                 "[bold yellow]📟 OPEN A NEW TERMINAL WINDOW[/bold yellow]\n\n"
+                f"{namespace_note}"
                 "[cyan]While this game is running:[/cyan]\n"
                 "1️⃣  Open a NEW terminal window/tab\n"
                 "2️⃣  Navigate to this directory\n"
@@ -505,7 +641,7 @@ Look for "2/2" ready replicas!
             """
         }
         
-        guide = guides.get(level_name, "No guide available for this level.")
+        guide = localize_text(guides.get(level_name, "No guide available for this level."), self.namespace)
         
         console.print(Panel(
             Markdown(guide),
@@ -517,43 +653,138 @@ Look for "2/2" ready replicas!
     
     def deploy_mission(self, level_path, level_name):
         """Deploy the broken Kubernetes resources"""
-        console.print("\n[yellow]🚀 Deploying mission environment...[/yellow]")
-        
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            BarColumn(),
-            console=console
-        ) as progress:
-            task = progress.add_task("Setting up namespace...", total=3)
-            
-            # Delete and recreate namespace
-            subprocess.run(
-                ["kubectl", "delete", "namespace", "k8squest", "--ignore-not-found"],
-                capture_output=True
-            )
-            progress.advance(task)
-            
-            subprocess.run(
-                ["kubectl", "create", "namespace", "k8squest"],
-                capture_output=True
-            )
-            progress.update(task, description="Deploying broken resources...")
-            progress.advance(task)
-            
-            # Apply broken config (without forcing namespace to respect YAML)
-            result = subprocess.run(
-                ["kubectl", "apply", "-f", str(level_path / "broken.yaml")],
-                capture_output=True,
-                text=True
-            )
-            # Log errors for debugging (optional)
-            if result.returncode != 0:
-                console.print(f"[dim red]Warning: {result.stderr}[/dim red]")
-            
-            progress.update(task, description="✅ Environment ready!")
-            progress.advance(task)
-        
+        self.start_deploy(level_path)
+        self.finish_deploy()
+
+    def start_deploy(self, level_path):
+        """Begin deploying the level in the background; finish_deploy() waits for it"""
+        self.deployment = BackgroundDeploy(lambda deployment: self.deploy_level(level_path, deployment)).start()
+
+    def finish_deploy(self):
+        """Wait for the background deploy, showing its progress only if it is still running"""
+        deployment = self.deployment
+        if not deployment.done:
+            console.print("\n[yellow]🚀 Deploying mission environment...[/yellow]")
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                BarColumn(),
+                console=console
+            ) as progress:
+                task = progress.add_task(deployment.description, total=deployment.steps)
+                deployment.wait(on_progress=lambda step, description: progress.update(
+                    task, completed=step, description=description))
+                progress.update(task, completed=deployment.steps, description=deployment.description)
+        else:
+            deployment.wait()
+            console.print(f"\n[dim]🚀 Mission environment deployed in the background "
+                          f"({deployment.elapsed:.1f}s)[/dim]")
+
+        for warning in deployment.warnings:
+            console.print(warning)
+        self.show_mission_deployed()
+
+    def deploy_level(self, level_path, deployment):
+        """Deploy the level on the background worker; prints nothing, reports through ``deployment``"""
+        if self.namespace_pool:
+            try:
+                self.deploy_to_pool(level_path, deployment)
+            except (RuntimeError, OSError, ValueError, subprocess.SubprocessError) as e:
+                deployment.warn(f"[yellow]Namespace pool unavailable ({e}); using {NAMESPACE}[/yellow]")
+                self.namespace_pool = None
+                self.bind_namespace(NAMESPACE)
+            else:
+                if INCREMENTAL_RESET_ENABLED:
+                    remember_deployed_state(level_path, self.namespace)
+                return
+
+        # Delete and recreate namespace
+        subprocess.run(
+            ["kubectl", "delete", "namespace", "k8squest", "--ignore-not-found"],
+            capture_output=True
+        )
+        deployment.report("Setting up namespace...")
+
+        subprocess.run(
+            ["kubectl", "create", "namespace", "k8squest"],
+            capture_output=True
+        )
+        deployment.report("Deploying broken resources...")
+
+        # Apply broken config (without forcing namespace to respect YAML)
+        result = subprocess.run(
+            ["kubectl", "apply", "-f", str(level_path / "broken.yaml")],
+            capture_output=True,
+            text=True
+        )
+        # Log errors for debugging (optional)
+        if result.returncode != 0:
+            deployment.warn(f"[dim red]Warning: {result.stderr}[/dim red]")
+
+        if INCREMENTAL_RESET_ENABLED:
+            remember_deployed_state(level_path, self.namespace)
+        deployment.report("✅ Environment ready!")
+
+    def reset_mission(self, level_path, level_name):
+        """Undo the player's changes, redeploying only when an incremental reset is impossible
+
+        Returns True when the level now lives in a different namespace (a
+        redeploy in pool mode), so whatever watches the old one must restart.
+        """
+        started = time.monotonic()
+        previous = self.namespace
+        plan = None
+        if INCREMENTAL_RESET_ENABLED:
+            try:
+                plan = diff_reset(level_path)
+            except (RuntimeError, OSError, ValueError, yaml.YAMLError, subprocess.SubprocessError) as e:
+                console.print(f"[dim]Incremental reset failed ({e}); redeploying the level[/dim]")
+        if plan is None:
+            self.deploy_mission(level_path, level_name)
+            return self.namespace != previous
+        console.print(f"\n[green]♻️  Level reset in {time.monotonic() - started:.1f}s: {plan.summary()}[/green]\n")
+        return False
+
+    def deploy_to_pool(self, level_path, deployment):
+        """Bind a warm namespace from the pool and apply the level into it
+
+        The previous level's namespace is deleted in the background, so nothing
+        here waits for a namespace to terminate.
+        """
+        deployment.report("Binding a fresh namespace...", advance=0)
+        namespace = self.namespace_pool.acquire()
+        self.bind_namespace(namespace)
+        deployment.report("Deploying broken resources...")
+
+        with open(level_path / "broken.yaml") as f:
+            manifest = f.read()
+        self.namespace_pool.configure(namespace, manifest)
+        manifest = rebind_manifest(manifest, namespace)
+        result = subprocess.run(
+            ["kubectl", "apply", "-f", "-"],
+            input=manifest,
+            capture_output=True,
+            text=True
+        )
+        if result.returncode != 0:
+            deployment.warn(f"[dim red]Warning: {result.stderr}[/dim red]")
+        deployment.report("✅ Environment ready!", advance=deployment.steps)
+
+        for name, stuck in self.namespace_pool.stuck.items():
+            holding = ", ".join(stuck["finalizers"] + stuck["reasons"]) or "unknown"
+            deployment.warn(f"[yellow]⚠️  Namespace {name} is stuck terminating (held by: {holding})[/yellow]")
+
+    def bind_namespace(self, namespace):
+        """Point kubectl's context, the visualizer and validation at ``namespace``"""
+        self.namespace = namespace
+        subprocess.run(
+            ["kubectl", "config", "set-context", "--current", f"--namespace={namespace}"],
+            capture_output=True
+        )
+        if self.visualizer:
+            self.visualizer.set_namespace(namespace)
+
+    def show_mission_deployed(self):
         console.print("\n")
         console.print(Panel(
             Text("🔴 MISSION DEPLOYED WITH BUGS! 🔴", style="bold red", justify="center") +
@@ -565,16 +796,104 @@ Look for "2/2" ready replicas!
         console.print()
     
     def validate_mission(self, level_path, level_name):
-        """Run validation script and show results"""
+        """Check the player's fix, declaratively when the level has a validate.yaml"""
         console.print("\n[yellow]🔍 Validating your solution...[/yellow]\n")
-        
-        validate_script = level_path / "validate.sh"
-        result = subprocess.run(
-            ["bash", str(validate_script)],
-            capture_output=True,
-            text=True
+        passed, show = self.run_validation(level_path)
+        show()
+        return passed
+
+    def run_validation(self, level_path):
+        """Validate without printing; returns (passed, show) where show() prints the results
+
+        Runs are serialized, so a manual validate never overlaps a background one.
+        """
+        with self.validation_lock:
+            checks_file = level_path / "validate.yaml"
+            note = None
+            if DECLARATIVE_VALIDATION_ENABLED and checks_file.exists():
+                try:
+                    report = validate_level(checks_file, namespace=self.namespace)
+                except (ValidationError, subprocess.SubprocessError, OSError, ValueError) as e:
+                    if not (level_path / "validate.sh").exists():
+                        return False, lambda: console.print(f"[red]❌ Could not validate: {e}[/red]")
+                    note = f"Declarative validation unavailable ({e}); running validate.sh"
+                else:
+                    return report.passed, lambda: self.show_validation_report(report)
+
+            result, calls = self.run_validation_script(level_path)
+            return result.returncode == 0, lambda: self.show_script_result(result, calls, note)
+
+    def show_validation_report(self, report):
+        """Show per-check results and timings of a declarative validation"""
+        table = Table(box=box.SIMPLE, show_header=True, header_style="bold cyan")
+        table.add_column("", width=2)
+        table.add_column("Check")
+        table.add_column("Result")
+        table.add_column("ms", justify="right", style="dim")
+        for result in report.results:
+            table.add_row(
+                "✅" if result.passed else "❌",
+                result.description,
+                Text(result.message, style="green" if result.passed else "red"),
+                f"{result.duration_ms:.1f}"
+            )
+        summary = Text(
+            f"\n{len(report.results)} checks, {report.snapshot.kubectl_calls} kubectl call(s), "
+            f"snapshot {report.snapshot.duration_ms:.0f} ms, total {report.duration_ms:.0f} ms",
+            style="dim"
         )
-        
+
+        if report.passed:
+            console.print(Panel(
+                Group(
+                    Text("✅ MISSION COMPLETE! ✅", style="bold green", justify="center"),
+                    table,
+                    Text(report.success_message or "", style="green"),
+                    summary
+                ),
+                border_style="green",
+                box=box.DOUBLE
+            ))
+            return True
+
+        hints = [f"💡 {r.hint}" for r in report.failures if r.hint]
+        console.print(Panel(
+            Group(
+                Text("❌ Not quite there yet...", style="bold red", justify="center"),
+                table,
+                Text("\n".join(hints), style="yellow"),
+                summary
+            ),
+            border_style="red",
+            box=box.ROUNDED
+        ))
+        return False
+
+    def run_validation_script(self, level_path):
+        """Run the level's validate.sh; returns its result and the kubectl shim's call counts"""
+        validate_script = level_path / "validate.sh"
+        calls = None
+        with (KubectlShim(namespace=self.namespace) if KubectlShim else nullcontext()) as shim:
+            result = subprocess.run(
+                ["bash", str(validate_script)],
+                capture_output=True,
+                text=True,
+                env=shim.env if shim and shim.env else dict(os.environ, K8SQUEST_NAMESPACE=self.namespace)
+            )
+            if shim and shim.env:
+                calls = shim.stats()
+        return result, calls
+
+    def show_script_result(self, result, calls=None, note=None):
+        """Show validate.sh output"""
+        if note:
+            console.print(f"[dim]{note}[/dim]\n")
+        if calls:
+            console.print(
+                f"[dim]kubectl: {calls['hit'] + calls['pass']} calls, {calls['hit']} answered "
+                f"from {calls['snapshot']} snapshot(s)[/dim]"
+            )
+
         if result.returncode == 0:
             # Success!
             console.print(Panel(
@@ -594,11 +913,39 @@ Look for "2/2" ready replicas!
             ))
             return False
     
+    def start_auto_validation(self, level_path):
+        """Watch the level's objects and validate in the background; None when unavailable"""
+        if not self.auto_validate:
+            return None
+        if NamespaceInformer is None or not can_prompt_in_background():
+            console.print("[dim]Auto-validate needs the visualizer modules and an interactive terminal; "
+                          "type 'validate' instead.[/dim]")
+            return None
+
+        client = default_client() if KUBE_CLIENT_ENABLED else None
+        unwatched = unwatched_kinds(level_path)
+        validator = AutoValidator(
+            lambda: self.run_validation(level_path),
+            level_kinds(level_path),
+            informer_factory=lambda on_change: NamespaceInformer(namespace=self.namespace, on_change=on_change,
+                                                                 client=client),
+            poll_interval=POLL_UNWATCHED_SECONDS if unwatched else None
+        ).start()
+        if unwatched:
+            console.print(f"[dim]👀 Auto-validate is on, but it cannot watch {', '.join(unwatched)}: "
+                          f"it re-checks every {POLL_UNWATCHED_SECONDS:.0f}s, or type 'validate'.[/dim]")
+        else:
+            console.print("[dim]👀 Auto-validate is on: the level completes as soon as your fix lands.[/dim]")
+        return validator
+
     def play_level(self, level_path, level_name):
         """Play a single level with retro gaming UI"""
         mission = self.load_mission(level_path)
         self.current_mission = mission  # Set for visualizer
 
+        # Deploy while the intro and briefing are on screen
+        self.start_deploy(level_path)
+
         # Show retro level start screen
         if RETRO_UI_ENABLED:
             level_num = int(level_name.split('-')[1]) if 'level-' in level_name else 0
@@ -640,8 +987,16 @@ Look for "2/2" ready replicas!
         
         self.show_mission_briefing(mission, level_name)
         
-        # Deploy the mission
-        self.deploy_mission(level_path, level_name)
+        # The cluster is needed from here on
+        self.finish_deploy()
+
+        self.store.record_start(level_name)
+        self.level_started = time.monotonic()
+
+        # While this level is played, cache the next one's images
+        upcoming = self.catalog.next_level(level_path)
+        if self.prepuller and upcoming:
+            self.prepuller.prepull(self.catalog.path(upcoming), upcoming["images"])
         
         # Show terminal instructions prominently
         self.show_terminal_instructions(level_name)
@@ -650,7 +1005,17 @@ Look for "2/2" ready replicas!
         current_hint_level = 1
         console.print()
         self.show_progressive_hints(level_path, current_hint_level)
-        
+
+        self.validator = self.start_auto_validation(level_path)
+        try:
+            return self.level_loop(level_path, level_name, mission, current_hint_level, self.validator)
+        finally:
+            if self.validator:
+                self.validator.stop()
+                self.validator = None
+
+    def level_loop(self, level_path, level_name, mission, current_hint_level, validator=None):
+        """Menu loop of one level; returns True to move on, False when the player stops"""
         # Interactive loop with retro UI
         attempts = 0
         while True:
@@ -668,17 +1033,18 @@ Look for "2/2" ready replicas!
                 console.print("  [cyan]hints[/cyan]     - 💡 Helpful kubectl commands")
                 console.print("  [cyan]solution[/cyan]  - 📄 View the solution.yaml file")
                 console.print("  [cyan]validate[/cyan]  - ✅ Test if you've fixed it")
+                console.print("  [cyan]reset[/cyan]     - ♻️  Put the level back to its broken state")
                 console.print("  [cyan]skip[/cyan]      - ⏭️  Skip this level")
                 console.print("  [cyan]quit[/cyan]      - 🚪 Exit the game")
                 console.print("="*60)
             
             console.print()
             
-            action = Prompt.ask(
-                "⚔️  Choose your action",
-                choices=["check", "guide", "hints", "solution", "validate", "skip", "quit"],
-                default="check"
-            )
+            choices = ["check", "guide", "hints", "solution", "validate", "reset", "skip", "quit"]
+            if validator:
+                action = prompt_action("⚔️  Choose your action", choices, "check", validator.solved)
+            else:
+                action = Prompt.ask("⚔️  Choose your action", choices=choices, default="check")
             
             if action == "check":
                 # Real-time status monitoring
@@ -695,7 +1061,9 @@ Look for "2/2" ready replicas!
                 if RETRO_UI_ENABLED:
                     show_power_up_notification("hint")
                 console.print()
-                self.show_progressive_hints(level_path, current_hint_level)
+                shown = self.show_progressive_hints(level_path, current_hint_level)
+                if shown:
+                    self.store.record_hint(level_name, shown)
             
             elif action == "solution":
                 console.print("\n[yellow]📄 Showing solution file...[/yellow]\n")
@@ -704,11 +1072,20 @@ Look for "2/2" ready replicas!
                 self.show_solution_file(level_path)
                 console.print("[dim]💡 Use this as reference to fix the broken configuration[/dim]\n")
                 
-            elif action == "validate":
+            elif action in ("validate", "solved"):
                 attempts += 1
                 console.print(f"\n[dim]⚔️  ATTEMPT #{attempts}[/dim]")
-                
-                if self.validate_mission(level_path, level_name):
+
+                if action == "solved":
+                    console.print("\n[bold green]⚡ Fix detected![/bold green]\n")
+                    passed, show = validator.result
+                    show()
+                else:
+                    passed = self.validate_mission(level_path, level_name)
+                self.store.record_attempt(level_name, passed, time.monotonic() - self.level_started,
+                                          min(current_hint_level, 3))
+
+                if passed:
                     # Victory with retro UI!
                     if RETRO_UI_ENABLED:
                         xp_earned = mission["xp"]
@@ -736,13 +1113,14 @@ Look for "2/2" ready replicas!
                     # Check for milestones
                     if RETRO_UI_ENABLED:
                         completed_count = len(self.progress["completed_levels"])
+                        level_count = self.catalog.level_count
                         if completed_count == 10:
                             celebrate_milestone("world_complete")
-                        elif completed_count == 25:
+                        elif completed_count == level_count // 2:
                             celebrate_milestone("halfway")
-                        elif completed_count == 49:
+                        elif completed_count == level_count - 1:
                             celebrate_milestone("final_boss")
-                        elif completed_count == 50:
+                        elif completed_count == level_count:
                             show_game_complete()
                     
                     # Show debrief - THE LEARNING MOMENT!
@@ -766,6 +1144,13 @@ Look for "2/2" ready replicas!
                     if not Confirm.ask("Try again?", default=True):
                         return False
                         
+            elif action == "reset":
+                if Confirm.ask("Undo your changes and restore the broken level?", default=False):
+                    if self.reset_mission(level_path, level_name) and validator:
+                        # The running validator still watches the retired namespace
+                        validator.stop()
+                        validator = self.validator = self.start_auto_validation(level_path)
+
             elif action == "skip":
                 if Confirm.ask("Skip this level? (No XP will be awarded)", default=False):
                     return True
@@ -776,20 +1161,12 @@ Look for "2/2" ready replicas!
     
     def play_world(self, world_name):
         """Play all levels in a world"""
-        world_path = self.base_dir / "worlds" / world_name
-        
-        if not world_path.exists():
+        if self.catalog.world(world_name) is None:
             console.print(f"[red]Error: World '{world_name}' not found[/red]")
             return False
         
-        # Get all level directories with natural sorting (level-1, level-2, ..., level-10)
-        import re
-        def natural_sort_key(path):
-            """Extract numbers from path for natural sorting"""
-            parts = re.split(r'(\d+)', path.name)
-            return [int(part) if part.isdigit() else part for part in parts]
-        
-        levels = sorted([d for d in world_path.iterdir() if d.is_dir()], key=natural_sort_key)
+        # Levels in play order (level-1, level-2, ..., level-10), from the catalog
+        levels = [self.catalog.path(level) for level in self.catalog.world_levels(world_name)]
         
         # Find where to resume from
         start_index = 0
@@ -835,15 +1212,30 @@ def main():
                         help='Disable visualization server for a more realistic terminal-only experience')
     parser.add_argument('--viz-port', type=int, default=8080,
                         help='Port for visualization server (default: 8080)')
+    parser.add_argument('--auto-validate', action='store_true', default=AUTO_VALIDATE_ENABLED,
+                        help='Validate automatically whenever the level\'s resources change')
+    parser.add_argument('--namespace-pool', action='store_true', default=NAMESPACE_POOL_ENABLED,
+                        help='Deploy each level into a pre-created namespace instead of recreating k8squest')
+    parser.add_argument('--no-prepull', action='store_true', default=not IMAGE_PREPULL_ENABLED,
+                        help='Do not pre-pull the next level\'s container images in the background')
+    parser.add_argument('--no-timelines', action='store_true', default=not TIMELINES_ENABLED,
+                        help='Do not record cluster timelines for replay in the visualizer')
     args = parser.parse_args()
 
     # Create game instance
-    game = K8sQuest(enable_visualizer=not args.no_viz)
+    game = K8sQuest(enable_visualizer=not args.no_viz, auto_validate=args.auto_validate,
+                    namespace_pool=args.namespace_pool, prepull_images=not args.no_prepull,
+                    record_timelines=not args.no_timelines)
 
     # Store for cleanup
     import __main__
     __main__.game_instance = game
 
+    if game.namespace_pool:
+        game.namespace_pool.start()
+    if game.prepuller:
+        game.prepuller.prepull(game.upcoming_level())
+
     # First time setup - get player name
     if game.progress["player_name"] == "Padawan":
         console.print()
@@ -859,14 +1251,8 @@ def main():
         game.start_visualizer(port=args.viz_port)
         time.sleep(1)
     
-    # All 5 worlds in order
-    all_worlds = [
-        "world-1-basics",
-        "world-2-deployments",
-        "world-3-networking",
-        "world-4-storage",
-        "world-5-security"
-    ]
+    # All worlds in order
+    all_worlds = [world["name"] for world in game.catalog.worlds]
     
     # Check if there's progress to resume
     has_progress = len(game.progress["completed_levels"]) > 0 or game.progress.get("current_level")
@@ -935,3 +1321,4 @@ if __name__ == "__main__":
         # Clean up visualizer if it was started
         if hasattr(__main__, 'game_instance') and __main__.game_instance:
             __main__.game_instance.stop_visualizer()
+            __main__.game_instance.store.close()
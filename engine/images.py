@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+K8sQuest Image Pre-pull
+Caches the next level's container images on every node while the current level is played
+"""
+
+import json
+import os
+import secrets
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+import yaml
+
+try:
+    from engine.namespace_pool import run_kubectl
+except ImportError:
+    from namespace_pool import run_kubectl
+
+IMAGE_PREPULL_ENABLED = os.environ.get("K8SQUEST_IMAGE_PREPULL", "on").lower() != "off"
+
+# Pre-pull pods live outside the player's namespace so they never show up in a level
+PREPULL_NAMESPACE = "k8squest-images"
+PREPULL_LABEL = "k8squest.io/prepull"
+
+POLL_INTERVAL = 2.0
+
+# Give up on images still pulling after this long; the level's own pods keep trying
+PULL_TIMEOUT = 600
+
+CONTAINER_KEYS = ("initContainers", "containers", "ephemeralContainers")
+
+# Waiting reasons that mean the image cannot be pulled (levels break some images on purpose)
+PULL_FAILURES = {"ErrImagePull", "ImagePullBackOff", "InvalidImageName", "ErrImageNeverPull",
+                 "RegistryUnavailable"}
+
+QUEUED, PULLING, CACHED, FAILED = "queued", "pulling", "cached", "failed"
+
+
+def manifest_images(text):
+    """Every container image a manifest refers to, in order of appearance"""
+    images = []
+
+    def walk(value):
+        if isinstance(value, dict):
+            for key, child in value.items():
+                if key in CONTAINER_KEYS and isinstance(child, list):
+                    images.extend(c["image"] for c in child if isinstance(c, dict) and c.get("image"))
+                walk(child)
+        elif isinstance(value, list):
+            for child in value:
+                walk(child)
+
+    for doc in yaml.safe_load_all(text):
+        walk(doc)
+    return list(dict.fromkeys(images))
+
+
+def level_images(level_path):
+    """Images of a level's broken.yaml and solution.yaml"""
+    images = []
+    for name in ("broken.yaml", "solution.yaml"):
+        try:
+            images += manifest_images((Path(level_path) / name).read_text())
+        except (OSError, yaml.YAMLError):
+            continue
+    return list(dict.fromkeys(images))
+
+
+def prepull_pod(image, node, namespace=PREPULL_NAMESPACE):
+    """A pod pinned to ``node`` that exists only to make the kubelet pull ``image``
+
+    The container runs `true`; images without it fail to start, but by
+    then the image has been pulled, which is all that matters.
+    """
+    return {
+        "apiVersion": "v1",
+        "kind": "Pod",
+        "metadata": {"name": f"prepull-{secrets.token_hex(4)}", "namespace": namespace,
+                     "labels": {PREPULL_LABEL: "true"}, "annotations": {PREPULL_LABEL + "-image": image}},
+        "spec": {
+            "nodeName": node,
+            "restartPolicy": "Never",
+            "terminationGracePeriodSeconds": 0,
+            "tolerations": [{"operator": "Exists"}],
+            "containers": [{
+                "name": "pull",
+                "image": image,
+                "imagePullPolicy": "IfNotPresent",
+                "command": ["true"],
+                "resources": {"requests": {"cpu": "1m", "memory": "4Mi"}},
+            }],
+        },
+    }
+
+
+def pull_state(pod):
+    """PULLING, CACHED or FAILED for one pre-pull pod"""
+    statuses = pod.get("status", {}).get("containerStatuses") or []
+    if not statuses:
+        return FAILED if pod.get("status", {}).get("phase") == "Failed" else PULLING
+    state = statuses[0].get("state") or {}
+    if "running" in state or "terminated" in state or statuses[0].get("imageID"):
+        return CACHED
+    if (state.get("waiting") or {}).get("reason") in PULL_FAILURES:
+        return FAILED
+    return PULLING
+
+
+class ImagePrepuller:
+    """Pulls the images of queued levels onto every schedulable node, one level at a time
+
+    A single daemon thread works through the queue so pre-pulling never
+    competes with itself. ``status`` maps each image to queued, pulling,
+    cached or failed.
+    """
+
+    def __init__(self, runner=run_kubectl, namespace=PREPULL_NAMESPACE, poll_interval=POLL_INTERVAL,
+                 timeout=PULL_TIMEOUT):
+        self.runner = runner
+        self.namespace = namespace
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.status = {}
+        self.level = None
+        self.error = None
+        self._queue = []
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def prepull(self, level_path, images=None):
+        """Queue a level's images (read from its manifests unless given); returns immediately"""
+        if level_path is None:
+            return
+        images = level_images(level_path) if images is None else list(images)
+        with self._lock:
+            self._queue.append((Path(level_path).name, images))
+            for image in images:
+                if self.status.get(image) not in (CACHED, FAILED):
+                    self.status[image] = QUEUED
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="image-prepull", daemon=True)
+                self._worker.start()
+
+    def progress(self):
+        """(level, cached, total) for the level being pre-pulled most recently"""
+        with self._lock:
+            level, images = self.level or (None, [])
+            return level, sum(self.status.get(i) == CACHED for i in images), len(images)
+
+    def describe(self):
+        """One line for the welcome screen"""
+        level, cached, total = self.progress()
+        if self.error:
+            return f"unavailable ({self.error})"
+        if level is None:
+            return "idle"
+        with self._lock:
+            failed = sum(self.status.get(i) == FAILED for i in self.level[1])
+        text = f"{level}: {cached}/{total} cached"
+        return text + (f", {failed} unavailable" if failed else "")
+
+    def wait(self, timeout=None):
+        """Wait for the queue to drain (used by tests)"""
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._queue:
+                    return
+                level, images = self._queue.pop(0)
+                self.level = (level, images)
+                pending = [i for i in images if self.status.get(i) not in (CACHED, FAILED)]
+            try:
+                if pending:
+                    self.pull(pending)
+                self.error = None
+            except (RuntimeError, OSError, ValueError, subprocess.SubprocessError) as e:
+                self.error = str(e).splitlines()[0] if str(e) else type(e).__name__
+                with self._lock:
+                    for image in pending:
+                        if self.status.get(image) != CACHED:
+                            self.status[image] = QUEUED
+
+    def _kubectl(self, args, input=None):
+        result = self.runner(args, input=input)
+        if result.returncode != 0 and "AlreadyExists" not in result.stderr:
+            raise RuntimeError(result.stderr.strip() or f"kubectl {' '.join(args)} failed")
+        return result.stdout
+
+    def nodes(self):
+        """Names of the Ready, schedulable nodes"""
+        nodes = json.loads(self._kubectl(["get", "nodes", "-o", "json"])).get("items", [])
+        return [
+            node["metadata"]["name"] for node in nodes
+            if not node.get("spec", {}).get("unschedulable")
+            and any(c.get("type") == "Ready" and c.get("status") == "True"
+                    for c in node.get("status", {}).get("conditions") or [])
+        ]
+
+    def pull(self, images):
+        """Pull ``images`` onto every node and wait until each is cached or has failed"""
+        self._kubectl(["create", "namespace", self.namespace])
+        nodes = self.nodes()
+        pods = [prepull_pod(image, node, self.namespace) for image in images for node in nodes]
+        with self._lock:
+            for image in images:
+                self.status[image] = PULLING
+        self._kubectl(["create", "-f", "-"], input=json.dumps({"apiVersion": "v1", "kind": "List", "items": pods}))
+
+        names = {pod["metadata"]["name"]: pod["spec"]["containers"][0]["image"] for pod in pods}
+        deadline = time.monotonic() + self.timeout
+        try:
+            while True:
+                listed = json.loads(self._kubectl(
+                    ["get", "pods", "-n", self.namespace, "-l", PREPULL_LABEL, "-o", "json"]
+                )).get("items", [])
+                states = {}
+                for pod in listed:
+                    image = names.get(pod["metadata"]["name"])
+                    if image is not None:
+                        states.setdefault(image, []).append(pull_state(pod))
+                with self._lock:
+                    for image in images:
+                        found = states.get(image, [])
+                        if FAILED in found:
+                            self.status[image] = FAILED
+                        elif len(found) == len(nodes) and all(s == CACHED for s in found):
+                            self.status[image] = CACHED
+                    done = all(self.status[image] in (CACHED, FAILED) for image in images)
+                if done or time.monotonic() >= deadline:
+                    return
+                time.sleep(self.poll_interval)
+        finally:
+            self.runner(["delete", "pods", "-n", self.namespace, "--wait=false", "--ignore-not-found"]
+                        + list(names))
+
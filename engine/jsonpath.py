@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+K8sQuest JSONPath
+The subset of kubectl's JSONPath templates used by level validators
+"""
+
+import json
+import re
+
+_SEGMENT = re.compile(
+    r"""\.\.(?P<recurse>[A-Za-z0-9_$-]+)"""
+    r"""|\.(?P<field>[A-Za-z0-9_$-]+|\*)"""
+    r"""|\[(?:'(?P<quoted>[^']*)'|"(?P<dquoted>[^"]*)"|(?P<slice>-?\d*:-?\d*)|(?P<index>-?\d+)"""
+    r"""|(?P<star>\*)|\?\((?P<filter>[^)]*)\))\]"""
+)
+_FILTER = re.compile(
+    r"""^@((?:\.[A-Za-z0-9_-]+)+)\s*(?:(==|!=|<=|>=|<|>)\s*(?:"([^"]*)"|'([^']*)'|(\S+)))?$"""
+)
+_LITERAL = re.compile(r'^"((?:[^"\\]|\\.)*)"$')
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\"}
+
+
+class JSONPathError(ValueError):
+    """A JSONPath expression outside the supported subset"""
+
+
+def parse(expression):
+    """Split a `{.a.b[0].c}` expression into segments; raises JSONPathError"""
+    path = expression.strip()
+    if path.startswith("{") and path.endswith("}"):
+        path = path[1:-1].strip()
+    if path[:1] in ("$", "@"):
+        path = path[1:]
+    segments, position = [], 0
+    while position < len(path):
+        match = _SEGMENT.match(path, position)
+        if not match:
+            raise JSONPathError(f"unsupported jsonpath {expression!r} at {path[position:]!r}")
+        groups = match.groupdict()
+        if groups["recurse"] is not None:
+            segments.append(("recurse", groups["recurse"]))
+        elif groups["field"] is not None:
+            segments.append(("all", None) if groups["field"] == "*" else ("key", groups["field"]))
+        elif groups["quoted"] is not None or groups["dquoted"] is not None:
+            segments.append(("key", groups["quoted"] if groups["quoted"] is not None else groups["dquoted"]))
+        elif groups["slice"] is not None:
+            start, _, end = groups["slice"].partition(":")
+            segments.append(("slice", (int(start) if start else None, int(end) if end else None)))
+        elif groups["index"] is not None:
+            segments.append(("index", int(groups["index"])))
+        elif groups["star"] is not None:
+            segments.append(("all", None))
+        else:
+            condition = _FILTER.match(groups["filter"].strip())
+            if not condition:
+                raise JSONPathError(f"unsupported jsonpath filter in {expression!r}")
+            fields, operator, *values = condition.groups()
+            value = next((v for v in values if v is not None), None)
+            segments.append(("filter", (fields.strip(".").split("."), operator, value)))
+        position = match.end()
+    return segments
+
+
+def _compare(actual, operator, expected):
+    if operator in ("==", "!="):
+        return (format_value(actual) == expected) == (operator == "==")
+    try:
+        left, right = float(actual), float(expected)
+    except (TypeError, ValueError):
+        return False
+    return {"<": left < right, ">": left > right, "<=": left <= right, ">=": left >= right}[operator]
+
+
+def _descendants(value, key):
+    if isinstance(value, dict):
+        if key in value:
+            yield value[key]
+        children = value.values()
+    elif isinstance(value, list):
+        children = value
+    else:
+        return
+    for child in children:
+        yield from _descendants(child, key)
+
+
+def evaluate(obj, segments):
+    """Every value the segments select from obj, in document order"""
+    values = [obj]
+    for kind, arg in segments:
+        selected = []
+        for value in values:
+            if kind == "key":
+                if isinstance(value, dict) and arg in value:
+                    selected.append(value[arg])
+            elif kind == "index":
+                if isinstance(value, list) and -len(value) <= arg < len(value):
+                    selected.append(value[arg])
+            elif kind == "slice":
+                if isinstance(value, list):
+                    selected.extend(value[arg[0]:arg[1]])
+            elif kind == "all":
+                if isinstance(value, list):
+                    selected.extend(value)
+                elif isinstance(value, dict):
+                    selected.extend(value.values())
+            elif kind == "recurse":
+                selected.extend(_descendants(value, arg))
+            elif isinstance(value, list):
+                fields, operator, expected = arg
+                for item in value:
+                    actual = evaluate(item, [("key", f) for f in fields])
+                    if operator is None:
+                        matched = bool(actual)
+                    else:
+                        matched = bool(actual) and _compare(actual[0], operator, expected)
+                    if matched:
+                        selected.append(item)
+        values = selected
+    return values
+
+
+def format_value(value):
+    """Render a value the way `kubectl -o jsonpath` prints it"""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return str(value)
+
+
+def _split_template(template):
+    """Literal text and the contents of each {...}, skipping braces inside quotes"""
+    parts, text, i = [], [], 0
+    while i < len(template):
+        if template[i] != "{":
+            text.append(template[i])
+            i += 1
+            continue
+        if text:
+            parts.append(("text", "".join(text)))
+            text = []
+        j, quote = i + 1, None
+        while j < len(template) and (quote or template[j] != "}"):
+            if quote and template[j] == "\\":
+                j += 1
+            elif template[j] in "\"'":
+                quote = None if quote == template[j] else quote or template[j]
+            j += 1
+        if j >= len(template):
+            raise JSONPathError(f"unclosed action in {template!r}")
+        parts.append(("action", template[i + 1:j].strip()))
+        i = j + 1
+    if text:
+        parts.append(("text", "".join(text)))
+    return parts
+
+
+def compile_template(template):
+    """Parse a kubectl `-o jsonpath=` template into nodes for render()"""
+    root, stack = [], []
+    nodes = root
+    for kind, value in _split_template(template):
+        if kind == "text":
+            nodes.append(("text", value))
+        elif value == "end":
+            if not stack:
+                raise JSONPathError(f"{{end}} without {{range}} in {template!r}")
+            nodes = stack.pop()
+        elif value.startswith("range "):
+            body = []
+            nodes.append(("range", parse(value[len("range "):]), body))
+            stack.append(nodes)
+            nodes = body
+        elif _LITERAL.match(value):
+            literal = re.sub(r"\\(.)", lambda m: _ESCAPES.get(m.group(1), m.group(0)),
+                             _LITERAL.match(value).group(1))
+            nodes.append(("text", literal))
+        else:
+            nodes.append(("expr", parse(value)))
+    if stack:
+        raise JSONPathError(f"{{range}} without {{end}} in {template!r}")
+    return root
+
+
+def render(nodes, obj):
+    """Output of compiled template nodes applied to obj"""
+    out = []
+    for node in nodes:
+        if node[0] == "text":
+            out.append(node[1])
+        elif node[0] == "expr":
+            out.append(" ".join(format_value(v) for v in evaluate(obj, node[1])))
+        else:
+            for item in evaluate(obj, node[1]):
+                out.append(render(node[2], item))
+    return "".join(out)
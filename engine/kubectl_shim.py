@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+K8sQuest kubectl Shim
+Answers a validate.sh script's read-only kubectl calls from one snapshot of the namespace
+"""
+
+import json
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    from engine.jsonpath import JSONPathError, compile_template, render
+    from engine.namespace_pool import rebind_manifest
+except ImportError:
+    from jsonpath import JSONPathError, compile_template, render
+    from namespace_pool import rebind_manifest
+
+# Environment read by the shim when it runs as kubectl
+REAL_KUBECTL_ENV = "K8SQUEST_REAL_KUBECTL"
+SHIM_DIR_ENV = "K8SQUEST_SHIM_DIR"
+NAMESPACE_ENV = "K8SQUEST_NAMESPACE"
+
+# The namespace level scripts are written against
+NAMESPACE = "k8squest"
+
+SHIM_ENABLED = os.environ.get("K8SQUEST_KUBECTL_SHIM", "on").lower() != "off"
+
+KUBECTL_TIMEOUT = 10
+
+# A snapshot older than this is taken again, so scripts that poll still see changes
+SNAPSHOT_TTL = 2.0
+
+# kind -> (resource, API group, short names, namespaced)
+KINDS = {
+    "Pod": ("pods", "", ("po",), True),
+    "Service": ("services", "", ("svc",), True),
+    "Endpoints": ("endpoints", "", ("ep",), True),
+    "ConfigMap": ("configmaps", "", ("cm",), True),
+    "Secret": ("secrets", "", (), True),
+    "ServiceAccount": ("serviceaccounts", "", ("sa",), True),
+    "PersistentVolumeClaim": ("persistentvolumeclaims", "", ("pvc",), True),
+    "ResourceQuota": ("resourcequotas", "", ("quota",), True),
+    "LimitRange": ("limitranges", "", ("limits",), True),
+    "Deployment": ("deployments", "apps", ("deploy",), True),
+    "ReplicaSet": ("replicasets", "apps", ("rs",), True),
+    "StatefulSet": ("statefulsets", "apps", ("sts",), True),
+    "DaemonSet": ("daemonsets", "apps", ("ds",), True),
+    "Job": ("jobs", "batch", (), True),
+    "CronJob": ("cronjobs", "batch", ("cj",), True),
+    "HorizontalPodAutoscaler": ("horizontalpodautoscalers", "autoscaling", ("hpa",), True),
+    "PodDisruptionBudget": ("poddisruptionbudgets", "policy", ("pdb",), True),
+    "NetworkPolicy": ("networkpolicies", "networking.k8s.io", ("netpol",), True),
+    "Ingress": ("ingresses", "networking.k8s.io", ("ing",), True),
+    "Role": ("roles", "rbac.authorization.k8s.io", (), True),
+    "RoleBinding": ("rolebindings", "rbac.authorization.k8s.io", (), True),
+    "Namespace": ("namespaces", "", ("ns",), False),
+    "Node": ("nodes", "", ("no",), False),
+    "PersistentVolume": ("persistentvolumes", "", ("pv",), False),
+    "StorageClass": ("storageclasses", "storage.k8s.io", ("sc",), False),
+    "PriorityClass": ("priorityclasses", "scheduling.k8s.io", ("pc",), False),
+    "ClusterRole": ("clusterroles", "rbac.authorization.k8s.io", (), False),
+    "ClusterRoleBinding": ("clusterrolebindings", "rbac.authorization.k8s.io", (), False),
+}
+
+# Every name kubectl accepts for a kind (singular, plural, short) -> kind
+RESOURCE_NAMES = {}
+for _kind, (_resource, _group, _short, _) in KINDS.items():
+    for _name in (_kind.lower(), _resource) + _short:
+        RESOURCE_NAMES[_name] = _kind
+
+# Commands that never change cluster state; anything else drops the snapshot
+READ_ONLY_COMMANDS = {
+    "get", "describe", "logs", "exec", "top", "version", "explain", "api-resources",
+    "api-versions", "cluster-info", "config", "auth", "events",
+}
+
+
+def full_resource(kind):
+    """`deployments.apps`-style name, unambiguous in a multi-kind get"""
+    resource, group, _, _ = KINDS[kind]
+    return f"{resource}.{group}" if group else resource
+
+
+def resolve_kind(name):
+    """Kind for a kubectl resource argument like `deploy`, `pods` or `deployments.apps`, or None"""
+    base, _, group = name.lower().partition(".")
+    kind = RESOURCE_NAMES.get(base)
+    if kind is None or (group and not group.startswith(KINDS[kind][1] or "\0")):
+        return None
+    return kind
+
+
+def rebind_namespace(args, namespace):
+    """kubectl arguments with `-n k8squest` (in any spelling) and *.k8squest.svc names pointing at ``namespace``"""
+    if namespace == NAMESPACE:
+        return list(args)
+    rebound, after_flag = [], False
+    for arg in args:
+        flag, eq, value = arg.partition("=")
+        if after_flag and arg == NAMESPACE:
+            arg = namespace
+        elif flag in ("-n", "--namespace") and eq and value == NAMESPACE:
+            arg = f"{flag}={namespace}"
+        elif arg == f"-n{NAMESPACE}":
+            arg = f"-n{namespace}"
+        else:
+            arg = arg.replace(f".{NAMESPACE}.svc", f".{namespace}.svc")
+        after_flag = arg in ("-n", "--namespace")
+        rebound.append(arg)
+    return rebound
+
+
+def reads_manifest_from_stdin(args):
+    """Whether kubectl would read a manifest from stdin (`-f -` in any spelling)"""
+    for i, arg in enumerate(args):
+        if arg in ("-f", "--filename") and i + 1 < len(args) and args[i + 1] == "-":
+            return True
+        if arg in ("-f=-", "--filename=-"):
+            return True
+    return False
+
+
+class GetRequest:
+    """A `kubectl get` the snapshot can answer"""
+
+    def __init__(self, kind, names, namespace, output, selector, ignore_not_found):
+        self.kind = kind
+        self.names = names
+        self.namespace = namespace
+        self.output = output
+        self.selector = selector
+        self.ignore_not_found = ignore_not_found
+
+
+def parse_get(args, stdout_discarded=False):
+    """GetRequest for a read-only get, or None when real kubectl should handle it"""
+    positional, namespace, output, selector, ignore_not_found = [], None, None, None, False
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        flag, eq, value = arg.partition("=")
+        if flag in ("-n", "--namespace", "-o", "--output", "-l", "--selector"):
+            if not eq:
+                if i + 1 >= len(args):
+                    return None
+                value = args[i + 1]
+                i += 1
+            if flag in ("-n", "--namespace"):
+                namespace = value
+            elif flag in ("-o", "--output"):
+                output = value
+            else:
+                selector = value
+        elif arg.startswith("-n") and len(arg) > 2 and not arg.startswith("--"):
+            namespace = arg[2:]
+        elif arg.startswith("-o") and len(arg) > 2 and not arg.startswith("--"):
+            output = arg[2:]
+        elif arg == "--ignore-not-found" or arg == "--ignore-not-found=true":
+            ignore_not_found = True
+        elif arg.startswith("-"):
+            return None  # watches, label columns, all namespaces, ...
+        else:
+            positional.append(arg)
+        i += 1
+
+    if not positional or positional[0] != "get" or len(positional) < 2:
+        return None
+    resource, names = positional[1], positional[2:]
+    if "/" in resource:
+        if names:
+            return None
+        resource, _, name = resource.partition("/")
+        names = [name]
+    if "," in resource or len(names) > 1:
+        return None
+    kind = resolve_kind(resource)
+    if kind is None:
+        return None
+
+    if not KINDS[kind][3]:
+        namespace = None
+    elif namespace is None:
+        return None  # the context's namespace is not known here
+
+    if output is None:
+        if not stdout_discarded:
+            return None  # table output is left to kubectl
+    elif not (output in ("json", "name") or output.startswith("jsonpath=")):
+        return None
+
+    labels = {}
+    if selector is not None:
+        for term in selector.split(","):
+            key, eq, value = term.partition("=")
+            if not eq or key.endswith("!"):
+                return None
+            labels[key] = value.lstrip("=")
+    return GetRequest(kind, names, namespace, output, labels if selector is not None else None,
+                      ignore_not_found)
+
+
+class SnapshotCache:
+    """Snapshot files shared by every shim process of one script run"""
+
+    def __init__(self, directory, kubectl, ttl=SNAPSHOT_TTL):
+        self.directory = Path(directory)
+        self.kubectl = kubectl
+        self.ttl = ttl
+
+    def _load(self, path, fetch):
+        try:
+            data = json.loads(path.read_text())
+            if time.time() - data["time"] < self.ttl:
+                return data["items"]
+        except (OSError, ValueError, KeyError):
+            pass
+        items = fetch()
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_text(json.dumps({"time": time.time(), "items": items}))
+        os.replace(temporary, path)
+        self.log("snapshot")
+        return items
+
+    def _list(self, resources, namespace=None):
+        args = [self.kubectl, "get", ",".join(resources), "-o", "json"]
+        if namespace is not None:
+            args += ["-n", namespace]
+        output = subprocess.check_output(args, stderr=subprocess.DEVNULL, timeout=KUBECTL_TIMEOUT)
+        return json.loads(output).get("items", [])
+
+    def objects(self, kind, namespace):
+        """Objects of a kind: namespaced kinds from one bulk list of the namespace, others per kind"""
+        if namespace is None:
+            return self._load(self.directory / f"cluster-{kind}.json",
+                              lambda: self._list([full_resource(kind)]))
+        items = self._load(
+            self.directory / f"namespace-{namespace}.json",
+            lambda: self._list([full_resource(k) for k, spec in KINDS.items() if spec[3]], namespace)
+        )
+        return [item for item in items if item.get("kind") == kind]
+
+    @property
+    def disabled(self):
+        return (self.directory / "disabled").exists()
+
+    def disable(self):
+        """Stop answering calls, e.g. when the bulk list is refused"""
+        (self.directory / "disabled").touch()
+
+    def invalidate(self):
+        for path in self.directory.glob("*.json"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def log(self, event):
+        with open(self.directory / "calls.log", "a") as f:
+            f.write(event + "\n")
+
+
+def answer(request, cache, out, err):
+    """Write kubectl's output for a get to out/err; returns the exit code"""
+    objects = cache.objects(request.kind, request.namespace)
+    resource, group = KINDS[request.kind][:2]
+
+    if request.names:
+        found = [o for o in objects if o.get("metadata", {}).get("name") == request.names[0]]
+        if not found:
+            if request.ignore_not_found:
+                return 0
+            err.write(f'Error from server (NotFound): {resource}{"." + group if group else ""} '
+                      f'"{request.names[0]}" not found\n')
+            return 1
+        result, items = found[0], found
+    else:
+        items = objects
+        if request.selector is not None:
+            items = [o for o in objects
+                     if all((o.get("metadata", {}).get("labels") or {}).get(k) == v
+                            for k, v in request.selector.items())]
+        result = {"apiVersion": "v1", "items": items, "kind": "List", "metadata": {"resourceVersion": ""}}
+        if not items and request.output is None and not request.ignore_not_found:
+            where = f" in {request.namespace} namespace" if request.namespace else ""
+            err.write(f"No resources found{where}.\n")
+
+    if request.output is None:
+        return 0  # stdout goes nowhere; only the exit code matters
+    if request.output == "json":
+        out.write(json.dumps(result, indent=4) + "\n")
+    elif request.output == "name":
+        prefix = f"{request.kind.lower()}.{group}" if group else request.kind.lower()
+        out.write("".join(f"{prefix}/{o['metadata']['name']}\n" for o in items))
+    else:
+        out.write(render(compile_template(request.output[len("jsonpath="):]), result))
+    return 0
+
+
+def stdout_is_devnull():
+    try:
+        out, null = os.fstat(1), os.stat(os.devnull)
+    except OSError:
+        return False
+    return (out.st_dev, out.st_ino) == (null.st_dev, null.st_ino)
+
+
+def main(argv):
+    real = os.environ.get(REAL_KUBECTL_ENV)
+    directory = os.environ.get(SHIM_DIR_ENV)
+    if not real or not directory:
+        sys.stderr.write("kubectl shim: not configured\n")
+        return 1
+    cache = SnapshotCache(directory, real)
+    argv = rebind_namespace(argv, os.environ.get(NAMESPACE_ENV, NAMESPACE))
+
+    request = None if cache.disabled else parse_get(argv, stdout_is_devnull())
+    if request is not None:
+        try:
+            code = answer(request, cache, sys.stdout, sys.stderr)
+            cache.log("hit")
+            return code
+        except JSONPathError:
+            pass  # kubectl reports the problem better than we could
+        except (OSError, ValueError, subprocess.SubprocessError):
+            cache.disable()
+
+    command = next((a for a in argv if not a.startswith("-")), None)
+    if command not in READ_ONLY_COMMANDS:
+        cache.invalidate()
+    cache.log("pass")
+    sys.stdout.flush()
+
+    namespace = os.environ.get(NAMESPACE_ENV, NAMESPACE)
+    if namespace != NAMESPACE and reads_manifest_from_stdin(argv):
+        # Heredoc manifests in scripts name k8squest too
+        manifest = rebind_manifest(sys.stdin.read(), namespace)
+        if not manifest.strip():
+            return 0  # nothing but the k8squest Namespace, which the pool namespace stands in for
+        return subprocess.run([real] + argv, input=manifest, text=True).returncode
+    os.execv(real, [real] + argv)
+
+
+class KubectlShim:
+    """Puts the shim first on PATH for one validate.sh run
+
+    ``env`` is the environment to run the script with, or None when the shim
+    is disabled or no real kubectl is installed. Temporary files, which may
+    hold Secrets, are removed on exit.
+
+    With a ``namespace`` other than k8squest the script's `-n k8squest`
+    arguments, *.k8squest.svc names and `-f -` manifests are pointed at it;
+    that much is installed even when answering from the snapshot is disabled.
+    """
+
+    def __init__(self, enabled=SHIM_ENABLED, namespace=NAMESPACE):
+        self.env = None
+        self._tmp = None
+        self.enabled = enabled
+        self.namespace = namespace
+
+    def __enter__(self):
+        needed = self.enabled or self.namespace != NAMESPACE
+        real = shutil.which("kubectl") if needed else None
+        if real is None:
+            return self
+        self._tmp = tempfile.TemporaryDirectory(prefix="k8squest-kubectl-")
+        directory = Path(self._tmp.name)
+        wrapper = directory / "kubectl"
+        wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{Path(__file__).resolve()}" "$@"\n')
+        wrapper.chmod(wrapper.stat().st_mode | stat.S_IXUSR)
+        if not self.enabled:
+            SnapshotCache(directory, real).disable()
+        self.env = dict(os.environ, PATH=f"{directory}{os.pathsep}{os.environ.get('PATH', '')}",
+                        **{REAL_KUBECTL_ENV: real, SHIM_DIR_ENV: str(directory),
+                           NAMESPACE_ENV: self.namespace})
+        return self
+
+    def stats(self):
+        """Counts of answered calls ('hit'), passed-through calls ('pass') and snapshots taken"""
+        counts = {"hit": 0, "pass": 0, "snapshot": 0}
+        if self._tmp is not None:
+            try:
+                for line in (Path(self._tmp.name) / "calls.log").read_text().split():
+                    counts[line] = counts.get(line, 0) + 1
+            except OSError:
+                pass
+        return counts
+
+    def __exit__(self, *exc):
+        if self._tmp is not None:
+            self._tmp.cleanup()
+        return False
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+K8sQuest Namespace Pool
+Keeps empty namespaces warm so a level deploys without waiting for the old one to terminate
+"""
+
+import json
+import os
+import re
+import secrets
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+
+import yaml
+
+NAMESPACE = "k8squest"
+
+NAMESPACE_POOL_ENABLED = os.environ.get("K8SQUEST_NAMESPACE_POOL", "off").lower() == "on"
+
+# Pool namespaces are named k8squest-<hex> and carry this label: warm (empty,
+# ready to bind), active (the level being played) or retired (being deleted)
+POOL_PREFIX = "k8squest-"
+POOL_LABEL = "k8squest.io/pool"
+WARM, ACTIVE, RETIRED = "warm", "active", "retired"
+
+POOL_SIZE = 2
+
+# A retired namespace still present after this long is reported as stuck
+STUCK_AFTER = 120
+
+RETIRE_POLL_INTERVAL = 2.0
+
+KUBECTL_TIMEOUT = 15
+
+# Namespaced kinds that get the active namespace when a manifest leaves it out
+NAMESPACED_KINDS = {
+    "Pod", "Service", "Endpoints", "ConfigMap", "Secret", "ServiceAccount", "PersistentVolumeClaim",
+    "ResourceQuota", "LimitRange", "Deployment", "ReplicaSet", "StatefulSet", "DaemonSet", "Job",
+    "CronJob", "HorizontalPodAutoscaler", "PodDisruptionBudget", "NetworkPolicy", "Ingress", "Role",
+    "RoleBinding",
+}
+
+# Namespace mentions in hints and guides: -n k8squest, --namespace=k8squest, namespace: k8squest, ...
+_TEXT_MENTION = re.compile(r"((?:-n|--namespace)[= ]|namespace:\s*|namespace\s+)k8squest\b|\.k8squest\.svc")
+
+
+def run_kubectl(args, input=None):
+    """Run kubectl; returns the CompletedProcess"""
+    return subprocess.run(["kubectl"] + args, input=input, capture_output=True, text=True,
+                          timeout=KUBECTL_TIMEOUT)
+
+
+def rebind_value(value, namespace):
+    """Replace references to the k8squest namespace inside a manifest value"""
+    if isinstance(value, dict):
+        return {k: rebind_value(v, namespace) for k, v in value.items()}
+    if isinstance(value, list):
+        return [rebind_value(v, namespace) for v in value]
+    if isinstance(value, str):
+        if value == NAMESPACE:
+            return namespace
+        return value.replace(f".{NAMESPACE}.svc", f".{namespace}.svc")
+    return value
+
+
+def rebind_manifest(text, namespace):
+    """A level manifest moved from the k8squest namespace to ``namespace``
+
+    The k8squest Namespace object itself is dropped, every string equal to
+    "k8squest" (metadata.namespace, RoleBinding subjects, namespace selectors)
+    and every *.k8squest.svc DNS name is rewritten, and namespaced objects
+    without a namespace get the new one. Other namespaces are left alone.
+    """
+    documents = []
+    for doc in yaml.safe_load_all(text):
+        if not isinstance(doc, dict):
+            continue
+        metadata = doc.get("metadata") or {}
+        if doc.get("kind") == "Namespace" and metadata.get("name") == NAMESPACE:
+            continue
+        doc = rebind_value(doc, namespace)
+        if doc.get("kind") in NAMESPACED_KINDS and not (doc.get("metadata") or {}).get("namespace"):
+            doc.setdefault("metadata", {})["namespace"] = namespace
+        documents.append(doc)
+    return yaml.safe_dump_all(documents, sort_keys=False)
+
+
+def namespace_metadata(text):
+    """(labels, annotations) of the k8squest Namespace a level manifest declares
+
+    rebind_manifest() drops that object, so these have to be copied onto
+    the pool namespace; levels 48 and 50 rely on its pod-security labels.
+    """
+    for doc in yaml.safe_load_all(text):
+        if not isinstance(doc, dict) or doc.get("kind") != "Namespace":
+            continue
+        metadata = doc.get("metadata") or {}
+        if metadata.get("name") == NAMESPACE:
+            return dict(metadata.get("labels") or {}), dict(metadata.get("annotations") or {})
+    return {}, {}
+
+
+def localize_text(text, namespace):
+    """Hint or guide text with its k8squest namespace mentions pointing at ``namespace``"""
+    if namespace == NAMESPACE:
+        return text
+    return _TEXT_MENTION.sub(
+        lambda m: f".{namespace}.svc" if m.group(1) is None else f"{m.group(1)}{namespace}", text
+    )
+
+
+def _age(namespace, now):
+    stamp = namespace.get("metadata", {}).get("deletionTimestamp")
+    if not stamp:
+        return 0.0
+    try:
+        deleted = datetime.strptime(stamp, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return 0.0
+    return now - deleted.timestamp()
+
+
+def describe_stuck(namespace):
+    """Why a namespace is not going away: its finalizers and the conditions holding it"""
+    finalizers = list(namespace.get("spec", {}).get("finalizers") or [])
+    finalizers += namespace.get("metadata", {}).get("finalizers") or []
+    reasons = [c.get("message") or c.get("reason") for c in namespace.get("status", {}).get("conditions") or []
+               if c.get("status") == "True"]
+    return {"finalizers": finalizers, "reasons": [r for r in reasons if r]}
+
+
+class NamespacePool:
+    """Warm, active and retired k8squest namespaces on the cluster
+
+    ``acquire()`` labels a warm namespace active, creating one only if the
+    pool is empty, then retires the previous active namespace and refills the
+    pool in the background. Retired namespaces are deleted without waiting
+    and followed until they disappear. One still present ``stuck_after``
+    seconds after deletion lands in ``stuck`` with its finalizers.
+    """
+
+    def __init__(self, size=POOL_SIZE, runner=run_kubectl, stuck_after=STUCK_AFTER,
+                 poll_interval=RETIRE_POLL_INTERVAL):
+        self.size = size
+        self.runner = runner
+        self.stuck_after = stuck_after
+        self.poll_interval = poll_interval
+        self.stuck = {}
+        self._retiring = {}
+        self._lock = threading.Lock()
+        self._refill_lock = threading.Lock()
+        self._threads = []
+        self._watching = False
+
+    def _kubectl(self, args, input=None):
+        result = self.runner(args, input=input)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"kubectl {' '.join(args)} failed")
+        return result.stdout
+
+    def namespaces(self, state=None):
+        """Pool namespaces, optionally only those in one state"""
+        selector = f"{POOL_LABEL}={state}" if state else POOL_LABEL
+        return json.loads(self._kubectl(["get", "namespaces", "-l", selector, "-o", "json"])).get("items", [])
+
+    def active(self):
+        """Name of the active namespace, or None"""
+        names = [ns["metadata"]["name"] for ns in self.namespaces(ACTIVE)]
+        return names[0] if names else None
+
+    def create(self, state=WARM):
+        """Create one pool namespace; returns its name"""
+        name = f"{POOL_PREFIX}{secrets.token_hex(3)}"
+        manifest = {"apiVersion": "v1", "kind": "Namespace",
+                    "metadata": {"name": name, "labels": {POOL_LABEL: state}}}
+        self._kubectl(["create", "-f", "-"], input=json.dumps(manifest))
+        return name
+
+    def configure(self, name, manifest):
+        """Put the labels and annotations ``manifest`` gives k8squest on pool namespace ``name``"""
+        labels, annotations = namespace_metadata(manifest)
+        labels.pop(POOL_LABEL, None)
+        for verb, values in (("label", labels), ("annotate", annotations)):
+            if values:
+                self._kubectl([verb, "namespace", name, "--overwrite"]
+                              + [f"{key}={value}" for key, value in values.items()])
+
+    def start(self):
+        """Follow namespaces an earlier run left terminating and fill the pool, in the background"""
+        self._background(self.adopt_retired)
+        self._background(self.refill)
+
+    def acquire(self, background=True):
+        """Bind a fresh namespace as the active one and return its name
+
+        With ``background=False`` the previous namespace is deleted and the
+        pool refilled before returning, for short-lived callers like reset.py.
+        """
+        previous = [ns["metadata"]["name"] for ns in self.namespaces(ACTIVE)]
+        warm = [ns["metadata"]["name"] for ns in self.namespaces(WARM)
+                if ns.get("status", {}).get("phase", "Active") == "Active"]
+        if warm:
+            name = warm[0]
+            self._kubectl(["label", "namespace", name, f"{POOL_LABEL}={ACTIVE}", "--overwrite"])
+        else:
+            name = self.create(ACTIVE)
+
+        run = self._background if background else (lambda target, *args: target(*args))
+        for old in previous:
+            run(self.retire, old)
+        run(self.refill)
+        return name
+
+    def refill(self):
+        """Create warm namespaces until the pool is full"""
+        with self._refill_lock:
+            missing = self.size - len(self.namespaces(WARM))
+            for _ in range(missing):
+                self.create(WARM)
+
+    def retire(self, name):
+        """Delete a namespace without waiting, and follow it until it is gone"""
+        self._kubectl(["label", "namespace", name, f"{POOL_LABEL}={RETIRED}", "--overwrite"])
+        self._kubectl(["delete", "namespace", name, "--wait=false", "--ignore-not-found"])
+        with self._lock:
+            self._retiring.setdefault(name, time.time())
+        self._follow()
+
+    def adopt_retired(self):
+        """Follow namespaces retired by an earlier run; returns how many are still terminating"""
+        now = time.time()
+        retired = self.namespaces(RETIRED)
+        with self._lock:
+            for ns in retired:
+                self._retiring.setdefault(ns["metadata"]["name"], now - _age(ns, now))
+        if retired:
+            self._follow()
+        return len(retired)
+
+    def check_retiring(self):
+        """Forget namespaces that are gone and record the ones stuck terminating"""
+        with self._lock:
+            retiring = dict(self._retiring)
+        now = time.time()
+        for name, since in retiring.items():
+            result = self.runner(["get", "namespace", name, "-o", "json"])
+            if result.returncode != 0:
+                if "NotFound" in result.stderr or "not found" in result.stderr:
+                    with self._lock:
+                        self._retiring.pop(name, None)
+                        self.stuck.pop(name, None)
+                continue
+            if now - since >= self.stuck_after:
+                self.stuck[name] = describe_stuck(json.loads(result.stdout))
+        with self._lock:
+            return len(self._retiring)
+
+    def release_all(self):
+        """Delete every pool namespace (used by a full reset)"""
+        self._kubectl(["delete", "namespaces", "-l", POOL_LABEL, "--wait=false", "--ignore-not-found"])
+
+    def wait(self, timeout=None):
+        """Wait for background work (used by tests and at exit)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in list(self._threads):
+            thread.join(None if deadline is None else max(0, deadline - time.monotonic()))
+
+    def _follow(self):
+        with self._lock:
+            if self._watching:
+                return
+            self._watching = True
+        self._background(self._watch_retiring)
+
+    def _watch_retiring(self):
+        try:
+            while True:
+                self.check_retiring()
+                with self._lock:
+                    if not self._retiring:
+                        self._watching = False
+                        return
+                time.sleep(self.poll_interval)
+        except BaseException:
+            with self._lock:
+                self._watching = False
+            raise
+
+    def _background(self, target, *args):
+        def run():
+            try:
+                target(*args)
+            except (RuntimeError, OSError, ValueError, subprocess.SubprocessError):
+                pass  # the next acquire or refill tries again
+        thread = threading.Thread(target=run, name=f"namespace-pool-{target.__name__}", daemon=True)
+        self._threads = [t for t in self._threads if t.is_alive()] + [thread]
+        thread.start()
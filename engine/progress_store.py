@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+K8sQuest Progress Store
+Append-only progress journal with batched fsync and atomic snapshot compaction
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+# At most this long between fsyncs of the journal while events keep coming
+FSYNC_INTERVAL = 1.0
+
+# Fold the journal into the snapshot once it holds this many events
+COMPACT_AFTER = 200
+
+DEFAULT_PROGRESS = {
+    "total_xp": 0,
+    "completed_levels": [],
+    "current_world": "world-1-basics",
+    "current_level": None,
+    "player_name": "Padawan",
+}
+
+
+def level_history(state, level):
+    """The per-level record of starts, hints and attempts, created on first use"""
+    return state.setdefault("history", {}).setdefault(
+        level, {"starts": 0, "hints": 0, "attempts": [], "seconds": 0.0}
+    )
+
+
+def apply_event(state, event):
+    """Fold one journal event into the progress state"""
+    kind = event.get("type")
+    if kind == "set":
+        state.update(copy.deepcopy(event["values"]))
+    elif kind == "start":
+        level_history(state, event["level"])["starts"] += 1
+    elif kind == "hint":
+        history = level_history(state, event["level"])
+        history["hints"] = max(history["hints"], event["hint"])
+    elif kind == "attempt":
+        history = level_history(state, event["level"])
+        history["attempts"].append({k: event[k] for k in ("at", "passed", "seconds", "hints")})
+        history["seconds"] = round(history["seconds"] + event["seconds"], 3)
+
+
+class ProgressStore:
+    """progress.json as a snapshot plus an append-only journal of events since it was written
+
+    Every event is one JSON line carrying a sequence number. Loading reads
+    the snapshot and replays the journal lines newer than the snapshot's
+    ``seq``, so a torn last line (the process died mid-write) or a journal
+    that outlived its compaction is harmless. Appends are flushed at once
+    and fsynced at most every ``fsync_interval`` seconds, by a timer when no
+    later event comes along; ``close()`` syncs and compacts. Compaction writes the snapshot to a temporary file,
+    fsyncs it and renames it over progress.json before emptying the journal.
+    """
+
+    def __init__(self, path, fsync_interval=FSYNC_INTERVAL, compact_after=COMPACT_AFTER):
+        self.path = Path(path)
+        self.journal_path = self.path.with_suffix(".journal")
+        self.fsync_interval = fsync_interval
+        self.compact_after = compact_after
+        self.state = None
+        self.seq = 0
+        self.pending = 0  # journal events not yet in the snapshot
+        self._journal = None
+        self._journal_end = None  # where a torn tail starts, trimmed before the next append
+        self._last_fsync = 0.0
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """The progress dict: snapshot plus journal tail"""
+        with self._lock:
+            return copy.deepcopy(self._load())
+
+    def update(self, progress):
+        """Journal the top-level fields of ``progress`` that changed since the last call"""
+        with self._lock:
+            state = self._load() if self.state is None else self.state
+            changed = {k: copy.deepcopy(v) for k, v in progress.items()
+                       if k != "history" and state.get(k) != v}
+        if changed:
+            self.record({"type": "set", "values": changed})
+
+    def record_start(self, level):
+        self.record({"type": "start", "level": level, "at": time.time()})
+
+    def record_hint(self, level, hint):
+        self.record({"type": "hint", "level": level, "hint": hint, "at": time.time()})
+
+    def record_attempt(self, level, passed, seconds, hints):
+        self.record({"type": "attempt", "level": level, "passed": passed,
+                     "seconds": round(seconds, 3), "hints": hints, "at": time.time()})
+
+    def history(self, level):
+        """Starts, hints and attempts recorded for one level"""
+        with self._lock:
+            state = self._load() if self.state is None else self.state
+            return copy.deepcopy(state.get("history", {}).get(level))
+
+    def record(self, event):
+        """Append one event to the journal and apply it"""
+        with self._lock:
+            if self.state is None:
+                self._load()
+            self.seq += 1
+            event = dict(event, seq=self.seq)
+            apply_event(self.state, event)
+
+            if self._journal is None:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                self._journal = open(self.journal_path, "a")
+                if self._journal_end is not None:
+                    # Only the writer trims, so a reader never cuts off a line being written
+                    self._journal.truncate(self._journal_end)
+                    self._journal_end = None
+            self._journal.write(json.dumps(event, separators=(",", ":")) + "\n")
+            self._journal.flush()
+            self._dirty = True
+            self.pending += 1
+
+            now = time.monotonic()
+            if now - self._last_fsync >= self.fsync_interval:
+                self._fsync(now)
+            elif self._timer is None:
+                # Sync this batch even if it is the last event for a while
+                self._timer = threading.Timer(self._last_fsync + self.fsync_interval - now, self.sync)
+                self._timer.daemon = True
+                self._timer.start()
+            compact = self.pending >= self.compact_after
+        if compact:
+            self.compact()
+
+    def sync(self):
+        """fsync journal appends that are still only flushed"""
+        with self._lock:
+            self._fsync(time.monotonic())
+
+    def compact(self):
+        """Write the state to a new snapshot and start an empty journal"""
+        with self._lock:
+            if self.state is None:
+                return
+            snapshot = dict(self.state, seq=self.seq)
+            temporary = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            with open(temporary, "w") as f:
+                json.dump(snapshot, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, self.path)
+            self._fsync_directory()
+
+            # The snapshot now covers every event; a crash before this point only
+            # leaves journal lines that the next load skips by sequence number
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            with open(self.journal_path, "w"):
+                pass
+            self._journal_end = None
+            self.pending = 0
+            self._dirty = False
+
+    def close(self):
+        """Sync and compact; safe to call more than once"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        self.sync()
+        if self.pending:
+            self.compact()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def remove(self):
+        """Delete the snapshot and journal (a full game reset)"""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            for path in (self.path, self.journal_path):
+                if path.exists():
+                    path.unlink()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self.state = self._journal_end = None
+            self.seq = self.pending = 0
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            state = {}
+        except ValueError:
+            state = {}  # torn by the old in-place save; the journal may still hold progress
+        snapshot_seq = state.pop("seq", 0)
+        self.seq = snapshot_seq
+        self.pending = 0
+
+        try:
+            with open(self.journal_path, "rb") as f:
+                good = 0
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        break  # torn write; nothing after it was acknowledged
+                    if not line.endswith(b"\n"):
+                        break
+                    good += len(line)
+                    if event.get("seq", 0) <= snapshot_seq:
+                        continue  # already folded into the snapshot
+                    apply_event(state, event)
+                    self.seq = event["seq"]
+                    self.pending += 1
+                # New events must not be appended to half a line; record() trims it
+                f.seek(0, os.SEEK_END)
+                self._journal_end = good if f.tell() > good else None
+        except FileNotFoundError:
+            pass
+
+        for key, value in DEFAULT_PROGRESS.items():
+            state.setdefault(key, copy.deepcopy(value))
+        self.state = state
+        return state
+
+    def _fsync(self, now):
+        if self._timer is not None and self._timer is not threading.current_thread():
+            self._timer.cancel()
+        self._timer = None
+        if self._journal is not None and self._dirty:
+            os.fsync(self._journal.fileno())
+            self._dirty = False
+        self._last_fsync = now
+
+    def _fsync_directory(self):
+        try:
+            fd = os.open(self.path.parent, os.O_RDONLY)
+        except OSError:
+            return  # not supported here (e.g. Windows)
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
@@ -4,13 +4,299 @@ K8sQuest Reset Tool - Clean level state
 """
 
 import sys
+import json
+import time
+import base64
 import subprocess
 from pathlib import Path
+import yaml
 from rich.console import Console
 from rich.prompt import Confirm
 
+try:
+    from engine.namespace_pool import (
+        NAMESPACE, NAMESPACE_POOL_ENABLED, NamespacePool, rebind_manifest, run_kubectl
+    )
+    from engine.kubectl_shim import KINDS, full_resource
+    from engine.catalog import load_catalog
+    from engine.progress_store import ProgressStore
+    from engine.images import PREPULL_NAMESPACE
+except ImportError:
+    from namespace_pool import (
+        NAMESPACE, NAMESPACE_POOL_ENABLED, NamespacePool, rebind_manifest, run_kubectl
+    )
+    from kubectl_shim import KINDS, full_resource
+    from catalog import load_catalog
+    from progress_store import ProgressStore
+    from images import PREPULL_NAMESPACE
+
 console = Console()
 
+BASE_DIR = Path(__file__).parent.parent
+WORLDS_DIR = BASE_DIR / "worlds"
+
+# Fingerprints of each level's freshly deployed state, one JSON file per level
+FINGERPRINT_DIR = BASE_DIR / "fingerprints"
+
+# Kept up to date by controllers, never created by the player
+IGNORED_KINDS = {"Endpoints"}
+
+# Kinds whose spec is mostly immutable; a modified one is deleted and recreated
+RECREATE_KINDS = {"Pod", "Job"}
+
+# Bumped when fingerprint keys change; older fingerprints mean a full redeploy
+FINGERPRINT_VERSION = 2
+
+
+class ResetPlan:
+    """What a diff-based reset changes: objects to delete, recreate and create"""
+
+    def __init__(self, delete, replace, create):
+        self.delete = delete
+        self.replace = replace
+        self.create = create
+
+    @property
+    def empty(self):
+        return not (self.delete or self.replace or self.create)
+
+    def summary(self):
+        return (f"{len(self.delete)} deleted, {len(self.replace)} restored, "
+                f"{len(self.create)} recreated")
+
+
+def find_level(name, worlds_dir=WORLDS_DIR):
+    """Level directory for `world-x/level-y`, `level-31-pvc-pending`, `level-31` or `31`, or None"""
+    catalog = load_catalog(worlds_dir)
+    name = name.strip("/")
+    level = catalog.level(name)
+    number = name[len("level-"):] if name.startswith("level-") else name
+    if level is None and number.isdigit():
+        level = next((l for l in catalog.levels if l["number"] == int(number)), None)
+    return catalog.path(level) if level else None
+
+def object_key(obj):
+    """namespace/kind/name; the namespace is empty for cluster-scoped objects"""
+    metadata = obj.get("metadata") or {}
+    return f"{metadata.get('namespace') or ''}/{obj.get('kind')}/{metadata.get('name')}"
+
+def level_documents(level_path, namespace):
+    """The level's broken.yaml objects, placed in ``namespace``"""
+    text = (level_path / "broken.yaml").read_text()
+    return [doc for doc in yaml.safe_load_all(rebind_manifest(text, namespace)) if doc]
+
+def list_namespace(namespace, runner=run_kubectl):
+    """Every object of the known namespaced kinds, from one kubectl call"""
+    resources = ",".join(full_resource(kind) for kind, spec in KINDS.items() if spec[3])
+    result = runner(["get", resources, "-n", namespace, "-o", "json"])
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or "could not list the namespace")
+    return json.loads(result.stdout).get("items", [])
+
+def list_level_objects(documents, namespace, runner=run_kubectl):
+    """Live objects in every namespace the level uses, plus its cluster-scoped objects
+
+    Levels like 27 put objects in a second namespace, and some create
+    Namespaces, PersistentVolumes or PriorityClasses; those are looked up
+    by name so an unchanged level compares equal.
+    """
+    namespaces = {namespace} | {doc["metadata"]["namespace"] for doc in documents
+                                if (doc.get("metadata") or {}).get("namespace")}
+    live = []
+    for name in sorted(namespaces):
+        live += list_namespace(name, runner)
+
+    cluster_scoped = [doc for doc in documents if not (doc.get("metadata") or {}).get("namespace")]
+    if cluster_scoped:
+        targets = [f"{full_resource(doc['kind']) if doc['kind'] in KINDS else doc['kind'].lower()}/"
+                   f"{doc['metadata']['name']}" for doc in cluster_scoped]
+        result = runner(["get"] + targets + ["--ignore-not-found", "-o", "json"])
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or "could not list the level's cluster objects")
+        found = json.loads(result.stdout) if result.stdout.strip() else {}
+        live += found.get("items", [found] if found.get("kind") else [])
+    return live
+
+def fingerprint_path(level_path, directory=FINGERPRINT_DIR):
+    return Path(directory) / f"{level_path.parent.name}--{level_path.name}.json"
+
+def record_fingerprint(level_path, namespace, runner=run_kubectl, directory=FINGERPRINT_DIR):
+    """Remember the uid and generation of everything the freshly deployed level consists of"""
+    objects = {
+        object_key(obj): {"uid": obj["metadata"].get("uid"), "generation": obj["metadata"].get("generation")}
+        for obj in list_level_objects(level_documents(level_path, namespace), namespace, runner)
+    }
+    fingerprint = {"version": FINGERPRINT_VERSION, "level": f"{level_path.parent.name}/{level_path.name}",
+                   "namespace": namespace, "recorded": time.time(), "objects": objects}
+    path = fingerprint_path(level_path, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(fingerprint, indent=2))
+    return fingerprint
+
+def load_fingerprint(level_path, directory=FINGERPRINT_DIR):
+    try:
+        fingerprint = json.loads(fingerprint_path(level_path, directory).read_text())
+    except (OSError, ValueError):
+        return None
+    return fingerprint if fingerprint.get("version") == FINGERPRINT_VERSION else None
+
+def matches(expected, actual):
+    """True when every field of ``expected`` has the same value in ``actual``
+
+    Fields the API server fills in (defaults, status) are ignored, so a
+    manifest matches the object created from it. The server also adds list
+    entries (a Pod's kube-api-access volume and mount, default tolerations),
+    so entries with a ``name`` are matched by name and other objects in a
+    list only need a match somewhere in the live list. Lists of plain
+    values (command, args) must be equal.
+    """
+    if isinstance(expected, dict):
+        return isinstance(actual, dict) and all(matches(v, actual.get(k)) for k, v in expected.items())
+    if isinstance(expected, list):
+        if not isinstance(actual, list):
+            return False
+        if not all(isinstance(e, dict) for e in expected):
+            return len(expected) == len(actual) and all(matches(e, a) for e, a in zip(expected, actual))
+        named = {a["name"]: a for a in actual if isinstance(a, dict) and "name" in a}
+        return all(
+            matches(e, named.get(e["name"])) if "name" in e else any(matches(e, a) for a in actual)
+            for e in expected
+        )
+    if expected is None or actual is None:
+        return expected is actual
+    return expected == actual or str(expected) == str(actual)
+
+def comparable(doc):
+    """The parts of a manifest that a live object is compared on"""
+    doc = dict(doc)
+    doc.pop("apiVersion", None)
+    if doc.get("kind") == "Secret" and doc.get("stringData"):
+        data = dict(doc.get("data") or {})
+        data.update({k: base64.b64encode(str(v).encode()).decode() for k, v in doc.pop("stringData").items()})
+        doc["data"] = data
+    metadata = doc.get("metadata") or {}
+    doc["metadata"] = {k: metadata[k] for k in ("name", "labels", "annotations") if k in metadata}
+    return doc
+
+def plan_reset(documents, live, fingerprint):
+    """Compare the live namespace with the level's fingerprint and manifest
+
+    Objects the player added are deleted (ones with owners are left to their
+    controllers), manifest objects that were changed, recreated or no longer
+    match broken.yaml are restored, missing ones are created, and everything
+    else is left alone.
+    """
+    recorded = fingerprint.get("objects", {})
+    live_by_key = {object_key(obj): obj for obj in live}
+    wanted = {object_key(doc) for doc in documents}
+
+    delete = [
+        obj for key, obj in live_by_key.items()
+        if key not in wanted and obj.get("kind") not in IGNORED_KINDS
+        and not obj["metadata"].get("ownerReferences")
+        and recorded.get(key, {}).get("uid") != obj["metadata"].get("uid")
+    ]
+    replace, create = [], []
+    for doc in documents:
+        key = object_key(doc)
+        obj = live_by_key.get(key)
+        if obj is None:
+            create.append(doc)
+            continue
+        before = recorded.get(key, {})
+        if (before.get("uid") != obj["metadata"].get("uid")
+                or before.get("generation") != obj["metadata"].get("generation")
+                or not matches(comparable(doc), obj)):
+            replace.append(doc)
+    return ResetPlan(delete, replace, create)
+
+def apply_plan(plan, namespace, runner=run_kubectl):
+    """Carry out a ResetPlan with at most one kubectl call per step and kind of change"""
+    errors = []
+
+    def kubectl(args, docs=None):
+        result = runner(args, input=yaml.safe_dump_all(docs) if docs is not None else None)
+        if result.returncode != 0:
+            errors.append(result.stderr.strip())
+        return result.returncode == 0
+
+    by_namespace = {}
+    for obj in plan.delete:
+        by_namespace.setdefault(obj["metadata"].get("namespace") or namespace, []).append(obj)
+    for name, objects in by_namespace.items():
+        kubectl(["delete", "-n", name, "--wait=false", "--ignore-not-found"] +
+                [f"{full_resource(o['kind'])}/{o['metadata']['name']}" for o in objects])
+    recreate = [doc for doc in plan.replace if doc.get("kind") in RECREATE_KINDS]
+    update = [doc for doc in plan.replace if doc.get("kind") not in RECREATE_KINDS]
+    if update and not kubectl(["replace", "--save-config", "-f", "-"], update):
+        recreate += update  # e.g. an immutable field changed
+    if recreate:
+        kubectl(["replace", "--force", "--grace-period=0", "--save-config", "-f", "-"], recreate)
+    if plan.create:
+        kubectl(["apply", "-f", "-"], plan.create)
+    if errors:
+        raise RuntimeError("\n".join(errors))
+
+def diff_reset(level_path, runner=run_kubectl, directory=FINGERPRINT_DIR):
+    """Put a level back into its deployed state without recreating the namespace
+
+    Returns the applied ResetPlan, or None when there is no fingerprint or
+    its namespace is gone, in which case the caller redeploys from scratch.
+    """
+    fingerprint = load_fingerprint(level_path, directory)
+    if fingerprint is None:
+        return None
+    namespace = fingerprint["namespace"]
+    result = runner(["get", "namespace", namespace, "-o", "json"])
+    if result.returncode != 0 or json.loads(result.stdout).get("status", {}).get("phase") != "Active":
+        return None
+
+    documents = level_documents(level_path, namespace)
+    plan = plan_reset(documents, list_level_objects(documents, namespace, runner), fingerprint)
+    if not plan.empty:
+        apply_plan(plan, namespace, runner)
+        record_fingerprint(level_path, namespace, runner, directory)
+    return plan
+
+def remember_deployed_state(level_path, namespace):
+    """Record a fingerprint after a full deploy so the next reset can be incremental"""
+    try:
+        record_fingerprint(level_path, namespace)
+        return True
+    except (RuntimeError, OSError, ValueError, subprocess.SubprocessError):
+        return False
+
+def reset_level_in_pool(level_path, broken_file):
+    """Reset into a fresh namespace from the pool instead of recreating k8squest"""
+    console.print("1️⃣  Binding a fresh namespace...")
+    try:
+        pool = NamespacePool()
+        namespace = pool.acquire(background=False)
+        pool.configure(namespace, broken_file.read_text())
+    except (RuntimeError, OSError, ValueError, subprocess.SubprocessError) as e:
+        console.print(f"\n[red]❌ Reset failed: {e}[/red]\n")
+        return False
+    subprocess.run(
+        ["kubectl", "config", "set-context", "--current", f"--namespace={namespace}"],
+        capture_output=True
+    )
+
+    console.print("2️⃣  Deploying broken resources...")
+    result = subprocess.run(
+        ["kubectl", "apply", "-f", "-"],
+        input=rebind_manifest(broken_file.read_text(), namespace),
+        capture_output=True,
+        text=True
+    )
+
+    if result.returncode == 0:
+        remember_deployed_state(level_path, namespace)
+        console.print(f"\n[green]✅ Level reset successfully in namespace {namespace}![/green]")
+        console.print(f"[dim]You can now retry: {level_path.name}[/dim]\n")
+        return True
+    console.print(f"\n[red]❌ Reset failed: {result.stderr}[/red]\n")
+    return False
+
 def reset_level(world, level):
     """Reset a specific level to initial state"""
     base_dir = Path(__file__).parent.parent
@@ -26,6 +312,20 @@ def reset_level(world, level):
         return False
     
     console.print(f"[yellow]Resetting {world}/{level}...[/yellow]\n")
+
+    started = time.monotonic()
+    try:
+        plan = diff_reset(level_path)
+    except (RuntimeError, OSError, ValueError, yaml.YAMLError, subprocess.SubprocessError) as e:
+        console.print(f"[dim]Incremental reset failed ({e}); redeploying the level[/dim]")
+        plan = None
+    if plan is not None:
+        console.print(f"[green]✅ Level reset in {time.monotonic() - started:.1f}s: {plan.summary()}[/green]")
+        console.print(f"[dim]You can now retry: {level}[/dim]\n")
+        return True
+
+    if NAMESPACE_POOL_ENABLED:
+        return reset_level_in_pool(level_path, broken_file)
     
     # Delete namespace (clean slate)
     console.print("1️⃣  Deleting namespace...")
@@ -50,6 +350,7 @@ def reset_level(world, level):
     )
     
     if result.returncode == 0:
+        remember_deployed_state(level_path, NAMESPACE)
         console.print("\n[green]✅ Level reset successfully![/green]")
         console.print(f"[dim]You can now retry: {level}[/dim]\n")
         return True
@@ -65,18 +366,22 @@ def reset_all():
         console.print("[dim]Cancelled[/dim]")
         return
     
-    # Delete namespace
+    # Delete the level namespace and the image pre-pull pods
     console.print("\n[yellow]Cleaning up...[/yellow]")
     subprocess.run(
-        ["kubectl", "delete", "namespace", "k8squest", "--ignore-not-found"],
+        ["kubectl", "delete", "namespace", "k8squest", PREPULL_NAMESPACE, "--ignore-not-found"],
         capture_output=True
     )
+    try:
+        NamespacePool().release_all()
+    except (RuntimeError, OSError, subprocess.SubprocessError):
+        pass  # no pool namespaces, or kubectl unavailable
     
     # Remove progress file
     base_dir = Path(__file__).parent.parent
-    progress_file = base_dir / "progress.json"
-    if progress_file.exists():
-        progress_file.unlink()
+    ProgressStore(base_dir / "progress.json").remove()
+    for fingerprint in FINGERPRINT_DIR.glob("*.json"):
+        fingerprint.unlink()
     
     console.print("[green]✅ Game reset complete![/green]\n")
 
@@ -88,15 +393,20 @@ def main():
         console.print("  python3 engine/reset.py all")
         console.print("\nExamples:")
         console.print("  python3 engine/reset.py level-1-pods")
-        console.print("  python3 engine/reset.py level-2-deployments")
+        console.print("  python3 engine/reset.py level-31")
+        console.print("  python3 engine/reset.py world-2-deployments/level-11-rollback")
         console.print("  python3 engine/reset.py all")
         return
     
     if sys.argv[1] == "all":
         reset_all()
     else:
-        level = sys.argv[1]
-        reset_level("world-1-basics", level)
+        level_path = find_level(sys.argv[1])
+        if level_path is None:
+            console.print(f"[red]Error: Level not found: {sys.argv[1]}[/red]")
+            sys.exit(1)
+        if not reset_level(level_path.parent.name, level_path.name):
+            sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -97,7 +97,8 @@ def check_command_safety(command: str) -> tuple[bool, str, str]:
         # If namespace is specified, check if it's allowed
         if namespace_match:
             namespace = namespace_match.group(2)
-            if namespace not in ALLOWED_NAMESPACES:
+            # k8squest-* namespaces come from the warm namespace pool
+            if namespace not in ALLOWED_NAMESPACES and not namespace.startswith("k8squest-"):
                 return (
                     False,
                     f"⚠️  WARNING: K8sQuest should use namespace 'k8squest', not '{namespace}'",
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+K8sQuest Declarative Validation
+Evaluates a level's validate.yaml checks against one snapshot of the cluster
+"""
+
+import json
+import re
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import yaml
+
+try:
+    from engine.jsonpath import JSONPathError, evaluate, format_value, parse
+except ImportError:
+    from jsonpath import JSONPathError, evaluate, format_value, parse
+
+NAMESPACE = "k8squest"
+
+KUBECTL_TIMEOUT = 10
+
+# Kinds that live outside any namespace; checks on them ignore `namespace`
+CLUSTER_SCOPED_KINDS = {
+    "namespace", "node", "persistentvolume", "storageclass", "clusterrole",
+    "clusterrolebinding", "priorityclass", "customresourcedefinition",
+}
+
+CHECK_TYPES = ("exists", "absent", "phase", "ready", "jsonpath", "endpoints")
+
+JSONPATH_CONDITIONS = ("equals", "not_equals", "in", "matches", "not_matches")
+
+# Short names accepted for `kind`, as kubectl accepts them
+KIND_ALIASES = {
+    "po": "pod", "svc": "service", "deploy": "deployment", "rs": "replicaset",
+    "sts": "statefulset", "ds": "daemonset", "cm": "configmap", "pvc": "persistentvolumeclaim",
+    "pv": "persistentvolume", "ns": "namespace", "sa": "serviceaccount", "ep": "endpoints",
+    "hpa": "horizontalpodautoscaler", "pdb": "poddisruptionbudget", "netpol": "networkpolicy",
+    "ing": "ingress", "quota": "resourcequota", "limits": "limitrange",
+}
+
+
+class ValidationError(ValueError):
+    """A validate.yaml that cannot be evaluated"""
+
+
+def run_kubectl(args):
+    """Run kubectl and return its stdout"""
+    return subprocess.check_output(
+        ["kubectl"] + args, stderr=subprocess.PIPE, timeout=KUBECTL_TIMEOUT
+    ).decode()
+
+
+# --- Checks -------------------------------------------------------------------
+
+class Check:
+    """One entry of validate.yaml"""
+
+    def __init__(self, spec, index, namespace=NAMESPACE):
+        if not isinstance(spec, dict):
+            raise ValidationError(f"check {index + 1} is not a mapping")
+        self.type = spec.get("check")
+        if self.type not in CHECK_TYPES:
+            raise ValidationError(f"check {index + 1}: unknown check type {self.type!r}")
+        self.spec = spec
+        if self.type == "endpoints":
+            self.kind = "endpoints"
+            self.name = spec.get("service")
+        else:
+            kind = str(spec.get("kind", "")).lower()
+            self.kind = KIND_ALIASES.get(kind, kind)
+            self.name = spec.get("name")
+        self.selector = spec.get("selector")
+        if not self.kind:
+            raise ValidationError(f"check {index + 1}: missing kind")
+        if not self.name and not self.selector:
+            raise ValidationError(f"check {index + 1}: needs a name or a selector")
+        if self.kind in CLUSTER_SCOPED_KINDS:
+            self.namespace = None
+        else:
+            # Levels are written against k8squest; a namespace pool may have moved them
+            self.namespace = spec.get("namespace", NAMESPACE)
+            if self.namespace == NAMESPACE:
+                self.namespace = namespace
+        try:
+            self.segments = parse(spec["path"]) if self.type == "jsonpath" else None
+        except (JSONPathError, KeyError) as e:
+            raise ValidationError(f"check {index + 1}: {e}")
+        if self.type == "jsonpath" and not any(k in spec for k in JSONPATH_CONDITIONS):
+            raise ValidationError(f"check {index + 1}: jsonpath needs one of {', '.join(JSONPATH_CONDITIONS)}")
+        target = self.name or ",".join(f"{k}={v}" for k, v in self.selector.items())
+        self.description = spec.get("description") or f"{self.type} {spec.get('kind', 'Endpoints')}/{target}"
+        self.hint = spec.get("hint")
+
+    def targets(self, snapshot):
+        """Objects this check applies to"""
+        objects = snapshot.objects(self.kind, self.namespace)
+        if self.name:
+            return [o for o in objects if o.get("metadata", {}).get("name") == self.name]
+        labels = self.selector
+        return [o for o in objects
+                if all((o.get("metadata", {}).get("labels") or {}).get(k) == str(v) for k, v in labels.items())]
+
+    def evaluate(self, snapshot):
+        """(passed, message) for this check against the snapshot"""
+        targets = self.targets(snapshot)
+        if self.type == "absent":
+            if targets:
+                return False, f"{len(targets)} object(s) still present"
+            return True, "not present"
+        if not targets:
+            return False, "not found"
+
+        minimum = self.spec.get("min", 1)
+        if self.type == "exists":
+            if len(targets) < minimum:
+                return False, f"found {len(targets)}, expected at least {minimum}"
+            return True, f"found {len(targets)}" if self.selector else "found"
+        if self.type == "endpoints":
+            addresses = sum(len(subset.get("addresses") or []) for subset in targets[0].get("subsets") or [])
+            if addresses < minimum:
+                return False, f"{addresses} ready endpoint(s), expected at least {minimum}"
+            return True, f"{addresses} ready endpoint(s)"
+
+        failures = []
+        for obj in targets:
+            name = obj.get("metadata", {}).get("name")
+            ok, detail = getattr(self, f"_{self.type}")(obj)
+            if not ok:
+                failures.append(f"{name}: {detail}" if self.selector else detail)
+        if failures:
+            return False, "; ".join(failures)
+        if self.selector and len(targets) < minimum:
+            return False, f"{len(targets)} matching object(s), expected at least {minimum}"
+        return True, detail if not self.selector else f"{len(targets)} object(s) ok"
+
+    def _phase(self, obj):
+        phase = (obj.get("status") or {}).get("phase") or "Unknown"
+        expected = self.spec.get("phase")
+        return phase == expected, f"phase is {phase}" + ("" if phase == expected else f", expected {expected}")
+
+    def _ready(self, obj):
+        status = obj.get("status") or {}
+        kind = obj.get("kind")
+        if kind == "Pod":
+            conditions = {c.get("type"): c.get("status") for c in status.get("conditions") or []}
+            if conditions.get("Ready") == "True":
+                return True, "ready"
+            return False, f"not ready (phase {status.get('phase', 'Unknown')})"
+        if kind == "DaemonSet":
+            ready, wanted = status.get("numberReady") or 0, status.get("desiredNumberScheduled") or 0
+        elif kind == "Job":
+            ready, wanted = status.get("succeeded") or 0, (obj.get("spec") or {}).get("completions") or 1
+        else:
+            replicas = (obj.get("spec") or {}).get("replicas")
+            ready, wanted = status.get("readyReplicas") or 0, 1 if replicas is None else replicas
+        wanted = self.spec.get("replicas", wanted)
+        minimum = self.spec.get("min_replicas", 0)
+        if ready < minimum:
+            return False, f"{ready}/{wanted} ready, expected at least {minimum}"
+        return ready >= wanted, f"{ready}/{wanted} ready"
+
+    def _jsonpath(self, obj):
+        values = evaluate(obj, self.segments)
+        actual = " ".join(format_value(v) for v in values)
+        spec = self.spec
+        if "equals" in spec:
+            expected = format_value(spec["equals"])
+            return actual == expected, f"{spec['path']} is {actual!r}" + (
+                "" if actual == expected else f", expected {expected!r}")
+        if "not_equals" in spec:
+            unwanted = format_value(spec["not_equals"])
+            return actual != unwanted, f"{spec['path']} is {actual!r}"
+        if "in" in spec:
+            allowed = [format_value(v) for v in spec["in"]]
+            return actual in allowed, f"{spec['path']} is {actual!r}" + (
+                "" if actual in allowed else f", expected one of {allowed}")
+        if "matches" in spec:
+            ok = re.search(str(spec["matches"]), actual) is not None
+            return ok, f"{spec['path']} is {actual!r}" + ("" if ok else f", expected to match {spec['matches']!r}")
+        ok = re.search(str(spec["not_matches"]), actual) is None
+        return ok, f"{spec['path']} is {actual!r}"
+
+
+class CheckResult:
+    """Outcome of one check"""
+
+    def __init__(self, check, passed, message, duration_ms):
+        self.check = check
+        self.passed = passed
+        self.message = message
+        self.duration_ms = duration_ms
+
+    @property
+    def description(self):
+        return self.check.description
+
+    @property
+    def hint(self):
+        return self.check.hint
+
+
+# --- Snapshot -----------------------------------------------------------------
+
+class ClusterSnapshot:
+    """Every object the checks refer to, listed once per namespace"""
+
+    def __init__(self, items=None, kubectl_calls=0, duration_ms=0.0):
+        self.kubectl_calls = kubectl_calls
+        self.duration_ms = duration_ms
+        self._index = {}
+        for namespace, objects in (items or {}).items():
+            for obj in objects:
+                key = (str(obj.get("kind", "")).lower(), namespace)
+                self._index.setdefault(key, []).append(obj)
+
+    def objects(self, kind, namespace):
+        return self._index.get((kind, namespace), [])
+
+
+def fetch_snapshot(checks, runner=run_kubectl):
+    """List the kinds the checks use with one kubectl call per namespace, in parallel"""
+    start = time.perf_counter()
+    wanted = {}
+    for check in checks:
+        wanted.setdefault(check.namespace, set()).add(check.kind)
+
+    def fetch(namespace):
+        args = ["get", ",".join(sorted(wanted[namespace])), "-o", "json"]
+        if namespace is not None:
+            args += ["-n", namespace]
+        return namespace, json.loads(runner(args)).get("items", [])
+
+    namespaces = list(wanted)
+    if len(namespaces) > 1:
+        with ThreadPoolExecutor(max_workers=len(namespaces)) as pool:
+            items = dict(pool.map(fetch, namespaces))
+    else:
+        items = dict(fetch(namespace) for namespace in namespaces)
+
+    return ClusterSnapshot(items, kubectl_calls=len(namespaces),
+                           duration_ms=(time.perf_counter() - start) * 1000)
+
+
+class ValidationReport:
+    """Results of every check of a level, plus what fetching the snapshot cost"""
+
+    def __init__(self, results, snapshot, duration_ms, success_message=None):
+        self.results = results
+        self.snapshot = snapshot
+        self.duration_ms = duration_ms
+        self.success_message = success_message
+
+    @property
+    def passed(self):
+        return all(result.passed for result in self.results)
+
+    @property
+    def failures(self):
+        return [result for result in self.results if not result.passed]
+
+
+def load_checks(path, namespace=NAMESPACE):
+    """Parse validate.yaml into (checks, success message); raises ValidationError"""
+    try:
+        with open(path) as f:
+            spec = yaml.safe_load(f) or {}
+    except yaml.YAMLError as e:
+        raise ValidationError(f"{Path(path).name}: {e}")
+    if not isinstance(spec, dict) or not isinstance(spec.get("checks"), list) or not spec["checks"]:
+        raise ValidationError(f"{Path(path).name}: expected a non-empty 'checks' list")
+    return [Check(entry, i, namespace) for i, entry in enumerate(spec["checks"])], spec.get("success")
+
+
+def validate_level(path, runner=run_kubectl, namespace=NAMESPACE):
+    """Evaluate a validate.yaml against one fresh snapshot of the cluster
+
+    Checks on the k8squest namespace are evaluated in ``namespace`` instead.
+
+    Raises ValidationError for a malformed file, and CalledProcessError,
+    TimeoutExpired or OSError when the cluster cannot be listed.
+    """
+    start = time.perf_counter()
+    checks, success_message = load_checks(path, namespace)
+    snapshot = fetch_snapshot(checks, runner)
+
+    results = []
+    for check in checks:
+        check_start = time.perf_counter()
+        passed, message = check.evaluate(snapshot)
+        results.append(CheckResult(check, passed, message, (time.perf_counter() - check_start) * 1000))
+
+    return ValidationReport(results, snapshot, (time.perf_counter() - start) * 1000, success_message)
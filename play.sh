@@ -1,6 +1,6 @@
 #!/bin/bash
 # Quick launcher for K8sQuest
-# Usage: ./play.sh [--no-viz] [--viz-port PORT]
+# Usage: ./play.sh [--no-viz] [--viz-port PORT] [--auto-validate] [--namespace-pool] [--no-prepull] [--no-timelines]
 
 cd "$(dirname "$0")"
 
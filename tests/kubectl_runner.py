@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Fake kubectl runner shared by the tests
+Stands in for run_kubectl: each test registers the responses it needs by leading arguments
+"""
+
+import json
+import subprocess
+import threading
+
+
+def failed(args, stderr):
+    return subprocess.CompletedProcess(args, 1, "", stderr)
+
+
+class FakeKubectl:
+    """A ``runner(args, input=None)`` that records every call and answers from registered handlers
+
+    ``on("get", "pods")(handler)`` answers calls starting with those
+    arguments; the first matching registration wins. A handler gets
+    ``(args, input)`` and returns stdout: a string, a dict or list (sent as
+    JSON) or None for no output. Returning a CompletedProcess sends it as
+    is, e.g. ``failed(args, "not found")``. Calls nothing answers fail the
+    test.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.handlers = []
+        self._lock = threading.Lock()
+
+    def on(self, *prefix):
+        """Decorator registering a handler for calls that start with ``prefix``"""
+        def register(handler):
+            self.handlers.append((list(prefix), handler))
+            return handler
+        return register
+
+    def commands(self):
+        """Every call so far as one string, like a shell history"""
+        return [" ".join(args) for args in self.calls]
+
+    def __call__(self, args, input=None):
+        with self._lock:
+            self.calls.append(args)
+            for prefix, handler in self.handlers:
+                if args[:len(prefix)] == prefix:
+                    out = handler(args, input)
+                    if isinstance(out, subprocess.CompletedProcess):
+                        return out
+                    if isinstance(out, (dict, list)):
+                        out = json.dumps(out)
+                    return subprocess.CompletedProcess(args, 0, out or "", "")
+            raise AssertionError(f"unexpected kubectl {args}")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests for the visualizer in-memory static asset store
+"""
+
+import gzip
+import re
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualizer.assets import IMMUTABLE, AssetStore, parse_accept_encoding
+
+STATIC_DIR = Path(__file__).parent.parent / 'visualizer' / 'static'
+
+
+def test_index_points_at_hashed_immutable_urls():
+    store = AssetStore()
+    html = store.get('/').body.decode()
+
+    script = re.search(r'src="(/app\.[0-9a-f]{10}\.js)"', html).group(1)
+    stylesheet = re.search(r'href="(/style\.[0-9a-f]{10}\.css)"', html).group(1)
+    assert 'https://d3js.org/d3.v7.min.js' in html
+
+    asset = store.get(script)
+    assert asset.cache_control == IMMUTABLE
+    assert asset.body == (STATIC_DIR / 'app.js').read_bytes()
+    assert store.get(stylesheet).content_type.startswith('text/css')
+    assert store.get('/index.html').cache_control == 'no-cache'
+
+
+def test_precompressed_variant_is_negotiated():
+    asset = AssetStore().get('/app.js')
+
+    body, encoding = asset.negotiate('gzip, deflate')
+    assert encoding == 'gzip'
+    assert gzip.decompress(body) == asset.body
+    assert len(body) < len(asset.body)
+
+    assert asset.negotiate('gzip;q=0') == (asset.body, None)
+    assert asset.negotiate(None) == (asset.body, None)
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding('gzip, br;q=0.5, identity;q=0') == {'gzip', 'br'}
+    assert parse_accept_encoding('') == set()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for background auto-validation
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.auto_validate import AutoValidator, level_kinds, unwatched_kinds
+from visualizer.informer import ObjectStore
+
+WORLDS = Path(__file__).parent.parent / "worlds"
+
+
+class FakeInformer:
+    """An informer whose store the test edits directly"""
+
+    def __init__(self, on_change):
+        self.on_change = on_change
+        self.store = ObjectStore()
+        self.synced = True
+
+    def start(self):
+        self.on_change()  # initial sync
+
+    def stop(self):
+        pass
+
+    def change(self, key, name, rv):
+        kind = {'pods': 'Pod', 'configmaps': 'ConfigMap', 'deployments': 'Deployment'}[key]
+        self.store.apply(key, 'MODIFIED', {'kind': kind, 'metadata': {'name': name, 'resourceVersion': str(rv)}})
+        self.on_change()
+
+
+class RecordingCheck:
+    """A validation that passes once ``passing`` is set, tracking overlap between runs"""
+
+    def __init__(self, duration=0.0):
+        self.duration = duration
+        self.passing = False
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.duration)
+        with self._lock:
+            self.active -= 1
+        return self.passing, lambda: 'shown'
+
+
+def start(check, keys=('pods',), debounce=0.05):
+    validator = AutoValidator(check, keys, informer_factory=FakeInformer, debounce=debounce).start()
+    return validator, validator.informer
+
+
+def test_level_kinds_come_from_the_level_files():
+    assert level_kinds(WORLDS / "world-1-basics" / "level-1-pods") == {"pods"}
+    assert level_kinds(WORLDS / "world-4-storage" / "level-31-pvc-pending") == {"pods", "pvcs"}
+    assert "deployments" in level_kinds(WORLDS / "world-2-deployments" / "level-11-rollback")
+
+
+def test_fixes_in_kinds_the_informer_cannot_watch_are_polled():
+    assert unwatched_kinds(WORLDS / "world-1-basics" / "level-1-pods") == []
+    assert "PodDisruptionBudget" in unwatched_kinds(WORLDS / "world-2-deployments" / "level-16-pdb")
+
+    check = RecordingCheck()
+    validator = AutoValidator(check, ('pods',), informer_factory=FakeInformer, debounce=0.01,
+                              poll_interval=0.05).start()
+    try:
+        time.sleep(0.2)
+        assert check.calls >= 2 and not validator.solved.is_set()
+        check.passing = True
+        assert validator.solved.wait(1)
+    finally:
+        validator.stop()
+
+
+def test_a_burst_of_changes_is_validated_once_and_other_kinds_are_ignored():
+    check = RecordingCheck()
+    validator, informer = start(check)
+    try:
+        informer.change('configmaps', 'settings', 1)
+        time.sleep(0.15)
+        assert check.calls == 0
+
+        for rv in range(2, 7):
+            informer.change('pods', 'nginx-broken', rv)
+        time.sleep(0.2)
+        assert check.calls == 1
+        assert not validator.solved.is_set()
+
+        check.passing = True
+        began = time.monotonic()
+        informer.change('pods', 'nginx-broken', 7)
+        assert validator.solved.wait(1)
+        assert time.monotonic() - began < 1
+        assert validator.result[1]() == 'shown'
+    finally:
+        validator.stop()
+
+
+def test_only_one_validation_runs_at_a_time():
+    check = RecordingCheck(duration=0.2)
+    validator, informer = start(check, debounce=0.01)
+    try:
+        informer.change('pods', 'web', 1)
+        time.sleep(0.05)  # first run in flight
+        for rv in range(2, 10):
+            informer.change('pods', 'web', rv)
+            time.sleep(0.01)
+        time.sleep(0.6)
+        assert check.max_active == 1
+        assert check.calls == 1  # changes during the run are taken as its own
+
+        informer.change('pods', 'web', 10)
+        time.sleep(0.4)
+        assert check.calls == 2
+    finally:
+        validator.stop()
+
+
+def test_changes_made_by_the_check_do_not_trigger_another_run():
+    informer = None
+
+    def check():
+        # Like level 30's validate.sh: create, use and delete a dns-test pod
+        check.calls += 1
+        informer.change('pods', 'dns-test', 100 + check.calls)
+        informer.store.apply('pods', 'DELETED', {'kind': 'Pod', 'metadata': {'name': 'dns-test'}})
+        informer.on_change()
+        return False, None
+    check.calls = 0
+
+    validator, informer = start(check)
+    try:
+        for rv in (1, 2, 3):
+            informer.change('pods', 'web', rv)
+            time.sleep(0.4)
+            assert check.calls == rv  # exactly one run per player change
+        assert not validator.solved.is_set()
+    finally:
+        validator.stop()
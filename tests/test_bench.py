@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline visualizer benchmark and its fake kubectl
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "tools"))
+
+import bench_visualizer
+from fake_kubectl import install, write_fixtures
+from visualizer.snapshot import SNAPSHOT_KINDS, demultiplex
+
+
+def test_fake_kubectl_answers_the_snapshot_list(tmp_path):
+    fixtures = write_fixtures(tmp_path / 'fixtures', pods=12, deployments=2)
+    env = install(tmp_path / 'bin', fixtures)
+    resources = ','.join(resource for resource, _ in SNAPSHOT_KINDS.values())
+
+    output = subprocess.check_output(['kubectl', 'get', resources, '-n', 'k8squest', '-o', 'json'],
+                                     env=env)
+    grouped = demultiplex(json.loads(output)['items'])
+    assert len(grouped['pods']) == 12
+    assert len(grouped['deployments']) == 2
+
+    raw = subprocess.check_output(['kubectl', 'get', '--raw', '/api/v1/namespaces/k8squest/services'], env=env)
+    assert [s['metadata']['name'] for s in json.loads(raw)['items']] == ['app-0', 'app-1']
+
+
+def test_benchmark_runs_offline_and_compares_with_a_baseline(tmp_path, capsys):
+    report_path = tmp_path / 'report.json'
+    args = ['--clients', '2', '--requests', '10', '--pods', '20', '--kubectl-latency', '0',
+            '--json', str(report_path)]
+    assert bench_visualizer.main(args) == 0
+
+    report = json.loads(report_path.read_text())
+    assert report['errors'] == 0
+    assert report['endpoints']['state']['count'] == 2 * (10 + 1)
+    assert report['endpoints']['static']['count'] == 2 * 3
+
+    baseline = json.loads(report_path.read_text())
+    assert bench_visualizer.compare(report, baseline, 0.25) == []
+    report['endpoints']['state']['p95_ms'] = 10.0
+    baseline['endpoints']['state']['p95_ms'] = 2.0
+    assert bench_visualizer.compare(report, baseline, 0.25) == ['state p95 ms: 2.00 -> 10.00']
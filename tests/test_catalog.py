@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for the level catalog index
+"""
+
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine import catalog as catalog_module
+from engine.catalog import build_index, load_catalog
+
+WORLDS = Path(__file__).parent.parent / "worlds"
+
+
+def copy_worlds(tmp_path, levels=("level-1-pods", "level-2-deployments", "level-10-namespace")):
+    worlds = tmp_path / "worlds"
+    for name in levels:
+        shutil.copytree(WORLDS / "world-1-basics" / name, worlds / "world-1-basics" / name)
+    shutil.copytree(WORLDS / "world-2-deployments" / "level-11-rollback",
+                    worlds / "world-2-deployments" / "level-11-rollback")
+    (worlds / "world-1-basics" / "QUICK-REFERENCE.md").write_text("not a level")
+    return worlds
+
+
+def test_index_covers_every_level_in_play_order():
+    catalog = load_catalog(WORLDS)
+    assert catalog.level_count == 50
+    assert catalog.total_xp == sum(world["xp"] for world in catalog.worlds)
+    assert [level["name"] for level in catalog.world_levels("world-1-basics")][-2:] == [
+        "level-9-initcontainer", "level-10-namespace"
+    ]
+
+    level = catalog.level("level-1-pods")
+    assert level["mission"]["xp"] == level["xp"] == 100
+    assert (level["hints"], level["debrief"], level["validator"], level["diagram"]) == (3, True, "yaml", True)
+    assert level["images"] and len(level["hash"]) == 64
+
+    assert catalog.next_level(catalog.path(catalog.world_levels("world-1-basics")[-1]))["world"] == \
+        "world-2-deployments"
+    assert catalog.next_level(catalog.levels[-1]["id"]) is None
+    assert catalog.world_of(31)["name"] == "world-4-storage"
+
+
+def test_cached_index_is_reused_until_a_level_file_changes(tmp_path, monkeypatch):
+    worlds = copy_worlds(tmp_path)
+    cache = tmp_path / "catalog.json"
+    builds = []
+    monkeypatch.setattr(catalog_module, "build_index",
+                        lambda *args: builds.append(args) or build_index(*args))
+    monkeypatch.setattr(catalog_module, "_loaded", {})
+
+    first = load_catalog(worlds)
+    assert cache.exists() and len(builds) == 1
+    assert [level["name"] for level in first.levels] == [
+        "level-1-pods", "level-2-deployments", "level-10-namespace", "level-11-rollback"
+    ]
+
+    # A new process reads the file instead of walking the levels again
+    monkeypatch.setattr(catalog_module, "_loaded", {})
+    assert load_catalog(worlds).index == first.index
+    assert len(builds) == 1
+
+    mission = worlds / "world-1-basics" / "level-1-pods" / "mission.yaml"
+    mission.write_text(mission.read_text().replace("xp: 100", "xp: 150"))
+    os.utime(mission, ns=(1, 1))
+    updated = load_catalog(worlds)
+    assert len(builds) == 2
+    assert updated.level("level-1-pods")["xp"] == 150
+    assert updated.level("level-1-pods")["hash"] != first.level("level-1-pods")["hash"]
+    assert json.loads(cache.read_text())["signature"] == updated.index["signature"]
+
+
+def test_unreadable_cache_is_rebuilt(tmp_path, monkeypatch):
+    worlds = copy_worlds(tmp_path)
+    monkeypatch.setattr(catalog_module, "_loaded", {})
+    (tmp_path / "catalog.json").write_text("{not json")
+    assert load_catalog(worlds).level_count == 4
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the visualizer background snapshot collector
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualizer.collector import SnapshotCollector
+from visualizer.server import etag_matches
+
+
+def test_etag_only_changes_with_content():
+    cluster = {'pods': [{'name': 'web-1'}], 'refresh': {'duration_ms': 1.0}}
+
+    def build():
+        cluster['refresh'] = {'duration_ms': cluster['refresh']['duration_ms'] + 1}
+        return dict(cluster)
+
+    collector = SnapshotCollector(build, game_state_callback=lambda: {'total_xp': 0})
+
+    assert collector.refresh() is True
+    body, etag = collector.current(timeout=0)
+    assert json.loads(body)['cluster']['pods'] == [{'name': 'web-1'}]
+
+    # Only the refresh timings moved, so the payload is reused as-is
+    assert collector.refresh() is False
+    assert collector.current(timeout=0) == (body, etag)
+
+    cluster['pods'] = []
+    assert collector.refresh() is True
+    assert collector.current(timeout=0)[1] != etag
+
+
+def test_game_state_refresh_skips_cluster():
+    calls = []
+    game = {'total_xp': 0}
+
+    def build():
+        calls.append(1)
+        return {'pods': []}
+
+    collector = SnapshotCollector(build, game_state_callback=lambda: dict(game))
+    collector.refresh()
+    game['total_xp'] = 100
+
+    assert collector.refresh(cluster=False) is True
+    assert len(calls) == 1
+    assert json.loads(collector.current(timeout=0)[0])['game']['total_xp'] == 100
+
+
+def test_game_ticks_do_not_serialize_the_cluster_again():
+    class CountingState(dict):
+        reads = 0
+
+        def items(self):
+            CountingState.reads += 1
+            return super().items()
+
+    collector = SnapshotCollector(lambda: CountingState(pods=[{'name': 'web-1'}]),
+                                  game_state_callback=lambda: {'total_xp': 0})
+    collector.refresh()
+    etag = collector.current(timeout=0)[1]
+    reads = CountingState.reads
+
+    for _ in range(5):
+        assert collector.refresh(cluster=False) is False
+    assert CountingState.reads == reads
+    assert collector.current(timeout=0)[1] == etag
+
+
+def test_current_times_out_before_first_refresh():
+    collector = SnapshotCollector(lambda: {})
+    assert collector.current(timeout=0) is None
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches('*', '"abc"')
+    assert not etag_matches('"def"', '"abc"')
+    assert not etag_matches(None, '"abc"')
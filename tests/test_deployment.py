@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for deploying a level in the background
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.deployment import BackgroundDeploy
+
+
+def test_progress_is_shown_only_while_the_deploy_is_still_running():
+    release = threading.Event()
+
+    def deploy(deployment):
+        deployment.report("Setting up namespace...")
+        release.wait(5)
+        deployment.warn("Warning: something odd")
+        deployment.report("Deploying broken resources...")
+        deployment.report("✅ Environment ready!")
+
+    deployment = BackgroundDeploy(deploy).start()
+    seen = []
+
+    def on_progress(step, description):
+        seen.append((step, description))
+        release.set()
+
+    deployment.wait(timeout=5, on_progress=on_progress)
+    assert deployment.done and seen
+    assert (deployment.step, deployment.description) == (3, "✅ Environment ready!")
+    assert deployment.warnings == ["Warning: something odd"]
+
+    # Already deployed by the time the player gets there: no progress at all
+    finished = BackgroundDeploy(lambda deployment: deployment.report("done", advance=5)).start()
+    finished.wait(timeout=5)
+    shown = []
+    finished.wait(on_progress=lambda *args: shown.append(args))
+    assert shown == [] and finished.step == finished.steps
+    assert finished.elapsed is not None
+
+
+def test_a_failed_deploy_raises_where_the_game_waits():
+    def deploy(deployment):
+        raise OSError("kubectl not found")
+
+    deployment = BackgroundDeploy(deploy).start()
+    with pytest.raises(OSError, match="kubectl not found"):
+        deployment.wait(timeout=5)
+
+
+def test_waiting_can_time_out():
+    release = threading.Event()
+    deployment = BackgroundDeploy(lambda deployment: release.wait(5)).start()
+    with pytest.raises(TimeoutError):
+        deployment.wait(timeout=0.2, on_progress=lambda *args: None)
+    release.set()
+    deployment.wait(timeout=5)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the precompiled level diagram registry
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualizer.templates.registry import DiagramError, DiagramRegistry, compile_diagram, parse_number
+
+
+def test_level_directory_names_resolve_to_their_diagram():
+    registry = DiagramRegistry()
+
+    entry = registry.get('world-1-basics', 'level-1-pods')
+    assert entry.source.endswith('level-1-pods/diagram.yaml')
+    assert json.loads(entry.body)['nodes'][0]['label'] == 'nginx-broken'
+    assert registry.errors == {}
+
+    # Levels without a diagram.yaml use the world's built-in template, compiled once
+    template = registry.get('world-2-deployments', 'level-12-liveness')
+    assert template.source == 'template'
+    assert 'World 2' in template.diagram['title']
+    assert registry.get('world-2-deployments', 'level-12-liveness') is template
+
+    assert registry.get('world-1-basics', None).source == 'default'
+
+
+def test_layout_is_precomputed_for_nodes_without_coordinates():
+    diagram = compile_diagram({
+        'nodes': [{'id': 'svc', 'type': 'service'}, {'id': 'a', 'type': 'pod'}, {'id': 'b', 'type': 'pod'}],
+        'connections': [{'from': 'svc', 'to': 'a'}, {'from': 'svc', 'to': 'b'}],
+    })
+    svc, a, b = diagram['nodes']
+    assert a['y'] == b['y'] > svc['y']
+    assert a['x'] < svc['x'] < b['x']
+
+
+def test_invalid_diagram_is_reported_not_served(tmp_path):
+    level = tmp_path / 'world-9-test' / 'level-90-broken'
+    level.mkdir(parents=True)
+    (level / 'mission.yaml').write_text("name: Broken diagram\nxp: 0\n")
+    (level / 'diagram.yaml').write_text("nodes:\n  - id: a\n    type: pod\nconnections:\n  - {from: a, to: b}\n")
+
+    registry = DiagramRegistry(tmp_path)
+    assert list(registry.errors) == [str(level / 'diagram.yaml')]
+    assert registry.get('world-9-test', 'level-90-broken').source == 'template'
+
+    with pytest.raises(DiagramError):
+        compile_diagram({'nodes': []})
+
+
+def test_parse_number():
+    assert parse_number('world-3-networking', 'world') == 3
+    assert parse_number('level-21-service-selector', 'level') == 21
+    assert parse_number(4, 'level') == 4
+    assert parse_number('bonus', 'level') is None
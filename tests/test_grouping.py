@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for pod grouping in the visualizer cluster state
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualizer.collector import SnapshotCollector
+from visualizer.grouping import collapse_pods, pods_in_group
+from visualizer.server import build_cluster_state
+from visualizer.snapshot import SNAPSHOT_KINDS, Snapshot
+
+
+def owned(kind, name):
+    return [{'kind': kind, 'name': name, 'controller': True}]
+
+
+def pod(name, owner=None, phase='Running', ready=True):
+    metadata = {'name': name, 'labels': {'app': 'web', 'pod-template-hash': 'abc'}}
+    if owner:
+        metadata['ownerReferences'] = owned('ReplicaSet', owner)
+    return {
+        'metadata': metadata,
+        'status': {
+            'phase': phase,
+            'conditions': [{'type': 'Ready', 'status': 'True' if ready else 'False'}],
+            'containerStatuses': [{'restartCount': 0, 'state': {'running': {}}}]
+        }
+    }
+
+
+def namespace(replicas, pending=0):
+    items = {key: [] for key in SNAPSHOT_KINDS}
+    items['replicasets'] = [{'metadata': {'name': 'web-abc', 'ownerReferences': owned('Deployment', 'web')}}]
+    items['pods'] = [pod(f'web-abc-{i}', 'web-abc') for i in range(replicas - pending)]
+    items['pods'] += [pod(f'web-abc-p{i}', 'web-abc', phase='Pending', ready=False) for i in range(pending)]
+    items['pods'].append(pod('debug'))
+    return Snapshot(items=items)
+
+
+def test_pods_are_grouped_by_owning_deployment():
+    state = build_cluster_state(namespace(40, pending=3))
+    group, = state['pod_groups']
+
+    assert group['id'] == 'Deployment/web'
+    assert group['count'] == 40
+    assert group['health'] == {'ready': 37, 'not_ready': 0, 'pending': 3, 'failed': 0}
+    assert group['issues'] == [{'issue': 'Pod not ready', 'pods': 3}]
+
+    view = collapse_pods(state)
+    assert [p['name'] for p in view['pods']] == ['debug']
+    assert view['pod_groups'][0]['collapsed'] is True
+    assert len(pods_in_group(state, 'Deployment/web')) == 40
+    assert pods_in_group(state, 'Deployment/api') is None
+
+
+def test_small_groups_stay_expanded():
+    view = collapse_pods(build_cluster_state(namespace(3)))
+    assert len(view['pods']) == 4
+    assert view['pod_groups'][0]['collapsed'] is False
+
+
+def test_payload_stays_flat_as_replicas_grow():
+    sizes = [len(json.dumps(collapse_pods(build_cluster_state(namespace(n))))) for n in (50, 500)]
+    assert sizes[1] - sizes[0] < 16
+
+
+def test_collector_publishes_the_view_and_keeps_the_detail():
+    collector = SnapshotCollector(lambda: build_cluster_state(namespace(100)), view=collapse_pods)
+    collector.refresh()
+
+    body, _ = collector.current()
+    assert len(json.loads(body)['cluster']['pods']) == 1
+    assert len(collector.detail()['pods']) == 101
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the visualizer worker-pool HTTP server
+"""
+
+import http.client
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualizer.http_pool import PooledHTTPServer, PooledRequestMixin
+
+
+class EchoHandler(PooledRequestMixin, BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = self.path.encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_keep_alive_connections_share_a_small_pool():
+    server = PooledHTTPServer(('localhost', 0), EchoHandler, workers=2)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+
+    try:
+        # More open keep-alive connections than workers
+        conns = [http.client.HTTPConnection('localhost', port, timeout=5) for _ in range(5)]
+        for round_number in range(3):
+            for i, conn in enumerate(conns):
+                conn.request('GET', f'/{round_number}/{i}')
+                response = conn.getresponse()
+                assert response.status == 200
+                assert response.read() == f'/{round_number}/{i}'.encode()
+
+        # Every connection was reused rather than reopened
+        assert all(conn.sock is not None for conn in conns)
+        for conn in conns:
+            conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
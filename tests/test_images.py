@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the level image manifest and background pre-pull
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from kubectl_runner import FakeKubectl, failed
+from engine.images import CACHED, FAILED, ImagePrepuller, level_images, manifest_images
+
+WORLDS = Path(__file__).parent.parent / "worlds"
+
+
+class FakeCluster(FakeKubectl):
+    """Two nodes whose kubelets pull an image on the second look at its pod"""
+
+    def __init__(self, broken=()):
+        super().__init__()
+        self.broken = set(broken)
+        self.pods = {}
+        self.looks = {}
+        ready = [{"type": "Ready", "status": "True"}]
+        self.on("create", "namespace")(lambda args, input: None)
+        self.on("get", "nodes")(lambda args, input: {"items": [
+            {"metadata": {"name": "kind-control-plane"}, "status": {"conditions": ready}},
+            {"metadata": {"name": "kind-worker"}, "status": {"conditions": ready}},
+            {"metadata": {"name": "cordoned"}, "spec": {"unschedulable": True}, "status": {"conditions": ready}},
+        ]})
+        self.on("create", "-f")(self.create)
+        self.on("get", "pods")(self.get_pods)
+        self.on("delete", "pods")(self.delete_pods)
+
+    def create(self, args, input):
+        for pod in json.loads(input)["items"]:
+            self.pods[pod["metadata"]["name"]] = pod
+
+    def get_pods(self, args, input):
+        for name, pod in self.pods.items():
+            self.looks[name] = self.looks.get(name, 0) + 1
+            image = pod["spec"]["containers"][0]["image"]
+            if self.looks[name] < 2:
+                state = {"waiting": {"reason": "ContainerCreating"}}
+            elif image in self.broken:
+                state = {"waiting": {"reason": "ErrImagePull"}}
+            else:
+                state = {"terminated": {"reason": "Completed"}}
+            pod["status"] = {"containerStatuses": [{"name": "pull", "state": state}]}
+        return {"items": list(self.pods.values())}
+
+    def delete_pods(self, args, input):
+        for name in args:
+            self.pods.pop(name, None)
+
+
+def test_images_come_from_broken_and_solution_manifests():
+    assert manifest_images("""
+kind: CronJob
+spec:
+  jobTemplate:
+    spec:
+      template:
+        spec:
+          initContainers: [{name: init, image: busybox:1.36}]
+          containers: [{name: app, image: nginx:1.21}, {name: sidecar, image: busybox:1.36}]
+""") == ["busybox:1.36", "nginx:1.21"]
+
+    assert "nginx:nonexistent-tag-xyz-123" in level_images(WORLDS / "world-1-basics" / "level-3-imagepull")
+
+
+def test_images_are_pulled_on_every_schedulable_node(tmp_path):
+    level = tmp_path / "level-1-demo"
+    level.mkdir()
+    (level / "broken.yaml").write_text(
+        "kind: Pod\nspec:\n  containers: [{name: a, image: nginx:1.21}, {name: b, image: nginx:bad-tag}]\n"
+    )
+    cluster = FakeCluster(broken={"nginx:bad-tag"})
+    prepuller = ImagePrepuller(runner=cluster, poll_interval=0.01)
+
+    prepuller.prepull(level)
+    prepuller.wait(timeout=5)
+
+    assert prepuller.status == {"nginx:1.21": CACHED, "nginx:bad-tag": FAILED}
+    assert prepuller.describe() == "level-1-demo: 1/2 cached, 1 unavailable"
+    created = [call for call in cluster.calls if call[:2] == ["create", "-f"]]
+    assert len(created) == 1
+    assert cluster.pods == {}  # cleaned up
+
+    # Cached images are not pulled again
+    prepuller.prepull(level)
+    prepuller.wait(timeout=5)
+    assert len([call for call in cluster.calls if call[:2] == ["create", "-f"]]) == 1
+
+
+def test_an_unreachable_cluster_is_reported_not_raised(tmp_path):
+    level = tmp_path / "level-1-demo"
+    level.mkdir()
+    (level / "broken.yaml").write_text("kind: Pod\nspec:\n  containers: [{name: a, image: nginx}]\n")
+    unreachable = FakeKubectl()
+    unreachable.on()(lambda args, input: failed(args, "connection refused"))
+    prepuller = ImagePrepuller(runner=unreachable)
+    prepuller.prepull(level)
+    prepuller.wait(timeout=5)
+    assert prepuller.describe() == "unavailable (connection refused)"
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the visualizer watch-based informer cache
+"""
+
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualizer.informer import NamespaceInformer, ResyncRequired, compact
+from visualizer.snapshot import SNAPSHOT_KINDS
+
+
+def pod(name, rv, app='web'):
+    return {
+        'metadata': {
+            'name': name,
+            'resourceVersion': rv,
+            'labels': {'app': app},
+            'managedFields': [{'manager': 'kubectl'}],
+            'annotations': {'kubectl.kubernetes.io/last-applied-configuration': '{}'}
+        },
+        'status': {'phase': 'Running'}
+    }
+
+
+class FakeProcess:
+    def __init__(self, events, returncode=0):
+        self.stdout = io.StringIO(''.join(json.dumps(e) + '\n' for e in events))
+        self.returncode = returncode
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        pass
+
+    def wait(self):
+        return self.returncode
+
+
+def make_informer(pods, events=()):
+    calls = []
+
+    def runner(args):
+        calls.append(args)
+        items = pods if args[-1].endswith('/pods') else []
+        return json.dumps({'metadata': {'resourceVersion': '10'}, 'items': items})
+
+    informer = NamespaceInformer(runner=runner, popen=lambda *a, **kw: FakeProcess(events))
+    return informer, calls
+
+
+def test_compact_strips_bulky_fields_and_interns_labels():
+    a = compact(pod('web-1', '1'), 'Pod')
+    b = compact(json.loads(json.dumps(pod('web-2', '2'))), 'Pod')
+
+    assert 'managedFields' not in a['metadata']
+    assert 'annotations' not in a['metadata']
+    assert a['kind'] == 'Pod'
+    key_a, value_a = next(iter(a['metadata']['labels'].items()))
+    key_b, value_b = next(iter(b['metadata']['labels'].items()))
+    assert key_a is key_b
+    assert value_a is value_b
+
+
+def test_watch_events_update_store():
+    informer, calls = make_informer([pod('web-1', '5')], events=[
+        {'type': 'ADDED', 'object': pod('web-2', '11')},
+        {'type': 'DELETED', 'object': pod('web-1', '12')},
+        {'type': 'BOOKMARK', 'object': {'metadata': {'resourceVersion': '13'}}},
+    ])
+
+    informer.relist('pods')
+    assert informer.store.resource_versions['pods'] == '10'
+
+    informer._stream('pods')
+    names = [p['metadata']['name'] for p in informer.snapshot().get('pods')]
+    assert names == ['web-2']
+    assert informer.store.resource_versions['pods'] == '13'
+    assert len(calls) == 1
+
+
+def test_gone_event_requires_resync():
+    informer, _ = make_informer([])
+    with pytest.raises(ResyncRequired):
+        informer.handle_event('pods', {'type': 'ERROR', 'object': {'code': 410, 'message': 'too old'}})
+
+
+def test_synced_after_every_kind_is_listed():
+    informer, calls = make_informer([pod('web-1', '5')])
+    for key in ['pods', 'services']:
+        informer.relist(key)
+    assert not informer.synced
+
+    for key in SNAPSHOT_KINDS:
+        informer.relist(key)
+    assert informer.synced
+    assert informer.snapshot().source == 'watch'
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Tests for the Kubernetes REST client, against a local API server stand-in
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualizer.informer import NamespaceInformer
+from visualizer.kube_client import ApiError, KubeClient, KubeConfigError, load_kubeconfig
+from visualizer.snapshot import SNAPSHOT_KINDS, SnapshotBuilder
+
+TOKEN = 'test-token'
+RESOURCES = {resource for resource, _ in SNAPSHOT_KINDS.values()}
+
+# Recorded responses, keyed by request path
+RECORDED = {
+    '/api/v1/namespaces/k8squest/pods': {
+        'kind': 'PodList',
+        'metadata': {'resourceVersion': '120'},
+        'items': [{'metadata': {'name': 'web-1', 'resourceVersion': '118'}, 'status': {'phase': 'Running'}}]
+    },
+    '/api/v1/namespaces/k8squest/pods/web-1': {
+        'kind': 'Pod',
+        'metadata': {'name': 'web-1'},
+        'status': {'phase': 'Running'}
+    },
+    '/apis/networking.k8s.io/v1/namespaces/k8squest/ingresses': {
+        'kind': 'Status', 'code': 403, 'message': 'ingresses is forbidden'
+    },
+}
+# Collections served a page at a time, honouring limit and continue
+PAGED = {
+    '/api/v1/namespaces/k8squest/configmaps': [
+        {'metadata': {'name': f'config-{i}', 'resourceVersion': str(200 + i)}} for i in range(5)
+    ],
+}
+WATCH_EVENTS = [
+    {'type': 'ADDED', 'object': {'metadata': {'name': 'web-2', 'resourceVersion': '121'}}},
+    {'type': 'BOOKMARK', 'object': {'metadata': {'resourceVersion': '125'}}},
+]
+
+
+class FakeApiServer(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        self.server.accepts.append(self.headers.get('Accept'))
+        self.server.peers.add(self.client_address)
+        if self.headers.get('Authorization') != f'Bearer {TOKEN}':
+            return self.reply(401, {'kind': 'Status', 'code': 401, 'message': 'Unauthorized'})
+
+        path, _, query = self.path.partition('?')
+        if 'watch=1' in query:
+            body = ''.join(json.dumps(e) + '\n' for e in WATCH_EVENTS).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for line in body.splitlines(keepends=True):
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(line), line))
+            self.wfile.write(b'0\r\n\r\n')
+            return
+
+        if path in PAGED:
+            params = parse_qs(query)
+            start = int(params.get('continue', ['0'])[0])
+            end = start + int(params.get('limit', ['500'])[0])
+            metadata = {'resourceVersion': '210'}
+            if end < len(PAGED[path]):
+                metadata['continue'] = str(end)
+            return self.reply(200, {'kind': 'PartialObjectMetadataList', 'metadata': metadata,
+                                    'items': PAGED[path][start:end]})
+        if path in RECORDED:
+            data = RECORDED[path]
+            return self.reply(data.get('code', 200), data)
+        if path.rpartition('/')[2] in RESOURCES:
+            return self.reply(200, {'kind': 'List', 'metadata': {'resourceVersion': '1'}, 'items': []})
+        self.reply(404, {'kind': 'Status', 'code': 404, 'message': f'{path} not found'})
+
+    def reply(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def api_server():
+    server = ThreadingHTTPServer(('localhost', 0), FakeApiServer)
+    server.requests = []
+    server.accepts = []
+    server.peers = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def write_kubeconfig(path, server, user):
+    path.write_text(json.dumps({
+        'apiVersion': 'v1',
+        'kind': 'Config',
+        'current-context': 'kind-k8squest',
+        'contexts': [{'name': 'kind-k8squest', 'context': {'cluster': 'kind', 'user': 'player'}}],
+        'clusters': [{'name': 'kind', 'cluster': {'server': server}}],
+        'users': [{'name': 'player', 'user': user}],
+    }))
+    return path
+
+
+def make_client(api_server, tmp_path):
+    url = f'http://localhost:{api_server.server_address[1]}'
+    return KubeClient.from_kubeconfig(write_kubeconfig(tmp_path / 'config', url, {'token': TOKEN}))
+
+
+def test_list_reuses_one_pooled_connection(api_server, tmp_path):
+    client = make_client(api_server, tmp_path)
+
+    for _ in range(5):
+        pods = client.get('/api/v1/namespaces/k8squest/pods')
+    assert [p['metadata']['name'] for p in pods['items']] == ['web-1']
+    assert client.get('/api/v1/namespaces/k8squest/pods/web-1')['status']['phase'] == 'Running'
+
+    assert client.connections_opened == 1
+    assert len(api_server.peers) == 1
+
+
+def test_error_status_raises_api_error(api_server, tmp_path):
+    client = make_client(api_server, tmp_path)
+
+    with pytest.raises(ApiError) as excinfo:
+        client.get('/api/v1/namespaces/k8squest/pods/missing')
+    assert excinfo.value.status == 404
+    # The connection survives an error response
+    client.get('/api/v1/namespaces/k8squest/pods')
+    assert client.connections_opened == 1
+
+
+def test_list_follows_continue_tokens(api_server, tmp_path):
+    client = make_client(api_server, tmp_path)
+
+    configmaps = client.list('/api/v1/namespaces/k8squest/configmaps', limit=2, metadata_only=True)
+
+    assert [c['metadata']['name'] for c in configmaps['items']] == [f'config-{i}' for i in range(5)]
+    assert configmaps['metadata'] == {'resourceVersion': '210'}
+    assert len(api_server.requests) == 3
+    assert all('as=PartialObjectMetadataList' in accept for accept in api_server.accepts)
+    assert client.connections_opened == 1
+
+
+def test_watch_yields_event_lines(api_server, tmp_path):
+    client = make_client(api_server, tmp_path)
+
+    stream = client.watch('/api/v1/namespaces/k8squest/pods', resource_version='120')
+    events = [json.loads(line) for line in stream]
+    stream.close()
+
+    assert [e['type'] for e in events] == ['ADDED', 'BOOKMARK']
+    assert stream.returncode == 0
+    assert 'resourceVersion=120' in api_server.requests[-1]
+
+
+def test_builder_lists_every_kind_from_the_api_server(api_server, tmp_path):
+    kubectl_calls = []
+    builder = SnapshotBuilder(client=make_client(api_server, tmp_path),
+                              runner=lambda args, timeout=None: kubectl_calls.append(args))
+    snapshot = builder.build()
+
+    assert snapshot.source == 'api'
+    assert snapshot.api_calls == len(SNAPSHOT_KINDS)
+    assert kubectl_calls == []
+    assert [p['metadata']['name'] for p in snapshot.get('pods')] == ['web-1']
+    assert snapshot.kind_status['pods']['status'] == 'fresh'
+    assert snapshot.kind_status['ingresses']['status'] == 'failed'
+    assert 'forbidden' in snapshot.kind_status['ingresses']['error']
+    assert len(snapshot.get('configmaps')) == 5
+    # Only ConfigMaps and Secrets are listed as metadata
+    partial = [path for path, accept in zip(api_server.requests, api_server.accepts)
+               if 'PartialObjectMetadataList' in accept]
+    assert sorted(path.partition('?')[0].rpartition('/')[2] for path in partial) == ['configmaps', 'secrets']
+
+
+def test_builder_falls_back_to_kubectl_when_api_is_unreachable(tmp_path):
+    kubectl_calls = []
+
+    def runner(args, timeout=None):
+        kubectl_calls.append(args)
+        return json.dumps({'items': []})
+
+    # Nothing listens on port 9 (discard); connections are refused
+    client = KubeClient('http://localhost:9', timeout=1)
+    snapshot = SnapshotBuilder(client=client, runner=runner).build()
+
+    assert snapshot.source == 'list'
+    assert len(kubectl_calls) == 1
+
+
+def test_informer_relists_and_watches_over_the_client(api_server, tmp_path):
+    informer = NamespaceInformer(client=make_client(api_server, tmp_path),
+                                 runner=None, popen=None)
+    informer.relist('pods')
+    assert informer.store.resource_versions['pods'] == '120'
+
+    informer._stream('pods')
+    names = sorted(p['metadata']['name'] for p in informer.snapshot().get('pods'))
+    assert names == ['web-1', 'web-2']
+    assert informer.store.resource_versions['pods'] == '125'
+
+
+def test_kubeconfig_with_exec_plugin_needs_kubectl(tmp_path):
+    config = write_kubeconfig(tmp_path / 'config', 'https://127.0.0.1:6443',
+                              {'exec': {'command': 'aws', 'args': ['eks', 'get-token']}})
+    with pytest.raises(KubeConfigError):
+        load_kubeconfig(config)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for the snapshot-backed kubectl shim used while validate.sh runs
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.kubectl_shim import KubectlShim, parse_get
+
+LEVEL_1 = Path(__file__).parent.parent / "worlds" / "world-1-basics" / "level-1-pods"
+
+# Stands in for the real kubectl: logs every call and lists objects from a fixture file
+REAL_KUBECTL = '''#!/usr/bin/env python3
+import json, os, sys
+args = sys.argv[1:]
+with open(os.environ["FIXTURE_LOG"], "a") as f:
+    f.write(" ".join(args) + "\\n")
+    if args[-2:] == ["-f", "-"]:
+        f.write(sys.stdin.read())
+fixture = json.load(open(os.environ["FIXTURE"]))
+if args[0] == "get" and "-o" in args and args[args.index("-o") + 1] == "json":
+    if "-n" in args:
+        items = fixture["namespaced"].get(args[args.index("-n") + 1], [])
+    else:
+        resource = args[1].split(".")[0]
+        items = [i for i in fixture["cluster"] if resource.startswith(i["kind"].lower())]
+    print(json.dumps({"apiVersion": "v1", "kind": "List", "items": items}))
+else:
+    print("real kubectl: " + " ".join(args))
+'''
+
+
+def pod(name, labels=None, phase="Running", ready=True):
+    return {
+        "apiVersion": "v1", "kind": "Pod",
+        "metadata": {"name": name, "namespace": "k8squest", "labels": labels or {}},
+        "spec": {"containers": [{"name": "nginx", "image": "nginx"}]},
+        "status": {
+            "phase": phase,
+            "conditions": [{"type": "Ready", "status": "True" if ready else "False"}],
+            "containerStatuses": [{"name": "nginx", "ready": ready}],
+        },
+    }
+
+
+def install_real_kubectl(tmp_path, monkeypatch, namespaced, cluster=()):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    kubectl = bin_dir / "kubectl"
+    kubectl.write_text(REAL_KUBECTL.replace("/usr/bin/env python3", sys.executable, 1))
+    kubectl.chmod(0o755)
+    fixture = tmp_path / "fixture.json"
+    fixture.write_text(json.dumps({"namespaced": namespaced, "cluster": list(cluster)}))
+    log = tmp_path / "calls.log"
+    log.write_text("")
+    monkeypatch.setenv("PATH", f"{bin_dir}:{Path(sys.executable).parent}:/usr/bin:/bin")
+    monkeypatch.setenv("FIXTURE", str(fixture))
+    monkeypatch.setenv("FIXTURE_LOG", str(log))
+    return log
+
+
+def run(args, shim):
+    return subprocess.run(["bash"] + args, capture_output=True, text=True, env=shim.env)
+
+
+def test_get_arguments_the_shim_answers():
+    request = parse_get(["get", "deploy/web", "-nk8squest", "-o=jsonpath={.status.readyReplicas}"])
+    assert (request.kind, request.names, request.namespace) == ("Deployment", ["web"], "k8squest")
+    assert parse_get(["get", "pv", "data", "-o", "json", "-n", "k8squest"]).namespace is None
+    assert parse_get(["get", "pods", "-n", "k8squest", "-l", "app==web", "-o", "name"]).selector == {"app": "web"}
+
+    # Left to real kubectl
+    assert parse_get(["get", "pods", "-n", "k8squest"]) is None  # table output
+    assert parse_get(["get", "pods", "-n", "k8squest"], stdout_discarded=True) is not None
+    assert parse_get(["get", "pods", "-o", "json"]) is None  # context namespace
+    assert parse_get(["get", "pods", "-n", "k8squest", "-w", "-o", "json"]) is None
+    assert parse_get(["get", "pods,svc", "-n", "k8squest", "-o", "json"]) is None
+    assert parse_get(["get", "widgets", "-n", "k8squest", "-o", "json"]) is None
+    assert parse_get(["get", "pods", "-n", "k8squest", "-o", "yaml"]) is None
+    assert parse_get(["delete", "pod", "x", "-n", "k8squest"]) is None
+
+
+def test_level_script_runs_on_one_snapshot(tmp_path, monkeypatch):
+    log = install_real_kubectl(tmp_path, monkeypatch, {"k8squest": [pod("nginx-broken")]})
+
+    with KubectlShim(enabled=True) as shim:
+        result = run([str(LEVEL_1 / "validate.sh")], shim)
+        stats = shim.stats()
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "Level complete" in result.stdout
+    calls = log.read_text().splitlines()
+    assert len(calls) == 1 and calls[0].startswith("get pods,services,endpoints,")
+    assert stats == {"hit": 4, "pass": 0, "snapshot": 1}
+
+
+def test_answers_match_kubectl_and_writes_refresh_the_snapshot(tmp_path, monkeypatch):
+    log = install_real_kubectl(
+        tmp_path, monkeypatch,
+        {"k8squest": [pod("web-0", {"app": "web"}), pod("web-1", {"app": "web"}, ready=False), pod("db")]},
+        cluster=[{"apiVersion": "v1", "kind": "PersistentVolume", "metadata": {"name": "data"},
+                  "status": {"phase": "Bound"}}],
+    )
+    script = r'''
+set -e
+kubectl get pods -n k8squest -l app=web -o jsonpath='{range .items[*]}{.metadata.name}:{.status.conditions[?(@.type=="Ready")].status}{"\n"}{end}'
+kubectl get pods -n k8squest -l app=web -o name
+kubectl get pv data -o jsonpath='{.status.phase}'; echo
+kubectl get pod missing -n k8squest -o jsonpath='{.status.phase}' 2>&1 || echo "exit $?"
+kubectl get pod missing -n k8squest --ignore-not-found -o json
+kubectl get pod db -n k8squest -o json | python -c "import json,sys; print(json.load(sys.stdin)['metadata']['name'])"
+kubectl apply -f fixed.yaml
+kubectl get pod db -n k8squest &>/dev/null && echo "db exists"
+'''
+    with KubectlShim(enabled=True) as shim:
+        result = run(["-c", script], shim)
+        stats = shim.stats()
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines() == [
+        "web-0:True",
+        "web-1:False",
+        "pod/web-0",
+        "pod/web-1",
+        "Bound",
+        'Error from server (NotFound): pods "missing" not found',
+        "exit 1",
+        "db",
+        "real kubectl: apply -f fixed.yaml",
+        "db exists",
+    ]
+    calls = log.read_text().splitlines()
+    # Namespace, PVs, the apply, then the namespace again after the write
+    assert [c.split()[0] + " " + c.split()[1].split(",")[0] for c in calls] == [
+        "get pods", "get persistentvolumes", "apply -f", "get pods"
+    ]
+    assert stats == {"hit": 7, "pass": 1, "snapshot": 3}
+
+
+def test_scripts_follow_the_pool_namespace(tmp_path, monkeypatch):
+    log = install_real_kubectl(tmp_path, monkeypatch, {})
+    script = r'''
+cat <<EOF | kubectl apply -f -
+apiVersion: v1
+kind: Pod
+metadata:
+  name: dns-test
+  namespace: k8squest
+spec:
+  containers: [{name: busybox, image: busybox:1.28}]
+EOF
+kubectl exec -n k8squest dns-test -- nslookup web-0.web-cluster.k8squest.svc.cluster.local
+'''
+    with KubectlShim(enabled=False, namespace="k8squest-ab12cd") as shim:
+        result = run(["-c", script], shim)
+
+    assert result.returncode == 0, result.stderr
+    calls = log.read_text()
+    assert "namespace: k8squest-ab12cd" in calls and "namespace: k8squest\n" not in calls
+    assert calls.splitlines()[-1] == (
+        "exec -n k8squest-ab12cd dns-test -- nslookup web-0.web-cluster.k8squest-ab12cd.svc.cluster.local"
+    )
+
+
+def test_shim_is_skipped_without_kubectl(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path))
+    with KubectlShim(enabled=True) as shim:
+        assert shim.env is None
+    with KubectlShim(enabled=False) as shim:
+        assert shim.env is None
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the visualizer's /metrics endpoint
+"""
+
+import http.client
+import sys
+import threading
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualizer.collector import SnapshotCollector
+from visualizer.http_pool import PooledHTTPServer
+from visualizer.metrics import Registry, kubectl_resource, resource_of
+from visualizer.server import K8sQuestVisualizerHandler, get_k8s_cluster_state
+from visualizer.snapshot import SNAPSHOT_KINDS, Snapshot
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram('request_seconds', 'Request latency', ('client',), buckets=(0.01, 0.1))
+    for value in (0.005, 0.05, 0.05, 3):
+        latency.labels('api').observe(value)
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ['# HELP request_seconds Request latency', '# TYPE request_seconds histogram']
+    assert 'request_seconds_bucket{client="api",le="0.01"} 1' in lines
+    assert 'request_seconds_bucket{client="api",le="0.1"} 3' in lines
+    assert 'request_seconds_bucket{client="api",le="+Inf"} 4' in lines
+    assert 'request_seconds_count{client="api"} 4' in lines
+    assert 'request_seconds_sum{client="api"} 3.105' in lines
+
+
+def test_counters_and_callback_gauges():
+    registry = Registry()
+    hits = registry.counter('cache_requests_total', 'Cache lookups', ('result',))
+    hits.labels('hit').inc()
+    hits.labels('hit').inc()
+    hits.labels('miss').inc()
+    registry.gauge('clients', 'Connected clients', callback=lambda: 3)
+
+    lines = registry.render().splitlines()
+    assert 'cache_requests_total{result="hit"} 2' in lines
+    assert 'cache_requests_total{result="miss"} 1' in lines
+    assert 'clients 3' in lines
+
+
+def test_request_labels_stay_low_cardinality():
+    assert resource_of('/api/v1/namespaces/k8squest/pods/web-1') == 'pods'
+    assert resource_of('/apis/apps/v1/namespaces/k8squest/deployments?limit=500') == 'deployments'
+    assert resource_of('/api/v1/nodes') == 'nodes'
+    assert kubectl_resource(['get', 'pods,services', '-n', 'k8squest']) == 'all'
+    assert kubectl_resource(['get', '--raw', '/api/v1/namespaces/k8squest/endpoints']) == 'endpoints'
+
+
+def test_metrics_endpoint_reports_refreshes_and_requests():
+    class Builder:
+        def build(self):
+            return Snapshot(items={key: [] for key in SNAPSHOT_KINDS}, source='list')
+
+    collector = SnapshotCollector(lambda: get_k8s_cluster_state(builder=Builder()))
+    collector.refresh()
+    server = PooledHTTPServer(('localhost', 0), K8sQuestVisualizerHandler, workers=2)
+    server.verbose = False
+    server.collector = collector
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        conn = http.client.HTTPConnection('localhost', server.server_address[1], timeout=5)
+        conn.request('GET', '/api/state')
+        first = conn.getresponse()
+        first.read()
+        etag = first.getheader('ETag')
+        conn.request('GET', '/api/state', headers={'If-None-Match': etag})
+        conn.getresponse().read()
+        conn.request('GET', '/metrics')
+        response = conn.getresponse()
+        text = response.read().decode()
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert response.getheader('Content-type').startswith('text/plain; version=0.0.4')
+    assert 'k8squest_cache_requests_total{cache="state",result="hit"} 1' in text
+    assert 'k8squest_snapshot_refreshes_total{result="changed"}' in text
+    assert 'k8squest_snapshot_build_seconds_count{source="list"}' in text
+    assert 'k8squest_issue_detection_seconds_count' in text
+    assert 'k8squest_response_bytes_bucket{endpoint="state",le="+Inf"}' in text
+    assert 'process_resident_memory_bytes' in text
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Tests for the warm namespace pool and rebinding levels into it
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from kubectl_runner import FakeKubectl, failed
+from engine.kubectl_shim import rebind_namespace
+from engine.namespace_pool import (
+    ACTIVE, POOL_LABEL, RETIRED, WARM, NamespacePool, localize_text, rebind_manifest
+)
+from engine.validation import load_checks
+
+WORLDS = Path(__file__).parent.parent / "worlds"
+
+
+class FakeCluster(FakeKubectl):
+    """Just enough of kubectl's namespace handling to drive the pool"""
+
+    def __init__(self, stuck=()):
+        super().__init__()
+        self.namespaces = {}
+        self.stuck = set(stuck)
+        self.on("get", "namespaces")(self.list_namespaces)
+        self.on("get", "namespace")(self.get_namespace)
+        self.on("create", "-f")(self.create)
+        self.on("label")(self.set_metadata)
+        self.on("annotate")(self.set_metadata)
+        self.on("delete", "namespace")(self.delete_namespace)
+
+    def add(self, name, state, **extra):
+        self.namespaces[name] = dict({"metadata": {"name": name, "labels": {POOL_LABEL: state}},
+                                      "status": {"phase": "Active"}}, **extra)
+
+    def state(self, name):
+        return self.namespaces[name]["metadata"]["labels"][POOL_LABEL]
+
+    def create(self, args, input):
+        metadata = json.loads(input)["metadata"]
+        self.add(metadata["name"], metadata["labels"][POOL_LABEL])
+
+    def list_namespaces(self, args, input):
+        _, _, wanted = args[3].partition("=")
+        return {"items": [ns for ns in self.namespaces.values()
+                          if not wanted or ns["metadata"]["labels"].get(POOL_LABEL) == wanted]}
+
+    def get_namespace(self, args, input):
+        if args[2] not in self.namespaces:
+            return failed(args, f'namespaces "{args[2]}" not found')
+        return self.namespaces[args[2]]
+
+    def set_metadata(self, args, input):
+        metadata = self.namespaces[args[2]]["metadata"]
+        field = metadata.setdefault("labels" if args[0] == "label" else "annotations", {})
+        for pair in args[3:]:
+            key, _, value = pair.partition("=")
+            if value:
+                field[key] = value
+
+    def delete_namespace(self, args, input):
+        if args[2] in self.stuck:
+            self.namespaces[args[2]]["status"] = {"phase": "Terminating", "conditions": [
+                {"type": "NamespaceFinalizersRemaining", "status": "True",
+                 "message": "Some content has finalizers remaining: example.com/hold"}]}
+            self.namespaces[args[2]]["spec"] = {"finalizers": ["kubernetes"]}
+        else:
+            self.namespaces.pop(args[2], None)
+
+
+def test_manifests_are_rebound_to_the_pool_namespace():
+    manifest = """
+apiVersion: v1
+kind: Namespace
+metadata:
+  name: k8squest
+---
+apiVersion: v1
+kind: ConfigMap
+metadata:
+  name: settings
+  namespace: k8squest
+data:
+  url: http://backend.k8squest.svc.cluster.local
+---
+apiVersion: rbac.authorization.k8s.io/v1
+kind: RoleBinding
+metadata:
+  name: reader
+subjects:
+- kind: ServiceAccount
+  name: app
+  namespace: k8squest
+---
+apiVersion: v1
+kind: Pod
+metadata:
+  name: elsewhere
+  namespace: kube-system
+"""
+    docs = list(yaml.safe_load_all(rebind_manifest(manifest, "k8squest-ab12cd")))
+    assert [d["kind"] for d in docs] == ["ConfigMap", "RoleBinding", "Pod"]
+    assert docs[0]["metadata"]["namespace"] == "k8squest-ab12cd"
+    assert docs[0]["data"]["url"] == "http://backend.k8squest-ab12cd.svc.cluster.local"
+    assert docs[1]["metadata"]["namespace"] == "k8squest-ab12cd"
+    assert docs[1]["subjects"][0]["namespace"] == "k8squest-ab12cd"
+    assert docs[2]["metadata"]["namespace"] == "kube-system"
+
+    for broken in WORLDS.glob("*/*/broken.yaml"):
+        for doc in yaml.safe_load_all(rebind_manifest(broken.read_text(), "k8squest-ab12cd")):
+            assert doc["metadata"].get("namespace") != "k8squest", broken
+
+
+def test_pool_namespace_gets_the_labels_of_the_dropped_k8squest_namespace():
+    broken = (WORLDS / "world-5-security" / "level-48-pod-security" / "broken.yaml").read_text()
+    assert [doc["kind"] for doc in yaml.safe_load_all(rebind_manifest(broken, "k8squest-ab12cd"))] == ["Pod"]
+
+    cluster = FakeCluster()
+    pool = NamespacePool(runner=cluster)
+    name = pool.acquire(background=False)
+    pool.configure(name, broken)
+    labels = cluster.namespaces[name]["metadata"]["labels"]
+    assert labels["pod-security.kubernetes.io/enforce"] == "restricted"
+    assert labels[POOL_LABEL] == ACTIVE
+
+    # Levels without a Namespace object leave the pool namespace alone
+    calls = len(cluster.calls)
+    pool.configure(name, (WORLDS / "world-1-basics" / "level-1-pods" / "broken.yaml").read_text())
+    assert len(cluster.calls) == calls
+
+
+def test_hints_and_commands_point_at_the_active_namespace():
+    text = "Run `kubectl get pods -n k8squest` or use --namespace=k8squest; curl web.k8squest.svc"
+    assert localize_text(text, "k8squest-1") == (
+        "Run `kubectl get pods -n k8squest-1` or use --namespace=k8squest-1; curl web.k8squest-1.svc"
+    )
+    assert localize_text("Welcome to k8squest!", "k8squest-1") == "Welcome to k8squest!"
+    assert localize_text(text, "k8squest") == text
+
+    assert rebind_namespace(["get", "pods", "-n", "k8squest", "-o", "json"], "k8squest-1") == [
+        "get", "pods", "-n", "k8squest-1", "-o", "json"
+    ]
+    assert rebind_namespace(["get", "pods", "-nk8squest", "--namespace=k8squest"], "k8squest-1") == [
+        "get", "pods", "-nk8squest-1", "--namespace=k8squest-1"
+    ]
+    assert rebind_namespace(["get", "pod", "k8squest", "-n", "default"], "k8squest-1") == [
+        "get", "pod", "k8squest", "-n", "default"
+    ]
+
+    checks, _ = load_checks(WORLDS / "world-1-basics" / "level-1-pods" / "validate.yaml", "k8squest-1")
+    assert {check.namespace for check in checks} == {"k8squest-1"}
+
+
+def test_acquire_takes_a_warm_namespace_and_retires_the_old_one():
+    cluster = FakeCluster()
+    cluster.add("k8squest-old", ACTIVE)
+    cluster.add("k8squest-warm", WARM)
+    pool = NamespacePool(size=2, runner=cluster, poll_interval=0.01)
+
+    assert pool.acquire() == "k8squest-warm"
+    pool.wait(timeout=2)
+
+    assert cluster.state("k8squest-warm") == ACTIVE
+    assert "k8squest-old" not in cluster.namespaces
+    assert sorted(cluster.state(n) for n in cluster.namespaces) == [ACTIVE, WARM, WARM]
+    assert "delete namespace k8squest-old --wait=false --ignore-not-found" in cluster.commands()
+    assert not any(c.startswith("delete") and "--wait=false" not in c for c in cluster.commands())
+
+
+def test_an_empty_pool_creates_the_namespace_on_demand():
+    cluster = FakeCluster()
+    pool = NamespacePool(size=1, runner=cluster)
+    name = pool.acquire(background=False)
+    assert cluster.state(name) == ACTIVE
+    assert [cluster.state(n) for n in cluster.namespaces if n != name] == [WARM]
+
+
+def test_namespaces_stuck_terminating_are_reported_with_their_finalizers():
+    cluster = FakeCluster(stuck={"k8squest-old"})
+    cluster.add("k8squest-old", ACTIVE)
+    pool = NamespacePool(size=0, runner=cluster, stuck_after=0.05, poll_interval=0.01)
+
+    pool.acquire()
+    deadline = time.monotonic() + 2
+    while "k8squest-old" not in pool.stuck and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert cluster.state("k8squest-old") == RETIRED
+    assert pool.stuck["k8squest-old"] == {
+        "finalizers": ["kubernetes"],
+        "reasons": ["Some content has finalizers remaining: example.com/hold"],
+    }
+
+    # Once the namespace finally goes, it is forgotten
+    with cluster._lock:
+        cluster.namespaces.pop("k8squest-old")
+    deadline = time.monotonic() + 2
+    while pool.stuck and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pool.stuck == {}
+    pool.wait(timeout=2)
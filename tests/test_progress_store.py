@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the journaled progress store
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine import progress_store
+from engine.progress_store import ProgressStore
+
+
+def test_changes_are_journaled_and_read_back_without_a_snapshot(tmp_path):
+    store = ProgressStore(tmp_path / "progress.json")
+    progress = store.load()
+    assert progress["completed_levels"] == [] and progress["player_name"] == "Padawan"
+
+    progress.update(player_name="Ada", total_xp=100, completed_levels=["level-1-pods"])
+    store.update(progress)
+    store.update(progress)  # nothing changed, nothing journaled
+    store.record_start("level-2-deployments")
+    store.record_hint("level-2-deployments", 2)
+    store.record_attempt("level-2-deployments", False, 30.5, 2)
+    store.record_attempt("level-2-deployments", True, 12.25, 2)
+
+    assert not store.path.exists()
+    events = [json.loads(line) for line in store.journal_path.read_text().splitlines()]
+    assert [event["seq"] for event in events] == [1, 2, 3, 4, 5]
+    assert events[0]["values"] == {"player_name": "Ada", "total_xp": 100, "completed_levels": ["level-1-pods"]}
+
+    # What a process killed at this point would see on the next start
+    reloaded = ProgressStore(store.path)
+    assert reloaded.load()["total_xp"] == 100
+    history = reloaded.history("level-2-deployments")
+    assert (history["starts"], history["hints"], history["seconds"]) == (1, 2, 42.75)
+    assert [attempt["passed"] for attempt in history["attempts"]] == [False, True]
+
+
+def test_a_torn_last_line_is_dropped(tmp_path):
+    store = ProgressStore(tmp_path / "progress.json")
+    store.update({"total_xp": 300})
+    with open(store.journal_path, "a") as f:
+        f.write('{"type":"set","values":{"total_xp":4')
+
+    reloaded = ProgressStore(store.path)
+    assert reloaded.load()["total_xp"] == 300
+    reloaded.update({"total_xp": 400})
+    assert ProgressStore(store.path).load()["total_xp"] == 400
+
+
+def test_compaction_replaces_the_snapshot_and_skips_folded_events(tmp_path):
+    store = ProgressStore(tmp_path / "progress.json", compact_after=3)
+    for xp in (100, 200, 300):
+        store.update({"total_xp": xp})
+    assert json.loads(store.path.read_text())["seq"] == 3
+    assert store.journal_path.read_text() == ""
+    assert list(tmp_path.glob("*.tmp")) == []
+
+    # A crash between the rename and emptying the journal leaves events the snapshot already holds
+    store.update({"total_xp": 400})
+    journal = store.journal_path.read_text()
+    store.close()
+    store.journal_path.write_text('{"type":"set","values":{"total_xp":300},"seq":3}\n' + journal)
+    reloaded = ProgressStore(store.path)
+    assert reloaded.load()["total_xp"] == 400
+    assert reloaded.seq == 4 and reloaded.pending == 0
+
+
+def test_progress_saved_before_the_journal_existed_still_loads(tmp_path):
+    path = tmp_path / "progress.json"
+    path.write_text(json.dumps({"total_xp": 500, "completed_levels": ["level-1-pods"], "player_name": "Ada"}))
+    store = ProgressStore(path)
+    progress = store.load()
+    assert progress["current_level"] is None and progress["total_xp"] == 500
+
+    progress["current_level"] = "level-2-deployments"
+    store.update(progress)
+    store.close()
+    snapshot = json.loads(path.read_text())
+    assert snapshot["current_level"] == "level-2-deployments" and snapshot["player_name"] == "Ada"
+
+
+def test_fsyncs_are_batched_and_a_trailing_batch_is_synced_by_a_timer(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(progress_store.os, "fsync", synced.append)
+
+    store = ProgressStore(tmp_path / "progress.json", fsync_interval=0.2)
+    store.record_start("level-1-pods")
+    assert len(synced) == 1  # the first append
+    store.record_attempt("level-1-pods", True, 42.0, 1)
+    store.update({"total_xp": 100, "completed_levels": ["level-1-pods"]})
+    assert len(synced) == 1  # batched with the next sync
+
+    time.sleep(0.4)
+    assert len(synced) == 2  # the level-complete events did not wait for another event
+    store.close()
+
+
+def test_readers_do_not_trim_a_journal_being_written(tmp_path):
+    writer = ProgressStore(tmp_path / "progress.json")
+    writer.update({"total_xp": 100})
+    with open(writer.journal_path, "a") as f:
+        f.write('{"type":"set","values":{"total_xp":2')  # the game is mid-write
+    size = writer.journal_path.stat().st_size
+
+    assert ProgressStore(writer.path).load()["total_xp"] == 100
+    assert writer.journal_path.stat().st_size == size
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for field projection and pagination on /api/state
+"""
+
+import http.client
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualizer.collector import SnapshotCollector
+from visualizer.grouping import collapse_pods
+from visualizer.http_pool import PooledHTTPServer
+from visualizer.projection import ContinueExpired, parse_query, project
+from visualizer.server import K8sQuestVisualizerHandler, build_cluster_state
+from visualizer.snapshot import SNAPSHOT_KINDS, Snapshot
+
+
+def pod(name):
+    return {
+        'metadata': {'name': name, 'labels': {'app': 'web', 'tier': 'frontend'}},
+        'spec': {'containers': [{'name': 'web', 'image': 'nginx'}]},
+        'status': {
+            'phase': 'Running',
+            'conditions': [{'type': 'Ready', 'status': 'True'}],
+            'containerStatuses': [{'restartCount': 0, 'state': {'running': {}}}]
+        }
+    }
+
+
+def cluster(pods=5):
+    items = {key: [] for key in SNAPSHOT_KINDS}
+    items['pods'] = [pod(f'web-{i}') for i in range(pods)]
+    items['services'] = [{'metadata': {'name': 'web'}, 'spec': {'selector': {'app': 'web'},
+                                                                'ports': [{'port': 80}]}}]
+    return build_cluster_state(Snapshot(items=items))
+
+
+def test_kinds_and_fields_are_projected():
+    state = cluster()
+    projected = project(state, parse_query({'kinds': ['pods'], 'fields': ['status,ready']}), '"e"')
+
+    assert set(projected) == {'pods', 'refresh', 'kinds'}
+    assert projected['pods'][0] == {'name': 'web-0', 'status': 'Running', 'ready': True}
+
+
+def test_pages_follow_continue_tokens():
+    state = cluster(pods=5)
+    names = []
+    query = {'kinds': ['pods'], 'limit': ['2']}
+    while True:
+        page = project(state, parse_query(query), '"e"')
+        names += [p['name'] for p in page['pods']]
+        if 'continue' not in page:
+            break
+        query = dict(query, **{'continue': [page['continue']]})
+
+    assert names == [f'web-{i}' for i in range(5)]
+
+
+def test_kinds_used_up_on_an_earlier_page_are_not_repeated():
+    state = cluster(pods=5)
+    seen = []
+    query = {'kinds': ['pods,services'], 'limit': ['2']}
+    while True:
+        page = project(state, parse_query(query), '"e"')
+        seen += [('pod', p['name']) for p in page['pods']] + [('svc', s['name']) for s in page['services']]
+        if 'continue' not in page:
+            break
+        query = dict(query, **{'continue': [page['continue']]})
+
+    assert sorted(seen) == sorted([('pod', f'web-{i}') for i in range(5)] + [('svc', 'web')])
+
+
+def test_continue_token_expires_when_state_changes():
+    state = cluster(pods=5)
+    page = project(state, parse_query({'limit': ['2']}), '"old"')
+    with pytest.raises(ContinueExpired):
+        project(state, parse_query({'limit': ['2'], 'continue': [page['continue']]}), '"new"')
+
+
+@pytest.mark.parametrize('query', [{'limit': ['0']}, {'limit': ['many']}, {'continue': ['not-a-token']}])
+def test_bad_parameters_are_rejected(query):
+    with pytest.raises(ValueError):
+        parse_query(query)
+
+
+def test_server_reports_payload_size_and_serves_projections():
+    collector = SnapshotCollector(lambda: cluster(pods=200), view=collapse_pods)
+    collector.refresh()
+    server = PooledHTTPServer(('localhost', 0), K8sQuestVisualizerHandler, workers=2)
+    server.verbose = False
+    server.collector = collector
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def get(path, etag=None):
+        conn = http.client.HTTPConnection('localhost', server.server_address[1], timeout=5)
+        conn.request('GET', path, headers={'If-None-Match': etag} if etag else {})
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response, body
+
+    try:
+        full, full_body = get('/api/state')
+        assert int(full.getheader('X-Payload-Bytes')) == len(full_body)
+        assert full.getheader('X-Serialize-Ms') is not None
+
+        small, small_body = get('/api/state?kinds=pods&fields=ready&limit=50')
+        data = json.loads(small_body)
+        assert small.status == 200
+        assert len(data['cluster']['pods']) == 50
+        assert data['cluster']['pods'][0] == {'name': 'web-0', 'ready': True}
+        assert int(small.getheader('X-Payload-Bytes')) < len(full_body) / 4
+        assert small.getheader('ETag') != full.getheader('ETag')
+
+        cached, _ = get('/api/state?kinds=pods&fields=ready&limit=50', small.getheader('ETag'))
+        assert cached.status == 304
+
+        bad, _ = get('/api/state?limit=-1')
+        assert bad.status == 400
+    finally:
+        server.shutdown()
+        server.server_close()
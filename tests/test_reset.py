@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental, diff-based level reset
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import yaml
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from kubectl_runner import FakeKubectl
+from engine.reset import (
+    diff_reset, find_level, level_documents, load_fingerprint, matches, object_key, plan_reset,
+    record_fingerprint
+)
+
+WORLDS = Path(__file__).parent.parent / "worlds"
+LEVEL_2 = WORLDS / "world-1-basics" / "level-2-deployments"
+
+
+def live_object(doc, uid, generation=1, **changes):
+    """The object the API server would hold for a manifest: defaults, uid and status added"""
+    obj = json.loads(json.dumps(doc))
+    obj["metadata"].update({"uid": uid, "generation": generation, "resourceVersion": "1"})
+    obj.setdefault("status", {})
+    if obj["kind"] == "Deployment":
+        obj["spec"]["template"]["spec"]["containers"][0].setdefault("imagePullPolicy", "Always")
+        obj["spec"].setdefault("revisionHistoryLimit", 10)
+    for path, value in changes.items():
+        target = obj
+        keys = path.split("__")
+        for key in keys[:-1]:
+            target = target[key]
+        target[keys[-1]] = value
+    return obj
+
+
+class FakeCluster(FakeKubectl):
+    """kubectl over a dict of live objects, recording every call"""
+
+    RESOURCES = {"deployments.apps": "Deployment", "configmaps": "ConfigMap", "pods": "Pod",
+                 "services": "Service", "namespaces": "Namespace"}
+
+    def __init__(self, namespace, objects):
+        super().__init__()
+        self.namespace = namespace
+        self.objects = {object_key(o): o for o in objects}
+        self.uids = 100
+        self.on("get", "namespace")(lambda args, input: {"status": {"phase": "Active"}})
+        self.on("get")(self.get)
+        self.on("delete")(self.delete)
+        self.on("apply")(self.apply)
+        self.on("replace")(self.apply)
+
+    def get(self, args, input):
+        if "-n" in args:
+            namespace = args[args.index("-n") + 1]
+            return {"items": [o for o in self.objects.values() if o["metadata"].get("namespace") == namespace]}
+        targets = {f"/{self.RESOURCES[a.partition('/')[0]]}/{a.partition('/')[2]}" for a in args if "/" in a}
+        return {"items": [o for key, o in self.objects.items() if key in targets]}
+
+    def delete(self, args, input):
+        namespace = args[args.index("-n") + 1]
+        for target in (a for a in args[1:] if "/" in a):
+            resource, _, name = target.partition("/")
+            self.objects.pop(f"{namespace}/{self.RESOURCES[resource]}/{name}", None)
+
+    def apply(self, args, input):
+        for doc in yaml.safe_load_all(input):
+            self.uids += 1
+            self.objects[object_key(doc)] = live_object(doc, f"uid-{self.uids}")
+
+
+def deployed(tmp_path, namespace="k8squest", level=LEVEL_2):
+    documents = level_documents(level, namespace)
+    live = [live_object(doc, f"uid-{i}") for i, doc in enumerate(documents)]
+    for name in {doc["metadata"].get("namespace") for doc in documents} - {None}:
+        live.append({"kind": "ServiceAccount", "metadata": {"name": "default", "namespace": name, "uid": name}})
+    cluster = FakeCluster(namespace, live)
+    record_fingerprint(level, namespace, runner=cluster, directory=tmp_path)
+    return documents, cluster
+
+
+def test_levels_resolve_in_any_world():
+    assert find_level("level-31-pvc-pending", WORLDS) == WORLDS / "world-4-storage" / "level-31-pvc-pending"
+    assert find_level("level-31", WORLDS) == find_level("31", WORLDS) == find_level("level-31-pvc-pending", WORLDS)
+    assert find_level("world-2-deployments/level-11-rollback", WORLDS).name == "level-11-rollback"
+    assert find_level("level-3", WORLDS).name == "level-3-imagepull"
+    assert find_level("level-999", WORLDS) is None
+
+
+def test_manifests_match_the_objects_created_from_them():
+    doc = level_documents(LEVEL_2, "k8squest")[0]
+    assert matches(doc, live_object(doc, "u"))
+    assert not matches(doc, live_object(doc, "u", spec__replicas=3))
+
+
+def test_pods_match_after_the_api_server_adds_list_entries():
+    doc = {"apiVersion": "v1", "kind": "Pod", "metadata": {"name": "app", "namespace": "k8squest"}, "spec": {
+        "containers": [{"name": "app", "image": "busybox", "command": ["sleep", "3600"],
+                        "volumeMounts": [{"name": "data", "mountPath": "/data"}]}],
+        "volumes": [{"name": "data", "emptyDir": {}}],
+        "tolerations": [{"key": "dedicated", "operator": "Exists", "effect": "NoSchedule"}]}}
+    live = live_object(doc, "u")
+    spec = live["spec"]
+    spec["volumes"].insert(0, {"name": "kube-api-access-x7k2p", "projected": {"sources": []}})
+    spec["containers"][0]["volumeMounts"].append(
+        {"name": "kube-api-access-x7k2p", "mountPath": "/var/run/secrets/kubernetes.io/serviceaccount"})
+    spec["tolerations"] += [
+        {"key": f"node.kubernetes.io/{taint}", "operator": "Exists", "effect": "NoExecute", "tolerationSeconds": 300}
+        for taint in ("not-ready", "unreachable")
+    ]
+    assert matches(doc, live)
+
+    edited = json.loads(json.dumps(live))
+    edited["spec"]["containers"][0]["volumeMounts"][0]["mountPath"] = "/tmp"
+    assert not matches(doc, edited)
+    edited = json.loads(json.dumps(live))
+    edited["spec"]["tolerations"][0]["effect"] = "NoExecute"
+    assert not matches(doc, edited)
+    edited = json.loads(json.dumps(live))
+    edited["spec"]["containers"][0]["command"].append("--verbose")
+    assert not matches(doc, edited)
+
+
+def test_an_untouched_level_needs_no_changes(tmp_path):
+    documents, cluster = deployed(tmp_path)
+    plan = plan_reset(documents, list(cluster.objects.values()), load_fingerprint(LEVEL_2, tmp_path))
+    assert plan.empty
+
+
+def test_only_added_and_modified_objects_are_touched(tmp_path):
+    documents, cluster = deployed(tmp_path)
+    deployment = next(key for key in cluster.objects if "/Deployment/" in key)
+    cluster.objects[deployment]["spec"]["replicas"] = 5
+    cluster.objects[deployment]["metadata"]["generation"] = 2
+    cluster.objects["k8squest/ConfigMap/scratch"] = {"kind": "ConfigMap", "metadata": {
+        "name": "scratch", "namespace": "k8squest", "uid": "new"}}
+    cluster.objects["k8squest/Pod/web-abc"] = {"kind": "Pod", "metadata": {
+        "name": "web-abc", "namespace": "k8squest", "uid": "p",
+        "ownerReferences": [{"kind": "ReplicaSet", "name": "web-123"}]}}
+
+    plan = diff_reset(LEVEL_2, runner=cluster, directory=tmp_path)
+
+    assert [o["metadata"]["name"] for o in plan.delete] == ["scratch"]
+    assert [d["kind"] for d in plan.replace] == ["Deployment"] and plan.create == []
+    # Fingerprint, namespace check and listing, then one call per change
+    commands = [call[0] for call in cluster.calls[3:]]
+    assert commands == ["delete", "replace", "get"]
+    assert cluster.calls[3][-1] == "configmaps/scratch" and "--wait=false" in cluster.calls[3]
+    assert "k8squest/Pod/web-abc" in cluster.objects  # left to its ReplicaSet
+    assert cluster.objects[deployment]["spec"]["replicas"] == documents[0]["spec"]["replicas"]
+
+    # The fingerprint now describes the restored state
+    assert plan_reset(documents, list(cluster.objects.values()), load_fingerprint(LEVEL_2, tmp_path)).empty
+
+
+def test_deleted_objects_are_recreated_and_missing_fingerprints_fall_back(tmp_path):
+    documents, cluster = deployed(tmp_path)
+    cluster.objects = {k: v for k, v in cluster.objects.items() if "/Deployment/" not in k}
+    plan = diff_reset(LEVEL_2, runner=cluster, directory=tmp_path)
+    assert [d["kind"] for d in plan.create] == ["Deployment"]
+    assert cluster.calls[-2][0] == "apply"
+
+    assert diff_reset(WORLDS / "world-1-basics" / "level-1-pods", runner=cluster, directory=tmp_path) is None
+
+
+def test_objects_in_other_namespaces_are_compared_too(tmp_path):
+    level = WORLDS / "world-3-networking" / "level-27-crossnamespace"
+    documents, cluster = deployed(tmp_path, "k8squest-ab12cd", level)
+    assert "/Namespace/backend-ns" in cluster.objects
+
+    plan = diff_reset(level, runner=cluster, directory=tmp_path)
+    assert plan.empty
+
+    cluster.objects["backend-ns/Pod/api-server"]["metadata"]["labels"] = {"app": "wrong"}
+    cluster.objects["backend-ns/ConfigMap/notes"] = {"kind": "ConfigMap", "metadata": {
+        "name": "notes", "namespace": "backend-ns", "uid": "added"}}
+    plan = diff_reset(level, runner=cluster, directory=tmp_path)
+    assert [o["metadata"]["name"] for o in plan.delete] == ["notes"]
+    assert [d["metadata"]["name"] for d in plan.replace] == ["api-server"] and plan.create == []
+    assert ["delete", "-n", "backend-ns"] == [c for c in cluster.calls if c[0] == "delete"][-1][:3]
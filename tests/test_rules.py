@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the visualizer issue detection rules
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualizer.rules import RuleEngine
+from visualizer.snapshot import SNAPSHOT_KINDS, Snapshot
+
+
+def obj(name, rv, labels=None, **fields):
+    metadata = {'name': name, 'uid': f'uid-{name}', 'resourceVersion': rv}
+    if labels:
+        metadata['labels'] = labels
+    return dict(fields, metadata=metadata)
+
+
+def pod(name, rv, labels, ready=True):
+    return obj(name, rv, labels, status={
+        'phase': 'Running',
+        'conditions': [{'type': 'Ready', 'status': 'True' if ready else 'False'}],
+        'containerStatuses': [{'restartCount': 0, 'state': {'running': {}}}]
+    })
+
+
+def snapshot(**kinds):
+    items = {key: [] for key in SNAPSHOT_KINDS}
+    items.update(kinds)
+    return Snapshot(items=items)
+
+
+def namespace(pods, services=()):
+    return snapshot(
+        pods=pods,
+        services=list(services),
+        statefulsets=[obj('db', '3', spec={'replicas': 1, 'serviceName': 'db-headless'},
+                          status={'readyReplicas': 1})],
+        pvcs=[obj('data', '4', status={'phase': 'Pending'})],
+        ingresses=[obj('web', '5', spec={'rules': [{'http': {'paths': [
+            {'backend': {'service': {'name': 'web', 'port': {'number': 8080}}}}]}}]})],
+        networkpolicies=[obj('deny', '6', spec={'podSelector': {'matchLabels': {'app': 'api'}},
+                                               'policyTypes': ['Ingress']})],
+    )
+
+
+WEB = obj('web', '2', spec={'selector': {'app': 'web'}, 'ports': [{'port': 80}]})
+
+
+def test_rules_cover_more_kinds_and_span_objects():
+    issues = RuleEngine().evaluate(namespace([pod('web-1', '1', {'app': 'frontend'})], [WEB]))
+
+    assert issues['services']['web'] == ['No endpoints - selector app=web matches no pods']
+    assert issues['statefulsets']['db'] == ['Governing service db-headless not found']
+    assert issues['pvcs']['data'] == ['Claim pending - no volume bound yet']
+    assert issues['ingresses']['web'] == ['Service web has no port 8080']
+    assert issues['networkpolicies']['deny'] == [
+        'Pod selector matches no pods', 'Blocks all ingress to selected pods'
+    ]
+    assert issues['pods']['web-1'] == []
+
+
+def test_unchanged_objects_are_not_reevaluated():
+    engine = RuleEngine()
+    pods = [pod(f'web-{i}', str(i), {'app': 'web'}) for i in range(100)]
+
+    engine.evaluate(namespace(pods, [WEB]))
+    first = engine.evaluations
+    engine.evaluate(namespace(pods, [WEB]))
+    assert engine.evaluations == first
+
+    # One pod changes: its own rules re-run, plus rules that read pods
+    pods[0] = pod('web-0', '500', {'app': 'web'}, ready=False)
+    issues = engine.evaluate(namespace(pods, [WEB]))
+    assert issues['pods']['web-0'] == ['Pod not ready']
+    assert engine.evaluations - first == 3 + 1 + 1  # pod rules, service endpoints, policy selector
+
+
+def test_objects_without_resource_version_are_always_evaluated():
+    engine = RuleEngine()
+    unversioned = {'metadata': {'name': 'web-1'}, 'status': {'phase': 'Failed'}}
+
+    engine.evaluate(snapshot(pods=[unversioned]))
+    first = engine.evaluations
+    issues = engine.evaluate(snapshot(pods=[unversioned]))
+    assert engine.evaluations == 2 * first
+    assert issues['pods']['web-1'] == ['Pod in Failed state', 'Pod not ready']
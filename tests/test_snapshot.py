@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the visualizer snapshot builder
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualizer.snapshot import SNAPSHOT_KINDS, SnapshotBuilder, fetch_snapshot
+from visualizer.server import build_cluster_state
+
+
+def make_list(*items):
+    return json.dumps({'apiVersion': 'v1', 'kind': 'List', 'items': list(items)})
+
+
+POD = {
+    'kind': 'Pod',
+    'metadata': {'name': 'web-1', 'labels': {'app': 'web'}},
+    'status': {
+        'phase': 'Running',
+        'conditions': [{'type': 'Ready', 'status': 'True'}],
+        'containerStatuses': [{'restartCount': 0, 'state': {'running': {}}}]
+    }
+}
+SERVICE = {
+    'kind': 'Service',
+    'metadata': {'name': 'web'},
+    'spec': {'type': 'ClusterIP', 'selector': {'app': 'web'}, 'ports': [{'port': 80}]}
+}
+ENDPOINTS = {
+    'kind': 'Endpoints',
+    'metadata': {'name': 'web'},
+    'subsets': [{'addresses': [{'ip': '10.0.0.1'}, {'ip': '10.0.0.2'}]}]
+}
+CONFIGMAP = {'kind': 'ConfigMap', 'metadata': {'name': 'settings'}}
+
+
+def test_single_kubectl_call_for_all_kinds():
+    calls = []
+
+    def runner(args):
+        calls.append(args)
+        return make_list(POD, SERVICE, ENDPOINTS, CONFIGMAP)
+
+    snapshot = fetch_snapshot('k8squest', runner=runner)
+
+    assert len(calls) == 1
+    assert calls[0][0] == 'get'
+    assert 'endpoints' in calls[0][1].split(',')
+    assert snapshot.kubectl_calls == 1
+    assert [p['metadata']['name'] for p in snapshot.get('pods')] == ['web-1']
+    assert [c['metadata']['name'] for c in snapshot.get('configmaps')] == ['settings']
+
+
+def test_cluster_state_uses_listed_endpoints():
+    snapshot = fetch_snapshot('k8squest', runner=lambda args: make_list(POD, SERVICE, ENDPOINTS))
+    state = build_cluster_state(snapshot)
+
+    assert state['services'][0]['endpoints'] == 2
+    assert state['services'][0]['issues'] == []
+    assert state['pods'][0]['ready'] is True
+    assert state['refresh']['kubectl_calls'] == 1
+    assert 'endpoints' not in state
+
+
+class FlakyKubectl:
+    """Fake runner: the combined call and any 'broken' kinds fail"""
+
+    def __init__(self):
+        self.calls = []
+        self.combined_error = None
+        self.broken = set()
+
+    def __call__(self, args, timeout=None):
+        self.calls.append(args)
+        resource = args[1]
+        if ',' in resource:
+            if self.combined_error:
+                raise self.combined_error
+            return make_list(POD, SERVICE, ENDPOINTS)
+        if resource in self.broken:
+            raise subprocess.CalledProcessError(1, 'kubectl')
+        return make_list(POD) if resource == 'pods' else make_list()
+
+
+def test_builder_marks_all_kinds_fresh_on_combined_call():
+    kubectl = FlakyKubectl()
+    snapshot = SnapshotBuilder(runner=kubectl).build()
+
+    assert len(kubectl.calls) == 1
+    assert {s['status'] for s in snapshot.kind_status.values()} == {'fresh'}
+
+
+def test_builder_falls_back_per_kind_and_serves_stale():
+    kubectl = FlakyKubectl()
+    builder = SnapshotBuilder(runner=kubectl)
+    builder.build()
+
+    kubectl.combined_error = subprocess.CalledProcessError(1, 'kubectl')
+    kubectl.broken = {'services', 'ingresses'}
+    snapshot = builder.build()
+
+    assert snapshot.kubectl_calls == 1 + len(SNAPSHOT_KINDS)
+    assert snapshot.kind_status['pods']['status'] == 'fresh'
+    assert snapshot.kind_status['services']['status'] == 'stale'
+    assert [s['metadata']['name'] for s in snapshot.get('services')] == ['web']
+    # Ingresses were empty before, and the last good value is still served
+    assert snapshot.kind_status['ingresses']['status'] == 'stale'
+
+    state = build_cluster_state(snapshot)
+    assert state['kinds']['services']['error'] == 'kubectl exited with 1'
+    assert 'latency_ms' not in state['kinds']['pods']
+    assert 'pods' in state['refresh']['kind_latency_ms']
+
+
+def test_stale_values_never_cross_namespaces():
+    kubectl = FlakyKubectl()
+    builder = SnapshotBuilder(runner=kubectl)
+    builder.build()
+
+    builder.namespace = 'k8squest-ab12cd'  # what set_namespace does on a pool rebind
+    kubectl.combined_error = subprocess.CalledProcessError(1, 'kubectl')
+    kubectl.broken = {'services'}
+    snapshot = builder.build()
+
+    assert snapshot.kind_status['services']['status'] == 'failed'
+    assert snapshot.get('services') == []
+    assert all('k8squest-ab12cd' in call for call in kubectl.calls[1:])
+
+
+def test_builder_does_not_fan_out_after_a_timeout():
+    kubectl = FlakyKubectl()
+    kubectl.combined_error = subprocess.TimeoutExpired('kubectl', 4)
+    snapshot = SnapshotBuilder(runner=kubectl).build()
+
+    assert len(kubectl.calls) == 1
+    assert {s['status'] for s in snapshot.kind_status.values()} == {'failed'}
+    assert snapshot.kind_status['pods']['error'] == 'timed out after 4s'
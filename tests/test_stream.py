@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the visualizer Server-Sent Events delta stream
+"""
+
+import copy
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualizer.stream import StreamHub, json_diff
+
+
+def apply_ops(doc, ops):
+    """Reference patch application, mirroring applyPatch in app.js"""
+    for op in ops:
+        if op['path'] == '':
+            doc = op['value']
+            continue
+        tokens = [t.replace('~1', '/').replace('~0', '~') for t in op['path'].split('/')[1:]]
+        last = tokens.pop()
+        target = doc
+        for token in tokens:
+            target = target[int(token)] if isinstance(target, list) else target[token]
+        if isinstance(target, list):
+            last = int(last)
+        if op['op'] == 'remove':
+            del target[last]
+        else:
+            target[last] = op['value']
+    return doc
+
+
+def parse(message):
+    fields = dict(line.split(': ', 1) for line in message.decode().strip().split('\n'))
+    return fields['event'], json.loads(fields['data'])
+
+
+def test_diff_round_trip():
+    old = {
+        'game': {'total_xp': 100, 'current_level': 'level-1-pods'},
+        'cluster': {'pods': [{'name': 'a', 'ready': False}], 'labels/x': {'a~b': 1}},
+        'gone': True
+    }
+    new = {
+        'game': {'total_xp': 200, 'current_level': 'level-2-deployments'},
+        'cluster': {'pods': [{'name': 'a', 'ready': True}, {'name': 'b', 'ready': True}],
+                    'labels/x': {'a~b': 2}},
+        'added': [1]
+    }
+
+    ops = json_diff(old, new)
+    assert apply_ops(copy.deepcopy(old), ops) == new
+    assert json_diff(new, new) == []
+
+
+def test_hub_sends_snapshot_then_sequenced_deltas():
+    hub = StreamHub()
+    hub.publish({'game': {'total_xp': 0}, 'cluster': {'pods': []}})
+
+    q, first = hub.subscribe()
+    event, data = parse(first)
+    assert event == 'snapshot'
+    assert data['seq'] == 1
+
+    hub.publish({'game': {'total_xp': 100}, 'cluster': {'pods': []}}, game_changed=True)
+    event, delta = parse(q.get_nowait())
+    assert event == 'delta'
+    assert (delta['base'], delta['seq']) == (1, 2)
+    assert delta['ops'] == [{'op': 'replace', 'path': '/game/total_xp', 'value': 100}]
+
+    event, game = parse(q.get_nowait())
+    assert event == 'game'
+    assert game['game']['total_xp'] == 100
+
+
+def test_slow_subscriber_is_dropped():
+    hub = StreamHub()
+    q, _ = hub.subscribe()
+    for xp in range(100):
+        hub.publish({'game': {'total_xp': xp}})
+
+    assert hub.client_count == 0
+    messages = []
+    while not q.empty():
+        messages.append(q.get_nowait())
+    assert messages[-1] is None
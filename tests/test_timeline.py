@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for cluster timeline recording and replay
+"""
+
+import http.client
+import json
+import sys
+import threading
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualizer.http_pool import PooledHTTPServer
+from visualizer.server import K8sQuestVisualizerHandler
+from visualizer import timeline
+from visualizer.stream import apply_patch, json_diff
+from visualizer.timeline import TimelineLibrary, TimelineReader, TimelineRecorder, TimelineWriter
+
+
+def state(second, pods=30, level='level-1-pods'):
+    """A namespace where one pod restarts every second"""
+    return {
+        'game': {'current_world': 'world-1-basics', 'current_level': level, 'total_xp': 100},
+        'cluster': {
+            'pods': [{'name': f'web-{i}', 'status': 'Running', 'ready': True,
+                      'restarts': second if i == second % pods else 0, 'issues': []}
+                     for i in range(pods)],
+            'services': [{'name': 'web', 'type': 'ClusterIP', 'endpoints': pods, 'issues': []}],
+            'refresh': {'duration_ms': second}
+        }
+    }
+
+
+def test_apply_patch_reverses_json_diff():
+    old, new = state(1), state(2)
+    new['cluster']['pods'].pop()
+    new['game']['player_name'] = 'Padawan'
+    assert apply_patch(json.loads(json.dumps(old)), json_diff(old, new)) == new
+
+
+def test_frames_are_read_back_in_any_order(tmp_path):
+    path = tmp_path / 'run.k8qtl'
+    writer = TimelineWriter(path, keyframe_every=10)
+    for second in range(35):
+        writer.append(state(second), timestamp=1000.0 + second)
+    assert writer.append(state(34)) is False
+    writer.close()
+
+    reader = TimelineReader(path)
+    assert len(reader) == 35
+    assert reader.times[:2] == [1000.0, 1001.0]
+    for index in (34, 3, 3, 4, 20, 0, 11):
+        assert json.dumps(reader.frame(index)) == json.dumps(state(index))
+
+
+def test_reader_follows_a_growing_file_and_ignores_a_torn_record(tmp_path):
+    path = tmp_path / 'run.k8qtl'
+    writer = TimelineWriter(path)
+    writer.append(state(0))
+    reader = TimelineReader(path)
+    assert len(reader) == 1
+
+    writer.append(state(1))
+    writer.close()
+    with open(path, 'ab') as f:
+        f.write(b'D\x40\x00')  # a crash in the middle of a header
+    reader.refresh()
+    assert len(reader) == 2
+    assert reader.frame(1) == state(1)
+
+
+def test_an_hour_of_changes_fits_in_a_few_megabytes(tmp_path):
+    recorder = TimelineRecorder(tmp_path)
+    for second in range(3600):
+        recorder.record(state(second, pods=100))
+    recorder.close()
+
+    path, = tmp_path.glob('*.k8qtl')
+    assert path.stat().st_size < 3 * 1024 * 1024
+    reader = TimelineReader(path)
+    assert len(reader) == 3600
+    # Refresh timings are not recorded
+    assert 'refresh' not in reader.frame(1800)['cluster']
+
+
+def test_recorder_starts_a_file_per_level(tmp_path):
+    recorder = TimelineRecorder(tmp_path)
+    recorder.record(state(0))
+    recorder.record(state(1))
+    recorder.record(state(2, level='level-2-deployments'))
+    recorder.close()
+
+    timelines = TimelineLibrary(tmp_path).list()
+    assert sorted((t['level'], t['frames']) for t in timelines) == [
+        ('level-1-pods', 2), ('level-2-deployments', 1)
+    ]
+
+
+def test_timeline_endpoints(tmp_path):
+    recorder = TimelineRecorder(tmp_path)
+    for second in range(5):
+        recorder.record(state(second))
+    server = PooledHTTPServer(('localhost', 0), K8sQuestVisualizerHandler, workers=2)
+    server.verbose = False
+    server.recorder = recorder
+    server.timelines = TimelineLibrary(tmp_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def get(path):
+        conn = http.client.HTTPConnection('localhost', server.server_address[1], timeout=5)
+        conn.request('GET', path)
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response.status, body
+
+    try:
+        status, body = get('/api/timelines')
+        listing = json.loads(body)
+        timeline_id = listing['recording']
+        assert [t['id'] for t in listing['timelines']] == [timeline_id]
+
+        status, body = get(f'/api/timeline?id={timeline_id}')
+        assert json.loads(body)['frames'] == 5
+
+        status, body = get(f'/api/timeline?id={timeline_id}&frame=3')
+        assert json.loads(body)['state']['cluster']['pods'][3]['restarts'] == 3
+
+        assert get(f'/api/timeline?id={timeline_id}&frame=9')[0] == 400
+        assert get('/api/timeline?id=../progress.json')[0] == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        recorder.close()
+        server.timelines.close()
+
+
+def test_recorder_keeps_only_the_newest_timelines(tmp_path, monkeypatch):
+    stamps = iter(f'20260101-0000{i:02d}' for i in range(10))
+    monkeypatch.setattr(timeline.time, 'strftime', lambda fmt: next(stamps))
+    recorder = TimelineRecorder(tmp_path, max_files=3)
+    for i in range(5):
+        recorder.record(state(i, level=f'level-{i}-demo'))
+    recorder.close()
+
+    kept = sorted(path.name for path in tmp_path.glob('*.k8qtl'))
+    assert len(kept) == 3 and kept[-1].startswith('20260101-000004')
+    assert [t['level'] for t in TimelineLibrary(tmp_path).list()] == ['level-4-demo', 'level-3-demo', 'level-2-demo']
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the visualizer topology graph
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from visualizer.snapshot import SNAPSHOT_KINDS, Snapshot
+from visualizer.topology import LabelIndex, build_topology
+
+
+def meta(name, labels=None, owner=None):
+    metadata = {'name': name, 'labels': labels or {}}
+    if owner:
+        metadata['ownerReferences'] = [{'kind': owner[0], 'name': owner[1], 'controller': True}]
+    return metadata
+
+
+def namespace(apps, replicas):
+    """Each app: Deployment -> ReplicaSet -> pods, a Service and a PVC per pod"""
+    items = {key: [] for key in SNAPSHOT_KINDS}
+    for a in range(apps):
+        app = f'app{a}'
+        labels = {'app': app, 'tier': 'web'}
+        items['deployments'].append({'metadata': meta(app)})
+        items['replicasets'].append({'metadata': meta(f'{app}-rs', owner=('Deployment', app))})
+        items['services'].append({'metadata': meta(app), 'spec': {'selector': labels}})
+        for r in range(replicas):
+            pod = f'{app}-{r}'
+            items['pods'].append({
+                'metadata': meta(pod, labels, owner=('ReplicaSet', f'{app}-rs')),
+                'spec': {'volumes': [{'name': 'data', 'persistentVolumeClaim': {'claimName': f'data-{pod}'}}]}
+            })
+            items['pvcs'].append({'metadata': meta(f'data-{pod}')})
+    items['ingresses'].append({'metadata': meta('web'), 'spec': {'rules': [{'http': {'paths': [
+        {'backend': {'service': {'name': 'app0', 'port': {'number': 80}}}}]}}]}})
+    return Snapshot(items=items)
+
+
+def test_edges_follow_owners_selectors_and_volumes():
+    edges = {(e['from'], e['to'], e['type']) for e in build_topology(namespace(2, 2))['edges']}
+
+    assert ('Deployment/app0', 'ReplicaSet/app0-rs', 'owns') in edges
+    assert ('ReplicaSet/app0-rs', 'Pod/app0-1', 'owns') in edges
+    assert ('Service/app1', 'Pod/app1-0', 'selects') in edges
+    assert ('Service/app1', 'Pod/app0-0', 'selects') not in edges
+    assert ('Pod/app0-1', 'PersistentVolumeClaim/data-app0-1', 'owns') not in edges
+    assert ('Pod/app0-1', 'PersistentVolumeClaim/data-app0-1', 'mounts') in edges
+    assert ('Ingress/web', 'Service/app0', 'routes') in edges
+
+
+def test_label_index_intersects_postings():
+    index = LabelIndex([
+        {'metadata': meta('a', {'app': 'web', 'tier': 'front'})},
+        {'metadata': meta('b', {'app': 'web', 'tier': 'back'})},
+        {'metadata': meta('c', {'app': 'db'})},
+    ])
+    assert index.match({'app': 'web'}) == {'a', 'b'}
+    assert index.match({'app': 'web', 'tier': 'back'}) == {'b'}
+    assert index.match({'app': 'cache'}) == set()
+    assert index.match({}, [{'key': 'tier', 'operator': 'DoesNotExist'}]) == {'c'}
+
+
+def test_two_thousand_objects_build_quickly():
+    snapshot = namespace(100, 9)  # 100 deployments, RS and services, 900 pods and PVCs, 1 ingress
+    start = time.perf_counter()
+    topology = build_topology(snapshot)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    assert len(topology['nodes']) == 2101
+    assert elapsed_ms < 50
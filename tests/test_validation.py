@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Tests for declarative level validation
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.jsonpath import JSONPathError, compile_template, evaluate, format_value, parse, render
+from engine.validation import ValidationError, load_checks, validate_level
+
+WORLDS = Path(__file__).parent.parent / "worlds"
+
+
+def pod(name, phase="Running", ready=True, command=None, labels=None):
+    return {
+        "kind": "Pod",
+        "metadata": {"name": name, "labels": labels or {}},
+        "spec": {"containers": [{"name": "app", "command": command or ["nginx"],
+                                 "volumeMounts": [{"name": "data", "mountPath": "/data"}]}]},
+        "status": {
+            "phase": phase,
+            "conditions": [{"type": "Ready", "status": "True" if ready else "False"}],
+            "containerStatuses": [{"ready": ready}],
+        },
+    }
+
+
+class FakeKubectl:
+    """Answers `kubectl get <kinds> [-n ns] -o json` from a dict and records the calls"""
+
+    def __init__(self, namespaced, cluster=()):
+        self.namespaced = namespaced
+        self.cluster = list(cluster)
+        self.calls = []
+
+    def __call__(self, args):
+        self.calls.append(args)
+        kinds = args[1].split(",")
+        items = self.cluster if "-n" not in args else self.namespaced
+        return json.dumps({"items": [i for i in items if i["kind"].lower() in kinds]})
+
+
+def write_checks(tmp_path, checks, **extra):
+    path = tmp_path / "validate.yaml"
+    path.write_text(json.dumps(dict(checks=checks, **extra)))
+    return path
+
+
+def test_jsonpath_follows_kubectl_semantics():
+    obj = pod("web", labels={"app.kubernetes.io/name": "web"})
+    obj["status"]["conditions"].append({"type": "PodScheduled", "status": "True"})
+
+    def value(path):
+        return " ".join(format_value(v) for v in evaluate(obj, parse(path)))
+
+    assert value("{.status.containerStatuses[0].ready}") == "true"
+    assert value("{.spec.containers[*].volumeMounts[*].mountPath}") == "/data"
+    assert value("{.status.conditions[?(@.type==\"Ready\")].status}") == "True"
+    assert value("{.metadata.labels['app.kubernetes.io/name']}") == "web"
+    assert value("{.spec.containers[-1].name}") == "app"
+    assert value("{.status.missing}") == ""
+    assert value("{..mountPath}") == "/data"
+    with pytest.raises(JSONPathError):
+        parse("{range .items[*]}")
+
+
+def test_jsonpath_templates_render_like_kubectl():
+    pods = {"items": [pod("web-0"), pod("web-1", ready=False)]}
+    template = compile_template(
+        '{range .items[*]}{.metadata.name}={.status.conditions[?(@.type=="Ready")].status}{"\\n"}{end}'
+    )
+    assert render(template, pods) == "web-0=True\nweb-1=False\n"
+    assert render(compile_template("{.items[*].metadata.name}"), pods) == "web-0 web-1"
+    assert render(compile_template("phase: {.items[0].status.phase}"), pods) == "phase: Running"
+    with pytest.raises(JSONPathError):
+        compile_template("{range .items[*]}{.metadata.name}")
+
+
+def test_all_checks_share_one_snapshot(tmp_path):
+    path = write_checks(tmp_path, [
+        {"check": "exists", "kind": "Pod", "name": "nginx-broken"},
+        {"check": "phase", "kind": "Pod", "name": "nginx-broken", "phase": "Running"},
+        {"check": "jsonpath", "kind": "Pod", "name": "nginx-broken",
+         "path": "{.spec.containers[0].command[0]}", "not_equals": "nginxzz"},
+        {"check": "ready", "kind": "po", "selector": {"app": "web"}, "min": 2},
+        {"check": "endpoints", "service": "web", "min": 2},
+        {"check": "phase", "kind": "PersistentVolumeClaim", "name": "data", "phase": "Bound"},
+        {"check": "phase", "kind": "PersistentVolume", "name": "data-pv", "phase": "Bound"},
+        {"check": "absent", "kind": "Pod", "name": "debug"},
+    ], success="Well done")
+    kubectl = FakeKubectl(
+        namespaced=[
+            pod("nginx-broken"), pod("web-0", labels={"app": "web"}), pod("web-1", labels={"app": "web"}),
+            {"kind": "Endpoints", "metadata": {"name": "web"},
+             "subsets": [{"addresses": [{"ip": "10.0.0.1"}, {"ip": "10.0.0.2"}]}]},
+            {"kind": "PersistentVolumeClaim", "metadata": {"name": "data"}, "status": {"phase": "Bound"}},
+        ],
+        cluster=[{"kind": "PersistentVolume", "metadata": {"name": "data-pv"}, "status": {"phase": "Bound"}}],
+    )
+
+    report = validate_level(path, runner=kubectl)
+
+    assert [r.message for r in report.failures] == []
+    assert report.passed and report.success_message == "Well done"
+    assert report.snapshot.kubectl_calls == len(kubectl.calls) == 2
+    namespaced = next(call for call in kubectl.calls if "-n" in call)
+    assert namespaced[1] == "endpoints,persistentvolumeclaim,pod"
+    assert all(r.duration_ms >= 0 for r in report.results)
+
+
+def test_failures_are_all_reported_with_hints(tmp_path):
+    path = write_checks(tmp_path, [
+        {"check": "phase", "kind": "Pod", "name": "nginx-broken", "phase": "Running", "hint": "describe it"},
+        {"check": "jsonpath", "kind": "Pod", "name": "nginx-broken",
+         "path": "{.spec.containers[0].command[0]}", "not_equals": "nginxzz"},
+        {"check": "ready", "kind": "Deployment", "name": "web"},
+        {"check": "endpoints", "service": "web"},
+    ])
+    kubectl = FakeKubectl(namespaced=[
+        pod("nginx-broken", phase="CrashLoopBackOff", ready=False, command=["nginxzz"]),
+        {"kind": "Deployment", "metadata": {"name": "web"}, "spec": {"replicas": 3},
+         "status": {"readyReplicas": 1}},
+    ])
+
+    report = validate_level(path, runner=kubectl)
+
+    assert not report.passed
+    assert [r.message for r in report.failures] == [
+        "phase is CrashLoopBackOff, expected Running",
+        "{.spec.containers[0].command[0]} is 'nginxzz'",
+        "1/3 ready",
+        "not found",
+    ]
+    assert report.failures[0].hint == "describe it"
+
+
+def test_malformed_files_are_rejected(tmp_path):
+    with pytest.raises(ValidationError):
+        load_checks(write_checks(tmp_path, []))
+    with pytest.raises(ValidationError):
+        load_checks(write_checks(tmp_path, [{"check": "healthy", "kind": "Pod", "name": "x"}]))
+    with pytest.raises(ValidationError):
+        load_checks(write_checks(tmp_path, [{"check": "jsonpath", "kind": "Pod", "name": "x", "path": "{.a}"}]))
+    with pytest.raises(ValidationError):
+        load_checks(write_checks(tmp_path, [{"check": "jsonpath", "kind": "Pod", "name": "x",
+                                             "path": "{.a[", "equals": 1}]))
+
+
+@pytest.mark.parametrize("path", sorted(WORLDS.glob("*/*/validate.yaml")), ids=lambda p: p.parent.name)
+def test_level_checks_load(path):
+    checks, _ = load_checks(path)
+    assert checks
+
+
+def test_rollback_level_is_not_solved_by_scaling_to_zero():
+    path = WORLDS / "world-2-deployments" / "level-11-rollback" / "validate.yaml"
+
+    def deployment(replicas, ready):
+        return {"kind": "Deployment", "metadata": {"name": "web-app"},
+                "spec": {"replicas": replicas, "template": {"spec": {"containers": [{"image": "nginx:1.21"}]}}},
+                "status": {"readyReplicas": ready} if ready else {}}
+
+    report = validate_level(path, runner=FakeKubectl(namespaced=[deployment(0, 0)]))
+    assert not report.passed
+    assert [r.message for r in report.failures] == ["0/0 ready, expected at least 1"]
+
+    assert validate_level(path, runner=FakeKubectl(namespaced=[deployment(3, 3)])).passed
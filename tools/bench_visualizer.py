@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+K8sQuest Visualizer Benchmark
+Load-tests the visualizer against a fake kubectl with browser-like polling clients, fully offline
+"""
+
+import argparse
+import http.client
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_kubectl import install, write_fixtures
+
+STATIC_PATHS = ['/index.html', '/app.js', '/style.css']
+
+# Read from the server's /metrics before and after the run
+SERVER_METRICS = (
+    'process_cpu_seconds_total',
+    'k8squest_kube_request_seconds_count',
+    'k8squest_snapshot_build_seconds_sum',
+    'k8squest_snapshot_build_seconds_count',
+    'k8squest_issue_detection_seconds_sum',
+    'k8squest_issue_detection_seconds_count',
+)
+ENDPOINTS = ('state', 'diagram', 'static')
+
+# The game advances a level this often (seconds), so clients re-fetch the diagram
+LEVEL_SECONDS = 5
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of latencies"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def scrape(port, name):
+    """Sum of every sample of one metric on the server's /metrics page"""
+    conn = http.client.HTTPConnection('localhost', port, timeout=10)
+    conn.request('GET', '/metrics')
+    text = conn.getresponse().read().decode()
+    conn.close()
+    pattern = re.compile(rf'^{re.escape(name)}(?:\{{[^}}]*\}})? (\S+)$', re.MULTILINE)
+    return sum(float(value) for value in pattern.findall(text))
+
+
+class BrowserClient:
+    """Requests /api like app.js in polling mode, with a browser's conditional cache
+
+    Loading the page fetches the static assets, the state and the diagram;
+    after that the client polls /api/state with If-None-Match and fetches
+    the diagram again only when the level changes.
+    """
+
+    def __init__(self, port):
+        self.port = port
+        self.conn = http.client.HTTPConnection('localhost', port, timeout=30)
+        self.etags = {}
+        self.level = None
+        self.samples = {endpoint: [] for endpoint in ENDPOINTS}
+        self.not_modified = 0
+        self.errors = 0
+
+    def get(self, path, endpoint):
+        headers = {'Accept-Encoding': 'gzip'}
+        if path in self.etags:
+            headers['If-None-Match'] = self.etags[path]
+        start = time.perf_counter()
+        try:
+            self.conn.request('GET', path, headers=headers)
+            response = self.conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            self.errors += 1
+            self.conn.close()
+            self.conn = http.client.HTTPConnection('localhost', self.port, timeout=30)
+            return None
+        self.samples[endpoint].append((time.perf_counter() - start) * 1000)
+
+        if response.status == 304:
+            self.not_modified += 1
+            return None
+        if response.status >= 400:
+            self.errors += 1
+            return None
+        if response.getheader('ETag'):
+            self.etags[path] = response.getheader('ETag')
+        return body
+
+    def load_page(self):
+        for path in STATIC_PATHS:
+            self.get(path, 'static')
+        self.poll()
+        self.get('/api/level-diagram', 'diagram')
+
+    def poll(self):
+        body = self.get('/api/state', 'state')
+        if body is None:
+            return
+        level = json.loads(body).get('game', {}).get('current_level')
+        if self.level is not None and level != self.level:
+            self.get('/api/level-diagram', 'diagram')
+        self.level = level
+
+    def close(self):
+        self.conn.close()
+
+
+def run_client(port, polls, interval, reload_every, results, lock):
+    client = BrowserClient(port)
+    client.load_page()
+    for i in range(1, polls + 1):
+        if reload_every and i % reload_every == 0:
+            client.load_page()
+        else:
+            client.poll()
+        if interval:
+            time.sleep(interval)
+    client.close()
+
+    with lock:
+        for endpoint in ENDPOINTS:
+            results[endpoint].extend(client.samples[endpoint])
+        results['not_modified'] += client.not_modified
+        results['errors'] += client.errors
+
+
+def serve(args):
+    """Child process: run the visualizer until stdin closes"""
+    sys.path.insert(0, str(Path(__file__).parent.parent / "visualizer"))
+    from server import VisualizationServer
+
+    started = time.monotonic()
+
+    def game_state():
+        level = int((time.monotonic() - started) / LEVEL_SECONDS) % 10 + 1
+        return {'total_xp': level * 100, 'current_world': 1, 'current_level': level}
+
+    server = VisualizationServer(port=0, game_state_callback=game_state, watch=args.watch,
+                                 workers=args.workers)
+    print(server.start(), flush=True)
+    sys.stdin.read()
+    server.stop()
+
+
+def start_server(args, workdir):
+    """Start the visualizer in a child process with the fake kubectl first on PATH"""
+    fixtures = write_fixtures(Path(workdir) / 'fixtures', pods=args.pods, deployments=args.deployments)
+    env = dict(os.environ, **install(Path(workdir) / 'bin', fixtures, args.kubectl_latency, args.churn))
+    # Never reach for a real cluster: kubectl only, and no kubeconfig
+    env.update(K8SQUEST_KUBE_CLIENT='off', KUBECONFIG=str(Path(workdir) / 'no-kubeconfig'))
+
+    command = [sys.executable, __file__, '--serve', '--workers', str(args.workers)]
+    if args.watch:
+        command.append('--watch')
+    proc = subprocess.Popen(command, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    url = proc.stdout.readline().strip()
+    if not url:
+        proc.kill()
+        raise RuntimeError("visualizer did not start")
+    port = int(url.rsplit(':', 1)[1])
+
+    # Wait for the first snapshot so it isn't part of the measurement
+    conn = http.client.HTTPConnection('localhost', port, timeout=30)
+    conn.request('GET', '/api/state')
+    conn.getresponse().read()
+    conn.close()
+    return proc, port
+
+
+def run(args):
+    """Run one benchmark and return its report"""
+    with tempfile.TemporaryDirectory(prefix='k8squest-bench-') as workdir:
+        proc, port = start_server(args, workdir)
+        try:
+            before = {name: scrape(port, name) for name in SERVER_METRICS}
+
+            results = {endpoint: [] for endpoint in ENDPOINTS}
+            results.update(not_modified=0, errors=0)
+            lock = threading.Lock()
+            threads = [
+                threading.Thread(target=run_client,
+                                 args=(port, args.requests, args.interval, args.reload_every, results, lock))
+                for _ in range(args.clients)
+            ]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+
+            server = {name: scrape(port, name) - before[name] for name in SERVER_METRICS}
+        finally:
+            proc.stdin.close()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    def mean_ms(name):
+        count = server[f'{name}_count']
+        return round(server[f'{name}_sum'] * 1000 / count, 3) if count else 0.0
+
+    total = sum(len(results[endpoint]) for endpoint in ENDPOINTS)
+    report = {
+        'config': {key: getattr(args, key) for key in
+                   ('clients', 'requests', 'workers', 'pods', 'deployments', 'kubectl_latency', 'interval', 'churn')},
+        'requests': total,
+        'seconds': round(elapsed, 3),
+        'throughput': round(total / elapsed, 1) if elapsed else 0.0,
+        'errors': results['errors'],
+        'not_modified': results['not_modified'],
+        'server_cpu_ms_per_request': round(server['process_cpu_seconds_total'] * 1000 / total, 3) if total else 0.0,
+        'kubectl_calls': int(server['k8squest_kube_request_seconds_count']),
+        'snapshots': int(server['k8squest_snapshot_build_seconds_count']),
+        'snapshot_build_ms': mean_ms('k8squest_snapshot_build_seconds'),
+        'issue_detection_ms': mean_ms('k8squest_issue_detection_seconds'),
+        'endpoints': {},
+    }
+    for endpoint in ENDPOINTS:
+        samples = results[endpoint]
+        report['endpoints'][endpoint] = {
+            'count': len(samples),
+            'p50_ms': round(percentile(samples, 50), 3),
+            'p95_ms': round(percentile(samples, 95), 3),
+            'p99_ms': round(percentile(samples, 99), 3),
+            'mean_ms': round(statistics.mean(samples), 3) if samples else 0.0,
+        }
+    return report
+
+
+def print_report(report):
+    config = report['config']
+    print(f"{config['clients']} clients x {config['requests']} polls, {config['pods']} pods, "
+          f"kubectl latency {config['kubectl_latency'] * 1000:.0f} ms, {config['workers']} workers\n")
+    print(f"{report['requests']} requests in {report['seconds']:.2f}s ({report['throughput']:.0f} req/s), "
+          f"{report['errors']} errors, {report['not_modified']} not modified")
+    print(f"server CPU {report['server_cpu_ms_per_request']:.3f} ms/request, "
+          f"{report['kubectl_calls']} kubectl calls")
+    print(f"{report['snapshots']} snapshots, build {report['snapshot_build_ms']:.2f} ms, "
+          f"issue detection {report['issue_detection_ms']:.2f} ms (mean)\n")
+    print(f"{'':8} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9}")
+    for endpoint, stats in report['endpoints'].items():
+        print(f"{endpoint:8} {stats['count']:7d} {stats['p50_ms']:9.2f} {stats['p95_ms']:9.2f} "
+              f"{stats['p99_ms']:9.2f} {stats['mean_ms']:9.2f}")
+
+
+def compare(report, baseline, tolerance):
+    """Regressions against a saved report: p95 latencies and CPU per request beyond the tolerance"""
+    regressions = []
+
+    def check(label, current, previous):
+        # Sub-millisecond noise is not a regression
+        if previous and current > previous * (1 + tolerance) and current - previous > 0.5:
+            regressions.append(f"{label}: {previous:.2f} -> {current:.2f}")
+
+    for endpoint, stats in report['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(endpoint)
+        if previous:
+            check(f"{endpoint} p95 ms", stats['p95_ms'], previous['p95_ms'])
+    for key, label in (('server_cpu_ms_per_request', 'server CPU ms/request'),
+                       ('snapshot_build_ms', 'snapshot build ms'),
+                       ('issue_detection_ms', 'issue detection ms')):
+        check(label, report[key], baseline.get(key))
+    if report['errors'] > baseline.get('errors', 0):
+        regressions.append(f"errors: {baseline.get('errors', 0)} -> {report['errors']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test the K8sQuest visualization server offline')
+    parser.add_argument('--clients', type=int, default=20, help='Concurrent browser clients (default: 20)')
+    parser.add_argument('--requests', type=int, default=50, help='State polls per client (default: 50)')
+    parser.add_argument('--interval', type=float, default=0.0,
+                        help='Seconds between polls; 0 polls back to back (default: 0)')
+    parser.add_argument('--reload-every', type=int, default=25,
+                        help='Reload the page (static assets, diagram) every N polls (default: 25)')
+    parser.add_argument('--workers', type=int, default=8, help='Server worker threads (default: 8)')
+    parser.add_argument('--pods', type=int, default=30, help='Pods in the fake namespace (default: 30)')
+    parser.add_argument('--deployments', type=int, default=3, help='Deployments owning them (default: 3)')
+    parser.add_argument('--kubectl-latency', type=float, default=0.05,
+                        help='Seconds each fake kubectl call takes (default: 0.05)')
+    parser.add_argument('--churn', action='store_true',
+                        help='Change a pod on every kubectl call, so every refresh publishes new state')
+    parser.add_argument('--watch', action='store_true', help='Run the informer (watches) as well')
+    parser.add_argument('--json', metavar='PATH', help='Write the report as JSON')
+    parser.add_argument('--baseline', metavar='PATH',
+                        help='Compare with a saved JSON report; exit 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown against the baseline (default: 0.25 = 25%%)')
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args)
+        return 0
+
+    report = run(args)
+    print_report(report)
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2) + '\n')
+
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print("\nRegressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions against the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Fake kubectl for K8sQuest benchmarks
+Answers the visualizer's list calls from canned JSON, with a configurable delay, so it runs offline
+"""
+
+import json
+import os
+import stat
+import sys
+import time
+from pathlib import Path
+
+# Environment read by the fake when it runs as kubectl
+FIXTURES_ENV = 'FAKE_KUBECTL_FIXTURES'
+LATENCY_ENV = 'FAKE_KUBECTL_LATENCY'
+CHURN_ENV = 'FAKE_KUBECTL_CHURN'
+
+NAMESPACE = 'k8squest'
+
+# kubectl resource name -> (kind, apiVersion)
+RESOURCES = {
+    'pods': ('Pod', 'v1'),
+    'services': ('Service', 'v1'),
+    'deployments': ('Deployment', 'apps/v1'),
+    'configmaps': ('ConfigMap', 'v1'),
+    'secrets': ('Secret', 'v1'),
+    'ingresses': ('Ingress', 'networking.k8s.io/v1'),
+    'networkpolicies': ('NetworkPolicy', 'networking.k8s.io/v1'),
+    'persistentvolumeclaims': ('PersistentVolumeClaim', 'v1'),
+    'statefulsets': ('StatefulSet', 'apps/v1'),
+    'endpoints': ('Endpoints', 'v1'),
+    'replicasets': ('ReplicaSet', 'apps/v1'),
+}
+
+
+def generate_namespace(pods=30, deployments=3, configmaps=5):
+    """Objects of a namespace running ``pods`` pods spread over ``deployments`` deployments"""
+    objects = {resource: [] for resource in RESOURCES}
+    rv = 1000
+
+    def meta(name, labels=None, owner=None):
+        nonlocal rv
+        rv += 1
+        metadata = {'name': name, 'namespace': NAMESPACE, 'uid': f'uid-{rv}', 'resourceVersion': str(rv)}
+        if labels:
+            metadata['labels'] = labels
+        if owner:
+            metadata['ownerReferences'] = [{'kind': owner[0], 'name': owner[1], 'controller': True}]
+        return metadata
+
+    for d in range(deployments):
+        app = f'app-{d}'
+        replicas = pods // deployments + (1 if d < pods % deployments else 0)
+        labels = {'app': app}
+        objects['deployments'].append({
+            'metadata': meta(app, labels),
+            'spec': {'replicas': replicas, 'selector': {'matchLabels': labels}},
+            'status': {'replicas': replicas, 'readyReplicas': replicas, 'availableReplicas': replicas}
+        })
+        objects['replicasets'].append({
+            'metadata': meta(f'{app}-5d9c7', labels, ('Deployment', app)),
+            'spec': {'replicas': replicas},
+            'status': {'replicas': replicas, 'readyReplicas': replicas}
+        })
+        addresses = []
+        for i in range(replicas):
+            ip = f'10.244.{d}.{i % 250 + 2}'
+            # Every tenth pod restarts now and then, so the issue rules have work to do
+            restarts = 3 if i % 10 == 9 else 0
+            objects['pods'].append({
+                'metadata': meta(f'{app}-5d9c7-{i:05d}', dict(labels, **{'pod-template-hash': '5d9c7'}),
+                                 ('ReplicaSet', f'{app}-5d9c7')),
+                'spec': {'containers': [{'name': 'web', 'image': 'nginx:1.25', 'ports': [{'containerPort': 80}]}]},
+                'status': {
+                    'phase': 'Running',
+                    'podIP': ip,
+                    'conditions': [{'type': 'Ready', 'status': 'True'}],
+                    'containerStatuses': [{'name': 'web', 'ready': True, 'restartCount': restarts,
+                                           'state': {'running': {'startedAt': '2026-01-01T00:00:00Z'}}}]
+                }
+            })
+            addresses.append({'ip': ip})
+        objects['services'].append({
+            'metadata': meta(app, labels),
+            'spec': {'selector': labels, 'ports': [{'port': 80, 'targetPort': 80}], 'type': 'ClusterIP'}
+        })
+        objects['endpoints'].append({
+            'metadata': meta(app, labels),
+            'subsets': [{'addresses': addresses, 'ports': [{'port': 80}]}] if addresses else []
+        })
+
+    for c in range(configmaps):
+        objects['configmaps'].append({'metadata': meta(f'config-{c}'), 'data': {'key': 'value' * 20}})
+
+    for resource, (kind, api_version) in RESOURCES.items():
+        for obj in objects[resource]:
+            obj['kind'] = kind
+            obj['apiVersion'] = api_version
+    return objects
+
+
+def write_fixtures(directory, **sizes):
+    """Write one <resource>.json List per resource into ``directory``"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for resource, items in generate_namespace(**sizes).items():
+        kind, api_version = RESOURCES[resource]
+        data = {'apiVersion': api_version, 'kind': f'{kind}List',
+                'metadata': {'resourceVersion': '2000'}, 'items': items}
+        (directory / f'{resource}.json').write_text(json.dumps(data))
+    return directory
+
+
+def install(bin_dir, fixtures_dir, latency=0.0, churn=False):
+    """Put an executable ``kubectl`` in ``bin_dir``; returns the environment to run it with"""
+    bin_dir = Path(bin_dir)
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    wrapper = bin_dir / 'kubectl'
+    wrapper.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{Path(__file__).resolve()}" "$@"\n')
+    wrapper.chmod(wrapper.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return {
+        'PATH': f'{bin_dir}{os.pathsep}{os.environ.get("PATH", "")}',
+        FIXTURES_ENV: str(fixtures_dir),
+        LATENCY_ENV: str(latency),
+        CHURN_ENV: '1' if churn else '',
+    }
+
+
+def load(fixtures, resource):
+    path = fixtures / f'{resource}.json'
+    if not path.exists():
+        return None
+    data = json.loads(path.read_text())
+    if resource == 'pods' and os.environ.get(CHURN_ENV) and data['items']:
+        # A restart count that changes on every call, so each refresh has news
+        pod = data['items'][0]
+        pod['status']['containerStatuses'][0]['restartCount'] = time.monotonic_ns()
+        pod['metadata']['resourceVersion'] = str(time.monotonic_ns())
+    return data
+
+
+def main(argv):
+    fixtures = Path(os.environ.get(FIXTURES_ENV, '.'))
+    time.sleep(float(os.environ.get(LATENCY_ENV) or 0))
+
+    if len(argv) < 2 or argv[0] != 'get':
+        sys.stderr.write(f"fake kubectl: unsupported command: {' '.join(argv)}\n")
+        return 1
+
+    if argv[1] == '--raw':
+        path, _, query = argv[2].partition('?')
+        if 'watch=1' in query:
+            # No changes ever happen; hold the watch open like the API server would
+            while True:
+                time.sleep(3600)
+        data = load(fixtures, path.rstrip('/').rpartition('/')[2])
+    else:
+        resources = argv[1].split(',')
+        lists = [load(fixtures, resource) for resource in resources]
+        if any(data is None for data in lists):
+            data = None
+        elif len(lists) == 1:
+            data = lists[0]
+        else:
+            data = {'apiVersion': 'v1', 'kind': 'List', 'metadata': {'resourceVersion': ''},
+                    'items': [item for data in lists for item in data['items']]}
+
+    if data is None:
+        sys.stderr.write(f"error: the server doesn't have a resource type \"{argv[1]}\"\n")
+        return 1
+    sys.stdout.write(json.dumps(data))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,132 @@
+"""
+In-memory static assets for the K8sQuest visualizer
+Loads visualizer/static once, precompresses it and serves it under content-hashed URLs
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import re
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_DIR = Path(__file__).parent / 'static'
+
+# Files smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 512
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+
+class Asset:
+    """One static file with its precompressed variants"""
+
+    __slots__ = ('url', 'content_type', 'body', 'encoded', 'etag', 'cache_control')
+
+    def __init__(self, url, content_type, body, cache_control):
+        self.url = url
+        self.content_type = content_type
+        self.body = body
+        self.cache_control = cache_control
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        self.encoded = {}
+
+        if len(body) >= MIN_COMPRESS_SIZE:
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.encoded['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.encoded['br'] = compressed
+
+    def negotiate(self, accept_encoding):
+        """Pick the smallest variant the client accepts; returns (body, encoding)"""
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding in ('br', 'gzip'):
+            if encoding in self.encoded and encoding in accepted:
+                return self.encoded[encoding], encoding
+        return self.body, None
+
+
+def parse_accept_encoding(header):
+    """Codings listed in an Accept-Encoding header, minus any with q=0"""
+    accepted = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if re.search(r'q\s*=\s*0(\.0*)?\s*$', params):
+            continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def hashed_name(name, body):
+    """app.js -> app.3f2a9c1d0b.js"""
+    digest = hashlib.sha256(body).hexdigest()[:10]
+    stem, dot, suffix = name.rpartition('.')
+    return f"{stem}.{digest}.{suffix}" if dot else f"{name}.{digest}"
+
+
+class AssetStore:
+    """Static files held in memory, keyed by URL path
+
+    Every file is reachable under a content-hashed URL served with
+    ``Cache-Control: immutable``. ``index.html`` is rewritten to point at
+    those URLs and, like the plain file names, is revalidated with its ETag.
+    """
+
+    def __init__(self, root=STATIC_DIR):
+        self.root = Path(root)
+        self.assets = {}
+        self.load()
+
+    def load(self):
+        assets = {}
+        hashed_urls = {}
+        files = sorted(p for p in self.root.rglob('*') if p.is_file())
+
+        for path in files:
+            name = path.relative_to(self.root).as_posix()
+            if name == 'index.html':
+                continue
+            body = path.read_bytes()
+            content_type = guess_type(name)
+            hashed = '/' + hashed_name(name, body)
+            hashed_urls[name] = hashed
+            assets[hashed] = Asset(hashed, content_type, body, IMMUTABLE)
+            assets['/' + name] = Asset('/' + name, content_type, body, REVALIDATE)
+
+        index = self.root / 'index.html'
+        if index.exists():
+            html = rewrite_references(index.read_text(), hashed_urls)
+            asset = Asset('/index.html', 'text/html; charset=utf-8', html.encode(), REVALIDATE)
+            assets['/index.html'] = asset
+            assets['/'] = asset
+
+        self.assets = assets
+
+    def get(self, url_path):
+        return self.assets.get(url_path)
+
+
+def guess_type(name):
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+        content_type += '; charset=utf-8'
+    return content_type
+
+
+def rewrite_references(html, hashed_urls):
+    """Point src/href attributes of local files at their hashed URLs"""
+    def replace(match):
+        attr, quote, target = match.group(1), match.group(2), match.group(3)
+        hashed = hashed_urls.get(target.lstrip('/'))
+        return f'{attr}={quote}{hashed}{quote}' if hashed else match.group(0)
+
+    return re.sub(r'''\b(src|href)=(["'])([^"':]+)\2''', replace, html)
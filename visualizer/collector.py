@@ -0,0 +1,179 @@
+"""
+Background snapshot collector for the K8sQuest visualizer
+Refreshes one shared /api/state payload so request handlers never call kubectl
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+try:
+    from visualizer.metrics import SNAPSHOT_REFRESHES
+except ImportError:
+    from metrics import SNAPSHOT_REFRESHES
+
+
+class SnapshotCollector:
+    """Keeps one pre-serialized /api/state payload fresh on an adaptive schedule
+
+    The cluster is re-listed every ``min_interval`` seconds right after a
+    change and backs off towards ``max_interval`` while the namespace is
+    idle. Game state is an in-process call, so it is checked every tick.
+
+    ``view`` turns the full cluster state into what clients are sent (e.g.
+    with large pod groups collapsed); ``detail()`` keeps the full state
+    available for requests that ask for more. Every published payload is
+    also handed to ``recorder``, if there is one.
+    """
+
+    def __init__(self, build_cluster_state, game_state_callback=None, hub=None,
+                 min_interval=1.0, max_interval=8.0, backoff=1.5, tick=0.5, view=None, recorder=None):
+        self.build_cluster_state = build_cluster_state
+        self.view = view
+        self.game_state_callback = game_state_callback
+        self.hub = hub
+        self.recorder = recorder
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.tick = tick
+
+        self.interval = min_interval
+        self.refreshes = 0
+        self.body = None
+        self.etag = None
+        self.serialize_ms = 0.0
+
+        self._cluster = None
+        self._detail = None
+        self._game = None
+        self._published_game = None
+        self._digest = None
+        self._cluster_digest = None
+        self._detail_etag = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start refreshing in a daemon thread"""
+        if self._thread:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='snapshot-collector', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the refresh thread"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def wake(self):
+        """Refresh the cluster state now instead of waiting for the next slot"""
+        self._wakeup.set()
+
+    def current(self, timeout=None):
+        """Return (body, etag) of the latest payload, waiting for the first one"""
+        if not self._ready.wait(timeout):
+            return None
+        with self._lock:
+            return self.body, self.etag
+
+    def detail(self):
+        """The full cluster state behind the latest payload"""
+        return self._detail
+
+    def detail_state(self):
+        """Return (cluster, game, etag) for the full state behind the latest payload
+
+        The ETag covers the full state rather than the client view, and is
+        computed on first use after each refresh.
+        """
+        with self._lock:
+            cluster, game = self._detail, self._game
+            if self._detail_etag is None and cluster is not None:
+                content = {'game': game, 'cluster': {k: v for k, v in cluster.items() if k != 'refresh'}}
+                digest = hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+                self._detail_etag = f'"{digest[:16]}"'
+            return cluster, game, self._detail_etag
+
+    def refresh(self, cluster=True):
+        """Rebuild the payload; returns True when its content changed"""
+        detail = self._detail
+        if cluster or self._cluster is None:
+            detail = self.build_cluster_state()
+            self._cluster = self.view(detail) if self.view else detail
+            # Refresh timings differ on every run, so they are left out of the digest
+            content = {k: v for k, v in self._cluster.items() if k != 'refresh'}
+            self._cluster_digest = hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+            self.refreshes += 1
+        game = self.game_state_callback() if self.game_state_callback else {}
+        # Detached copy: the callback may hand back live progress lists
+        game = json.loads(json.dumps(game, default=str))
+        with self._lock:
+            if detail is not self._detail or game != self._game:
+                self._detail_etag = None
+            self._detail, self._game = detail, game
+        changed = self._publish()
+        if cluster:
+            SNAPSHOT_REFRESHES.labels('changed' if changed else 'unchanged').inc()
+        return changed
+
+    def _publish(self):
+        # The cluster digest is kept from its last refresh; ticks only hash the game state
+        game = json.dumps(self._game, sort_keys=True, default=str)
+        digest = hashlib.sha1((self._cluster_digest + game).encode()).hexdigest()
+        if digest == self._digest:
+            self._ready.set()
+            return False
+
+        response = {
+            'game': self._game,
+            'cluster': self._cluster,
+            'timestamp': str(int(time.time()))
+        }
+        started = time.perf_counter()
+        body = json.dumps(response).encode()
+        serialize_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.serialize_ms = serialize_ms
+            self.body = body
+            self.etag = f'"{digest[:16]}"'
+            self._digest = digest
+        self._ready.set()
+
+        if self.recorder is not None:
+            self.recorder.record(response)
+        if self.hub is not None:
+            game_changed = self._published_game is not None and self._game != self._published_game
+            self.hub.publish(response, game_changed=game_changed)
+        self._published_game = self._game
+        return True
+
+    def _run(self):
+        next_refresh = 0.0
+        while not self._stopped.is_set():
+            now = time.monotonic()
+            woken = self._wakeup.is_set()
+            self._wakeup.clear()
+            due = woken or now >= next_refresh
+
+            try:
+                changed = self.refresh(cluster=due)
+            except Exception:
+                changed = False
+
+            if due:
+                if changed:
+                    self.interval = self.min_interval
+                else:
+                    self.interval = min(self.interval * self.backoff, self.max_interval)
+                next_refresh = time.monotonic() + self.interval
+
+            self._wakeup.wait(min(self.tick, max(next_refresh - time.monotonic(), 0)))
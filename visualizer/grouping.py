@@ -0,0 +1,104 @@
+"""
+Pod grouping for the K8sQuest visualizer
+Collapses pods by owning workload into counted groups so large namespaces stay cheap to send and draw
+"""
+
+try:
+    from visualizer.topology import collapse_topology, controller_of
+except ImportError:
+    from topology import collapse_topology, controller_of
+
+# Groups with more pods than this are sent as a summary until the client expands them
+GROUP_EXPAND_LIMIT = 5
+
+# Distinct issue messages kept per group summary
+MAX_GROUP_ISSUES = 5
+
+HEALTH_STATES = ('ready', 'not_ready', 'pending', 'failed')
+
+
+def owner_index(replicasets):
+    """ReplicaSet name -> (kind, name) of the workload that controls it"""
+    owners = {}
+    for rs in replicasets:
+        controller = controller_of(rs)
+        if controller:
+            owners[rs['metadata']['name']] = controller
+    return owners
+
+
+def group_id(pod, replicaset_owners):
+    """'Deployment/web' for a pod owned through a ReplicaSet, None for a bare pod"""
+    owner = controller_of(pod)
+    if owner is None:
+        return None
+    kind, name = owner
+    if kind == 'ReplicaSet' and name in replicaset_owners:
+        kind, name = replicaset_owners[name]
+    return f'{kind}/{name}'
+
+
+def pod_health(pod_info):
+    """Which histogram bucket a pod falls into"""
+    if pod_info['status'] in ('Failed', 'Unknown'):
+        return 'failed'
+    if pod_info['status'] == 'Pending':
+        return 'pending'
+    return 'ready' if pod_info['ready'] else 'not_ready'
+
+
+def summarize_groups(pod_infos):
+    """Counted groups with health histograms, in first-seen order"""
+    groups = {}
+    for info in pod_infos:
+        gid = info.get('group')
+        if gid is None:
+            continue
+        group = groups.get(gid)
+        if group is None:
+            kind, _, name = gid.partition('/')
+            group = groups[gid] = {
+                'id': gid,
+                'kind': kind,
+                'name': name,
+                'count': 0,
+                'health': dict.fromkeys(HEALTH_STATES, 0),
+                'restarts': 0,
+                'issues': {}
+            }
+        group['count'] += 1
+        group['health'][pod_health(info)] += 1
+        group['restarts'] += info['restarts']
+        for issue in info['issues']:
+            group['issues'][issue] = group['issues'].get(issue, 0) + 1
+
+    for group in groups.values():
+        ranked = sorted(group['issues'].items(), key=lambda item: (-item[1], item[0]))
+        group['issues'] = [{'issue': issue, 'pods': count} for issue, count in ranked[:MAX_GROUP_ISSUES]]
+    return list(groups.values())
+
+
+def collapse_pods(cluster, limit=GROUP_EXPAND_LIMIT):
+    """The cluster state as sent to clients: pods of large groups folded into their summary"""
+    groups = []
+    collapsed = set()
+    for group in cluster.get('pod_groups', []):
+        group = dict(group, collapsed=group['count'] > limit)
+        if group['collapsed']:
+            collapsed.add(group['id'])
+        groups.append(group)
+
+    if not collapsed:
+        return dict(cluster, pod_groups=groups)
+    pods = [pod for pod in cluster['pods'] if pod.get('group') not in collapsed]
+    view = dict(cluster, pods=pods, pod_groups=groups)
+    if 'topology' in cluster:
+        view['topology'] = collapse_topology(cluster['topology'], groups)
+    return view
+
+
+def pods_in_group(cluster, gid):
+    """Full pod entries of one group, or None if there is no such group"""
+    if not any(group['id'] == gid for group in cluster.get('pod_groups', [])):
+        return None
+    return [pod for pod in cluster['pods'] if pod.get('group') == gid]
@@ -0,0 +1,180 @@
+"""
+Bounded worker-pool HTTP server for the K8sQuest visualizer
+A fixed set of threads serves requests; idle keep-alive connections wait in a poller, not a thread
+"""
+
+import queue
+import selectors
+import socket
+import threading
+import time
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+BUSY_RESPONSE = (
+    b'HTTP/1.1 503 Service Unavailable\r\n'
+    b'Content-Length: 0\r\n'
+    b'Retry-After: 1\r\n'
+    b'Connection: close\r\n\r\n'
+)
+
+
+class PooledRequestMixin:
+    """Serve one request per turn so the server can park idle keep-alive connections
+
+    Mix in before a BaseHTTPRequestHandler subclass.
+    """
+
+    keep_alive = False
+    # Headers and body go out as separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+        self.keep_alive = not self.close_connection and hasattr(self.server, 'park')
+
+    def finish(self):
+        # A parked connection keeps its file objects until it is closed for good
+        if not self.keep_alive:
+            BaseHTTPRequestHandler.finish(self)
+
+    def resume(self):
+        """Serve the next request on a parked connection"""
+        self.handle()
+        self.finish()
+
+    def close_parked(self):
+        """Close an idle parked connection"""
+        self.keep_alive = False
+        try:
+            BaseHTTPRequestHandler.finish(self)
+        except OSError:
+            pass
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that hands requests to ``workers`` threads
+
+    New connections wait in a queue of ``backlog`` entries; beyond that the
+    server answers 503 immediately. Between requests, keep-alive
+    connections are watched by one selector thread and handed back to the
+    pool when the client sends again, or closed after ``keepalive_idle``
+    seconds.
+    """
+
+    request_queue_size = 64
+    keepalive_idle = 15
+
+    def __init__(self, server_address, handler_class, workers=8, backlog=64):
+        super().__init__(server_address, handler_class)
+        self.workers = workers
+        self._pending = queue.Queue(maxsize=backlog)
+        self._to_park = queue.Queue()
+        self._parked = {}
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._closing = False
+
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name=f'viz-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._poller = threading.Thread(target=self._poll, name='viz-keepalive', daemon=True)
+        self._poller.start()
+
+    @property
+    def parked_count(self):
+        return len(self._parked)
+
+    def process_request(self, request, client_address):
+        try:
+            self._pending.put_nowait((request, client_address, None))
+        except queue.Full:
+            try:
+                request.sendall(BUSY_RESPONSE)
+            except OSError:
+                pass
+            self.shutdown_request(request)
+
+    def park(self, handler):
+        """Hold an idle keep-alive connection without tying up a worker"""
+        self._to_park.put(handler)
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'x')
+        except OSError:
+            pass
+
+    def _work(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            request, client_address, handler = item
+            try:
+                if handler is None:
+                    handler = self.RequestHandlerClass(request, client_address, self)
+                else:
+                    handler.resume()
+            except Exception:
+                self.handle_error(request, client_address)
+                handler = None
+
+            if handler is not None and getattr(handler, 'keep_alive', False) and not self._closing:
+                self.park(handler)
+            else:
+                self.shutdown_request(request)
+
+    def _poll(self):
+        while not self._closing:
+            for key, _ in self._selector.select(timeout=1):
+                if key.fileobj is self._wake_r:
+                    try:
+                        while self._wake_r.recv(512):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                    continue
+
+                handler = key.data
+                self._selector.unregister(key.fileobj)
+                self._parked.pop(key.fileobj, None)
+                try:
+                    self._pending.put_nowait((handler.request, handler.client_address, handler))
+                except queue.Full:
+                    handler.close_parked()
+                    self.shutdown_request(handler.request)
+
+            while True:
+                try:
+                    handler = self._to_park.get_nowait()
+                except queue.Empty:
+                    break
+                self._parked[handler.request] = (handler, time.monotonic())
+                self._selector.register(handler.request, selectors.EVENT_READ, handler)
+
+            deadline = time.monotonic() - self.keepalive_idle
+            for sock, (handler, parked_at) in list(self._parked.items()):
+                if parked_at < deadline:
+                    self._close_parked(sock, handler)
+
+        for sock, (handler, _) in list(self._parked.items()):
+            self._close_parked(sock, handler)
+
+    def _close_parked(self, sock, handler):
+        self._selector.unregister(sock)
+        del self._parked[sock]
+        handler.close_parked()
+        self.shutdown_request(sock)
+
+    def server_close(self):
+        super().server_close()
+        self._closing = True
+        self._wake()
+        for _ in self._threads:
+            self._pending.put(None)
@@ -0,0 +1,292 @@
+"""
+Watch-based informer cache for the K8sQuest visualizer
+Keeps an in-memory copy of the namespace fed by long-lived watch streams
+"""
+
+import json
+import subprocess
+import sys
+import threading
+import time
+
+try:
+    from visualizer.snapshot import (
+        METADATA_ONLY_KINDS, NAMESPACE, SNAPSHOT_KINDS, Snapshot, api_path, run_kubectl
+    )
+except ImportError:
+    from snapshot import (
+        METADATA_ONLY_KINDS, NAMESPACE, SNAPSHOT_KINDS, Snapshot, api_path, run_kubectl
+    )
+
+# Annotations that can be large and are never shown
+DROPPED_ANNOTATIONS = ('kubectl.kubernetes.io/last-applied-configuration',)
+
+# Watch restart backoff after a failed stream (seconds)
+MIN_RETRY_DELAY = 1
+MAX_RETRY_DELAY = 30
+
+
+class ResyncRequired(Exception):
+    """The watch fell behind (410 Gone) and the kind must be re-listed"""
+
+
+class KubectlWatch:
+    """A ``kubectl get --raw`` watch process, iterated like a KubeClient WatchStream"""
+
+    def __init__(self, proc):
+        self.proc = proc
+
+    def __iter__(self):
+        return iter(self.proc.stdout)
+
+    @property
+    def returncode(self):
+        return self.proc.returncode
+
+    def close(self):
+        try:
+            if self.proc.poll() is None:
+                self.proc.terminate()
+            self.proc.wait()
+        except OSError:
+            pass
+
+
+def compact(obj, kind):
+    """Strip bulky fields and intern label strings so thousands of objects stay small"""
+    obj = dict(obj)
+    metadata = dict(obj.get('metadata') or {})
+    metadata.pop('managedFields', None)
+
+    annotations = metadata.get('annotations')
+    if annotations:
+        annotations = {k: v for k, v in annotations.items() if k not in DROPPED_ANNOTATIONS}
+        if annotations:
+            metadata['annotations'] = annotations
+        else:
+            del metadata['annotations']
+
+    labels = metadata.get('labels')
+    if labels:
+        metadata['labels'] = {sys.intern(k): sys.intern(v) for k, v in labels.items()}
+    if 'namespace' in metadata:
+        metadata['namespace'] = sys.intern(metadata['namespace'])
+
+    # The visualizer only lists secret names; don't keep the material around
+    if kind == 'Secret':
+        obj.pop('data', None)
+        obj.pop('stringData', None)
+
+    obj['kind'] = sys.intern(kind)
+    obj['metadata'] = metadata
+    return obj
+
+
+class ObjectStore:
+    """Thread-safe store of compacted objects, keyed by state key and name"""
+
+    def __init__(self, keys=SNAPSHOT_KINDS):
+        self._lock = threading.Lock()
+        self._objects = {key: {} for key in keys}
+        self.resource_versions = {key: None for key in keys}
+
+    def replace(self, key, items, resource_version):
+        """Swap in a full listing of one kind"""
+        kind = SNAPSHOT_KINDS[key][1]
+        objects = {item['metadata']['name']: compact(item, kind) for item in items}
+        with self._lock:
+            self._objects[key] = objects
+            self.resource_versions[key] = resource_version
+
+    def apply(self, key, event_type, obj):
+        """Apply one ADDED/MODIFIED/DELETED watch event"""
+        kind = SNAPSHOT_KINDS[key][1]
+        name = obj['metadata']['name']
+        with self._lock:
+            if event_type == 'DELETED':
+                self._objects[key].pop(name, None)
+            else:
+                self._objects[key][name] = compact(obj, kind)
+            self.resource_versions[key] = obj['metadata'].get('resourceVersion')
+
+    def set_resource_version(self, key, resource_version):
+        with self._lock:
+            self.resource_versions[key] = resource_version
+
+    def items(self, key):
+        with self._lock:
+            return list(self._objects[key].values())
+
+    def snapshot(self):
+        """Point-in-time copy of every kind"""
+        start = time.perf_counter()
+        with self._lock:
+            items = {key: list(objects.values()) for key, objects in self._objects.items()}
+        return Snapshot(
+            items=items,
+            kubectl_calls=0,
+            duration_ms=(time.perf_counter() - start) * 1000,
+            source='watch'
+        )
+
+
+class NamespaceInformer:
+    """List-then-watch every visualized kind through the raw watch API
+
+    Each kind is listed once to get a resourceVersion, then followed with
+    ``kubectl get --raw '...?watch=1&resourceVersion=N'``, or over a direct
+    API server connection when a KubeClient is given. A 410 Gone (the watch
+    fell too far behind) triggers a re-list of that kind.
+    """
+
+    def __init__(self, namespace=NAMESPACE, on_change=None, runner=run_kubectl,
+                 popen=subprocess.Popen, client=None):
+        self.namespace = namespace
+        self.on_change = on_change
+        self.runner = runner
+        self.popen = popen
+        self.client = client
+        self.store = ObjectStore()
+        self.relists = 0
+        self.events = 0
+
+        self._listed = set()
+        self._streaming = set()
+        self._errors = {}
+        self._watches = {}
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    @property
+    def synced(self):
+        """True once every kind has been listed at least once"""
+        return len(self._listed) == len(SNAPSHOT_KINDS)
+
+    def start(self):
+        """Start one watch thread per kind"""
+        self._stopped.clear()
+        for key in SNAPSHOT_KINDS:
+            thread = threading.Thread(target=self._watch_kind, args=(key,),
+                                      name=f'informer-{key}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stop all watch streams"""
+        self._stopped.set()
+        with self._lock:
+            watches = list(self._watches.values())
+        for watch in watches:
+            watch.close()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+
+    def snapshot(self):
+        """Cached objects; kinds whose watch is down are marked stale"""
+        snapshot = self.store.snapshot()
+        for key in SNAPSHOT_KINDS:
+            if key in self._streaming:
+                snapshot.kind_status[key] = {'status': 'fresh', 'latency_ms': 0.0}
+            else:
+                snapshot.kind_status[key] = {
+                    'status': 'stale' if key in self._listed else 'failed',
+                    'latency_ms': 0.0,
+                    'error': self._errors.get(key, 'watch reconnecting')
+                }
+        return snapshot
+
+    def relist(self, key):
+        """Replace one kind with a fresh listing"""
+        path = api_path(key, self.namespace)
+        data = None
+        if self.client is not None:
+            try:
+                data = self.client.list(path, metadata_only=key in METADATA_ONLY_KINDS)
+            except OSError:
+                pass  # API server unreachable; kubectl may still get through
+        if data is None:
+            data = json.loads(self.runner(['get', '--raw', path]))
+        self.store.replace(key, data.get('items') or [],
+                           (data.get('metadata') or {}).get('resourceVersion'))
+        self.relists += 1
+        self._listed.add(key)
+        self._notify()
+
+    def handle_event(self, key, event):
+        """Apply one decoded watch event to the store"""
+        event_type = event.get('type')
+        obj = event.get('object') or {}
+
+        if event_type == 'ERROR':
+            if obj.get('code') == 410:
+                raise ResyncRequired(obj.get('message', 'resourceVersion too old'))
+            raise RuntimeError(obj.get('message', 'watch error'))
+
+        if event_type == 'BOOKMARK':
+            self.store.set_resource_version(key, obj['metadata'].get('resourceVersion'))
+            return
+
+        self.store.apply(key, event_type, obj)
+        self.events += 1
+        self._notify()
+
+    def _notify(self):
+        if self.on_change:
+            try:
+                self.on_change()
+            except Exception:
+                pass
+
+    def _watch_kind(self, key):
+        delay = MIN_RETRY_DELAY
+        while not self._stopped.is_set():
+            try:
+                if self.store.resource_versions[key] is None:
+                    self.relist(key)
+                self._stream(key)
+                delay = MIN_RETRY_DELAY
+            except ResyncRequired:
+                self.store.set_resource_version(key, None)
+            except Exception as e:
+                self._errors[key] = str(e)
+                self._stopped.wait(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+
+    def _open_watch(self, key, rv):
+        if self.client is not None:
+            try:
+                return self.client.watch(api_path(key, self.namespace), resource_version=rv,
+                                         metadata_only=key in METADATA_ONLY_KINDS)
+            except OSError:
+                pass  # fall back to kubectl for this attempt
+        path = f"{api_path(key, self.namespace)}?watch=1&allowWatchBookmarks=true&resourceVersion={rv}"
+        return KubectlWatch(self.popen(['kubectl', 'get', '--raw', path],
+                                       stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True))
+
+    def _stream(self, key):
+        """Follow one watch until the API server or kubectl closes it"""
+        watch = self._open_watch(key, self.store.resource_versions[key])
+        with self._lock:
+            self._watches[key] = watch
+        self._streaming.add(key)
+
+        received = 0
+        try:
+            for line in watch:
+                if self._stopped.is_set():
+                    break
+                line = line.strip()
+                if line:
+                    self.handle_event(key, json.loads(line))
+                    received += 1
+        finally:
+            self._streaming.discard(key)
+            with self._lock:
+                self._watches.pop(key, None)
+            watch.close()
+
+        # An immediate failure (no events at all) backs off instead of spinning
+        if watch.returncode and not received and not self._stopped.is_set():
+            raise RuntimeError(f"watch for {key} exited with {watch.returncode}")
@@ -0,0 +1,364 @@
+"""
+Kubernetes REST client for K8sQuest
+Talks to the API server directly over pooled keep-alive connections, using the current kubeconfig context
+"""
+
+import base64
+import http.client
+import json
+import os
+import queue
+import socket
+import ssl
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+import yaml
+
+try:
+    from visualizer.metrics import KUBE_REQUEST_SECONDS, resource_of
+except ImportError:
+    from metrics import KUBE_REQUEST_SECONDS, resource_of
+
+# Deadline for a single list/get request (seconds)
+REQUEST_TIMEOUT = 4
+
+# Idle keep-alive connections kept per client
+MAX_IDLE_CONNECTIONS = 4
+
+# Items per page when listing a collection; larger lists are followed with continue tokens
+LIST_CHUNK_SIZE = 500
+
+# Accept headers asking the API server for object metadata only
+METADATA_LIST_ACCEPT = 'application/json;as=PartialObjectMetadataList;g=meta.k8s.io;v=v1,application/json'
+METADATA_WATCH_ACCEPT = 'application/json;as=PartialObjectMetadata;g=meta.k8s.io;v=v1,application/json'
+
+# Server-side lifetime of one watch request; the socket waits a little longer
+WATCH_TIMEOUT = 300
+
+# Errors that mean a reused keep-alive connection went away and the request can be retried
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+class KubeConfigError(Exception):
+    """The kubeconfig can't be used without kubectl (missing, or an exec/auth plugin)"""
+
+
+class ApiError(Exception):
+    """The API server answered with an error status"""
+
+    def __init__(self, status, message):
+        super().__init__(f"API server returned {status}: {message}")
+        self.status = status
+
+
+def kubeconfig_path():
+    """First file in $KUBECONFIG, else ~/.kube/config"""
+    env = os.environ.get('KUBECONFIG')
+    if env:
+        return Path(env.split(os.pathsep)[0]).expanduser()
+    return Path.home() / '.kube' / 'config'
+
+
+def _named(entries, name):
+    for entry in entries or []:
+        if entry.get('name') == name:
+            return entry
+    raise KubeConfigError(f"kubeconfig has no entry named {name!r}")
+
+
+def _material(section, key, base_dir):
+    """PEM bytes from '<key>-data' (base64) or '<key>' (a file path)"""
+    if section.get(f'{key}-data'):
+        return base64.b64decode(section[f'{key}-data'])
+    if section.get(key):
+        return (base_dir / Path(section[key]).expanduser()).read_bytes()
+    return None
+
+
+def load_kubeconfig(path=None):
+    """Server URL, SSL context and headers for the current context
+
+    Returns ``(server, ssl_context, headers)``. Credentials that need
+    kubectl's help (exec and auth-provider plugins) raise KubeConfigError so
+    the caller can fall back to kubectl.
+    """
+    path = Path(path) if path else kubeconfig_path()
+    try:
+        config = yaml.safe_load(path.read_text()) or {}
+    except (OSError, yaml.YAMLError) as e:
+        raise KubeConfigError(f"can't read {path}: {e}")
+
+    context_name = config.get('current-context')
+    if not context_name:
+        raise KubeConfigError("kubeconfig has no current-context")
+    context = _named(config.get('contexts'), context_name).get('context') or {}
+    cluster = _named(config.get('clusters'), context.get('cluster')).get('cluster') or {}
+    user = {}
+    if context.get('user'):
+        user = _named(config.get('users'), context['user']).get('user') or {}
+
+    if 'exec' in user or 'auth-provider' in user:
+        raise KubeConfigError("credential plugins are only supported through kubectl")
+
+    server = cluster.get('server')
+    if not server:
+        raise KubeConfigError(f"cluster {context.get('cluster')!r} has no server")
+
+    base_dir = path.parent
+    headers = {'Accept': 'application/json'}
+    token = user.get('token')
+    if not token and user.get('tokenFile'):
+        token = (base_dir / user['tokenFile']).read_text().strip()
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    elif user.get('username'):
+        credentials = f"{user['username']}:{user.get('password', '')}".encode()
+        headers['Authorization'] = 'Basic ' + base64.b64encode(credentials).decode()
+
+    context_ssl = None
+    if server.startswith('https://'):
+        context_ssl = ssl.create_default_context()
+        if cluster.get('insecure-skip-tls-verify'):
+            context_ssl.check_hostname = False
+            context_ssl.verify_mode = ssl.CERT_NONE
+        else:
+            ca = _material(cluster, 'certificate-authority', base_dir)
+            if ca:
+                context_ssl.load_verify_locations(cadata=ca.decode())
+        cert = _material(user, 'client-certificate', base_dir)
+        key = _material(user, 'client-key', base_dir)
+        if cert and key:
+            _load_cert_chain(context_ssl, cert, key)
+
+    return server, context_ssl, headers
+
+
+def _load_cert_chain(context, cert, key):
+    """ssl only loads client certificates from files, so stage them briefly"""
+    with tempfile.TemporaryDirectory(prefix='k8squest-') as tmp:
+        cert_file = Path(tmp) / 'client.crt'
+        key_file = Path(tmp) / 'client.key'
+        cert_file.write_bytes(cert)
+        key_file.touch(mode=0o600)
+        key_file.write_bytes(key)
+        context.load_cert_chain(str(cert_file), str(key_file))
+
+
+class WatchStream:
+    """Iterates the newline-delimited events of one watch request"""
+
+    def __init__(self, conn, response):
+        self.conn = conn
+        self.response = response
+        self.returncode = None
+
+    def __iter__(self):
+        try:
+            while True:
+                line = self.response.readline()
+                if not line:
+                    break
+                yield line.decode()
+        except (OSError, ValueError, http.client.HTTPException):
+            # Closed from another thread, or the server dropped the stream
+            self.returncode = 1
+        else:
+            self.returncode = 0
+
+    def close(self):
+        """Unblock a reader waiting on the stream and release the socket"""
+        sock = self.conn.sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.conn.close()
+
+
+class KubeClient:
+    """JSON client for one API server, reusing a small pool of keep-alive connections
+
+    ``get()`` borrows an idle connection (or opens one) and returns it to the
+    pool afterwards, so steady-state refreshes pay for no TCP or TLS
+    handshakes. Watches get a dedicated connection for their lifetime.
+    """
+
+    def __init__(self, server, ssl_context=None, headers=None, timeout=REQUEST_TIMEOUT,
+                 max_idle=MAX_IDLE_CONNECTIONS):
+        parts = urlsplit(server)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip('/')
+        self.ssl_context = ssl_context
+        self.headers = dict(headers or {'Accept': 'application/json'})
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_kubeconfig(cls, path=None, **kwargs):
+        server, ssl_context, headers = load_kubeconfig(path)
+        return cls(server, ssl_context=ssl_context, headers=headers, **kwargs)
+
+    def _connect(self, timeout):
+        with self._lock:
+            self.connections_opened += 1
+        if self.scheme == 'https':
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=timeout,
+                                               context=self.ssl_context)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        conn.connect()
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn
+
+    def _release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def get(self, path, timeout=None, accept=None):
+        """GET a path and return the decoded JSON body"""
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            data = self._get(path, timeout or self.timeout, accept)
+            outcome = 'ok'
+            return data
+        finally:
+            KUBE_REQUEST_SECONDS.labels('api', resource_of(path), outcome).observe(time.perf_counter() - start)
+
+    def _get(self, path, timeout, accept):
+        headers = dict(self.headers, Accept=accept) if accept else self.headers
+        try:
+            conn, reused = self._idle.get_nowait(), True
+            conn.sock.settimeout(timeout)
+        except queue.Empty:
+            conn, reused = self._connect(timeout), False
+
+        try:
+            try:
+                conn.request('GET', self.base_path + path, headers=headers)
+                response = conn.getresponse()
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection; retry once on a new one
+                conn.close()
+                conn = self._connect(timeout)
+                conn.request('GET', self.base_path + path, headers=headers)
+                response = conn.getresponse()
+            body = response.read()
+        except http.client.HTTPException as e:
+            conn.close()
+            raise ConnectionError(str(e))
+        except BaseException:
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+
+        if response.status >= 400:
+            raise ApiError(response.status, _error_message(body))
+        return json.loads(body)
+
+    def list(self, path, timeout=None, limit=LIST_CHUNK_SIZE, metadata_only=False):
+        """List a collection in pages of ``limit`` items and return one merged List
+
+        With ``metadata_only`` the server sends PartialObjectMetadata items,
+        leaving out spec, status and data.
+        """
+        accept = METADATA_LIST_ACCEPT if metadata_only else None
+        separator = '&' if '?' in path else '?'
+        result = None
+        token = None
+        while True:
+            query = f"limit={limit}" + (f"&continue={quote(token)}" if token else '')
+            page = self.get(f"{path}{separator}{query}", timeout=timeout, accept=accept)
+            if result is None:
+                result = page
+                result['items'] = list(page.get('items') or [])
+            else:
+                result['items'].extend(page.get('items') or [])
+            token = (page.get('metadata') or {}).get('continue')
+            if not token:
+                break
+        # Only the first page's resourceVersion is a consistent point to watch from
+        result.setdefault('metadata', {}).pop('continue', None)
+        return result
+
+    def watch(self, path, resource_version=None, metadata_only=False):
+        """Open a watch on a collection path; iterate the result for raw event lines"""
+        headers = dict(self.headers, Accept=METADATA_WATCH_ACCEPT) if metadata_only else self.headers
+        separator = '&' if '?' in path else '?'
+        query = f"watch=1&allowWatchBookmarks=true&timeoutSeconds={WATCH_TIMEOUT}"
+        if resource_version:
+            query += f"&resourceVersion={resource_version}"
+
+        conn = self._connect(self.timeout)
+        try:
+            conn.request('GET', f"{self.base_path}{path}{separator}{query}", headers=headers)
+            response = conn.getresponse()
+        except http.client.HTTPException as e:
+            conn.close()
+            raise ConnectionError(str(e))
+        except BaseException:
+            conn.close()
+            raise
+
+        if response.status >= 400:
+            body = response.read()
+            conn.close()
+            raise ApiError(response.status, _error_message(body))
+
+        # Events may be minutes apart; only a dead server should end the stream
+        conn.sock.settimeout(WATCH_TIMEOUT + 30)
+        return WatchStream(conn, response)
+
+    def close(self):
+        """Close idle pooled connections"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _error_message(body):
+    """The message of a Status object, or the raw body"""
+    try:
+        return json.loads(body).get('message') or body.decode(errors='replace')
+    except (ValueError, AttributeError):
+        return body.decode(errors='replace')[:200]
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def default_client():
+    """Shared client for the current kubeconfig context, or None to use kubectl
+
+    Set ``K8SQUEST_KUBE_CLIENT=off`` to always go through kubectl.
+    """
+    global _default_client
+    if os.environ.get('K8SQUEST_KUBE_CLIENT', 'on').lower() == 'off':
+        return None
+    with _default_lock:
+        if _default_client is None:
+            try:
+                _default_client = KubeClient.from_kubeconfig()
+            except (KubeConfigError, OSError, ssl.SSLError, ValueError):
+                _default_client = False
+        return _default_client or None
@@ -0,0 +1,274 @@
+"""
+Metrics for the K8sQuest visualizer
+Counters, gauges and histograms served at /metrics in the Prometheus text exposition format
+"""
+
+import bisect
+import os
+import sys
+import threading
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Upper bounds (seconds) for latency histograms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds (bytes) for response size histograms
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+class Metric:
+    """A named metric with one child per combination of label values"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values):
+        """The child for these label values, created on first use"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class _Value:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter(Metric):
+    """A value that only goes up; ``callback`` is read at scrape time instead"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        self.callback = callback
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def render(self):
+        if self.callback is not None:
+            self._default.set(self.callback())
+        return super().render()
+
+    def _render_child(self, values, child):
+        return [f'{self.name}{format_labels(self.labelnames, values)} {format_value(child.value)}']
+
+
+class Gauge(Counter):
+    """A value that goes up and down"""
+
+    kind = 'gauge'
+
+    def set(self, value):
+        self._default.set(value)
+
+
+class _Buckets:
+    __slots__ = ('bounds', 'counts', 'sum', '_lock')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def _render_child(self, values, child):
+        with child._lock:
+            counts = list(child.counts)
+            total = child.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            labels = format_labels(self.labelnames, values, [('le', format_value(float(bound)))])
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = format_labels(self.labelnames, values)
+        lines.append(f'{self.name}_sum{labels} {format_value(total)}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class Registry:
+    """Every metric of the process, in registration order"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add a metric; a metric of the same name is replaced (e.g. a restarted server's gauges)"""
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=(), callback=None):
+        return self.register(Counter(name, documentation, labelnames, callback))
+
+    def gauge(self, name, documentation, labelnames=(), callback=None):
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """The text exposition of every metric"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def resident_memory_bytes():
+    """Current RSS from /proc, or the peak RSS where /proc is not available"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def cpu_seconds():
+    times = os.times()
+    return times.user + times.system
+
+
+REGISTRY = Registry()
+
+KUBE_REQUEST_SECONDS = REGISTRY.histogram(
+    'k8squest_kube_request_seconds',
+    'Duration of kubectl invocations and API server requests',
+    ('client', 'resource', 'outcome')
+)
+SNAPSHOT_BUILD_SECONDS = REGISTRY.histogram(
+    'k8squest_snapshot_build_seconds',
+    'Time to read the namespace into a snapshot, by source',
+    ('source',)
+)
+ISSUE_DETECTION_SECONDS = REGISTRY.histogram(
+    'k8squest_issue_detection_seconds',
+    'Time spent evaluating issue rules per snapshot'
+)
+SNAPSHOT_REFRESHES = REGISTRY.counter(
+    'k8squest_snapshot_refreshes_total',
+    'Collector refreshes, by whether the published payload changed',
+    ('result',)
+)
+RESPONSE_BYTES = REGISTRY.histogram(
+    'k8squest_response_bytes',
+    'Size of response bodies sent, by endpoint',
+    ('endpoint',),
+    buckets=SIZE_BUCKETS
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    'k8squest_cache_requests_total',
+    'Conditional requests answered from the client cache (hit, 304) or with a body (miss)',
+    ('cache', 'result')
+)
+REGISTRY.gauge(
+    'process_resident_memory_bytes',
+    'Resident memory size in bytes',
+    callback=resident_memory_bytes
+)
+REGISTRY.counter(
+    'process_cpu_seconds_total',
+    'Total user and system CPU time in seconds',
+    callback=cpu_seconds
+)
+
+
+def resource_of(path):
+    """Resource of an API path: '/api/v1/namespaces/k8squest/pods/web-1?x=1' -> 'pods'"""
+    segments = [s for s in path.partition('?')[0].split('/') if s]
+    if 'namespaces' in segments[:-2]:
+        return segments[segments.index('namespaces') + 2]
+    version_index = 1 if segments[:1] == ['api'] else 2
+    return segments[version_index + 1] if len(segments) > version_index + 1 else 'unknown'
+
+
+def kubectl_resource(args):
+    """Resource label for a kubectl invocation ('all' for the multi-kind list)"""
+    if len(args) < 2:
+        return 'unknown'
+    if args[1] == '--raw' and len(args) > 2:
+        return resource_of(args[2])
+    return 'all' if ',' in args[1] else args[1]
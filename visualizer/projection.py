@@ -0,0 +1,114 @@
+"""
+Field projection and pagination for /api/state
+Lets a panel ask for just the kinds, fields and page of objects it shows
+"""
+
+import base64
+import json
+
+# Keys of the cluster state that always come back, whatever kinds= asks for
+ALWAYS_INCLUDED = ('refresh', 'kinds', 'error')
+
+MAX_LIMIT = 500
+
+
+class ContinueExpired(Exception):
+    """The state changed since the continue token was issued"""
+
+
+class Projection:
+    """Parsed kinds=, fields=, limit= and continue= parameters"""
+
+    def __init__(self, kinds=None, fields=None, limit=None, offsets=None, etag=None):
+        self.kinds = kinds
+        self.fields = fields
+        self.limit = limit
+        self.offsets = offsets or {}
+        self.etag = etag
+
+    @property
+    def empty(self):
+        return self.kinds is None and self.fields is None and self.limit is None and not self.offsets
+
+
+def parse_query(query):
+    """Build a Projection from parse_qs output; raises ValueError on bad input"""
+    def values(name):
+        found = [v for value in query.get(name, []) for v in value.split(',') if v.strip()]
+        return [v.strip() for v in found] or None
+
+    kinds = values('kinds')
+    fields = values('fields')
+    limit = None
+    if query.get('limit'):
+        limit = int(query['limit'][0])
+        if not 0 < limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+
+    offsets, etag = {}, None
+    if query.get('continue'):
+        offsets, etag = decode_continue(query['continue'][0])
+
+    return Projection(
+        kinds=set(kinds) if kinds else None,
+        fields=['name'] + [f for f in fields if f != 'name'] if fields else None,
+        limit=limit,
+        offsets=offsets,
+        etag=etag
+    )
+
+
+def encode_continue(offsets, etag):
+    raw = json.dumps({'o': offsets, 'e': etag}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_continue(token):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        return {k: int(v) for k, v in data['o'].items()}, data['e']
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise ValueError("malformed continue token")
+
+
+def project(cluster, projection, etag):
+    """Apply a projection to the full cluster state
+
+    Returns the projected state. List kinds are cut to ``limit`` items from
+    the offset in the continue token; if any kind has more, the state gets a
+    ``continue`` token for the next page. The token holds every kind's
+    offset, so kinds already used up come back empty on later pages. A token issued for an older state
+    raises ContinueExpired, like an expired Kubernetes list continuation.
+    """
+    if projection.offsets and projection.etag != etag:
+        raise ContinueExpired("state changed since the continue token was issued; start again")
+
+    result = {}
+    next_offsets = {}
+    more = False
+    for key, value in cluster.items():
+        if key in ALWAYS_INCLUDED:
+            result[key] = value
+            continue
+        if projection.kinds is not None and key not in projection.kinds:
+            continue
+        if not isinstance(value, list):
+            result[key] = value
+            continue
+
+        items = value
+        if projection.limit is not None:
+            start = projection.offsets.get(key, 0)
+            items = value[start:start + projection.limit]
+            next_offsets[key] = min(start + projection.limit, len(value))
+            more = more or next_offsets[key] < len(value)
+        elif projection.offsets:
+            items = value[projection.offsets.get(key, 0):]
+
+        if projection.fields is not None:
+            items = [{f: item[f] for f in projection.fields if f in item} for item in items]
+        result[key] = items
+
+    if more:
+        result['continue'] = encode_continue(next_offsets, etag)
+    return result
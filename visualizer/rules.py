@@ -0,0 +1,266 @@
+"""
+Issue detection rules for the K8sQuest visualizer
+A declarative rule table, evaluated incrementally and memoized by resourceVersion
+"""
+
+import threading
+
+try:
+    from visualizer.snapshot import count_endpoint_addresses
+    from visualizer.topology import LabelIndex, ingress_backends
+except ImportError:
+    from snapshot import count_endpoint_addresses
+    from topology import LabelIndex, ingress_backends
+
+
+class Rule:
+    """One check for one kind
+
+    ``check(obj, index)`` returns the issue messages for ``obj``. ``uses``
+    names the other kinds the check reads through the index; its results
+    are only reused while the object and those kinds are unchanged.
+    """
+
+    __slots__ = ('key', 'check', 'uses')
+
+    def __init__(self, key, check, uses=()):
+        self.key = key
+        self.check = check
+        self.uses = tuple(uses)
+
+
+class SnapshotIndex:
+    """Lookups across a snapshot, each built on first use"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self._pods = None
+        self._endpoints = None
+        self._services = None
+
+    def pods_matching(self, match_labels, match_expressions=()):
+        """Names of pods whose labels satisfy a selector"""
+        if self._pods is None:
+            self._pods = LabelIndex(self.snapshot.get('pods'))
+        return self._pods.match(match_labels, match_expressions)
+
+    def endpoint_count(self, name):
+        if self._endpoints is None:
+            self._endpoints = count_endpoint_addresses(self.snapshot.get('endpoints'))
+        return self._endpoints.get(name, 0)
+
+    def service(self, name):
+        if self._services is None:
+            self._services = {svc['metadata']['name']: svc for svc in self.snapshot.get('services')}
+        return self._services.get(name)
+
+
+def format_selector(selector):
+    return ','.join(f'{k}={v}' for k, v in sorted(selector.items()))
+
+
+def is_pod_ready(pod):
+    """Check if pod is ready"""
+    conditions = pod['status'].get('conditions', [])
+    for condition in conditions:
+        if condition.get('type') == 'Ready':
+            return condition.get('status') == 'True'
+    return False
+
+
+# -- Pods ------------------------------------------------------------------
+
+def pod_phase(pod, index):
+    phase = pod['status'].get('phase')
+    if phase in ['Failed', 'Unknown']:
+        return [f"Pod in {phase} state"]
+    return []
+
+
+def pod_containers(pod, index):
+    issues = []
+    for cs in pod['status'].get('containerStatuses', []):
+        if cs.get('state', {}).get('waiting'):
+            reason = cs['state']['waiting'].get('reason', 'Unknown')
+            issues.append(f"Container waiting: {reason}")
+
+        if cs.get('restartCount', 0) > 0:
+            issues.append(f"Container restarted {cs['restartCount']} times")
+    return issues
+
+
+def pod_not_ready(pod, index):
+    return [] if is_pod_ready(pod) else ["Pod not ready"]
+
+
+# -- Services --------------------------------------------------------------
+
+def service_endpoints(svc, index):
+    if index.endpoint_count(svc['metadata']['name']):
+        return []
+    selector = svc['spec'].get('selector')
+    if selector and not index.pods_matching(selector):
+        return [f"No endpoints - selector {format_selector(selector)} matches no pods"]
+    return ["No endpoints - selector might not match any pods"]
+
+
+def service_selector(svc, index):
+    return [] if svc['spec'].get('selector') else ["No selector defined"]
+
+
+# -- Workloads -------------------------------------------------------------
+
+def replicas_ready(obj, index):
+    replicas = obj['spec'].get('replicas', 0)
+    ready = (obj.get('status') or {}).get('readyReplicas', 0)
+    return [f"Only {ready}/{replicas} replicas ready"] if ready < replicas else []
+
+
+def scaled_to_zero(kind):
+    def check(obj, index):
+        return [f"{kind} scaled to 0 replicas"] if obj['spec'].get('replicas', 0) == 0 else []
+    return check
+
+
+def statefulset_service(sts, index):
+    name = sts['spec'].get('serviceName')
+    if name and index.service(name) is None:
+        return [f"Governing service {name} not found"]
+    return []
+
+
+# -- Storage and networking ------------------------------------------------
+
+def pvc_phase(pvc, index):
+    phase = (pvc.get('status') or {}).get('phase')
+    if phase == 'Pending':
+        return ["Claim pending - no volume bound yet"]
+    if phase == 'Lost':
+        return ["Claim lost its bound volume"]
+    return []
+
+
+def ingress_routes(ingress, index):
+    """Backends that route to a missing service or to a port the service doesn't expose"""
+    issues = []
+    for backend in ingress_backends(ingress):
+        service = backend.get('service')
+        if not service:
+            continue
+        svc = index.service(service.get('name'))
+        if svc is None:
+            issues.append(f"Backend service {service.get('name')} not found")
+            continue
+        port = service.get('port') or {}
+        wanted = port.get('number', port.get('name'))
+        ports = svc['spec'].get('ports', [])
+        exposed = {p.get('port') for p in ports} | {p.get('name') for p in ports}
+        if wanted is not None and wanted not in exposed:
+            issues.append(f"Service {service['name']} has no port {wanted}")
+    return issues
+
+
+def networkpolicy_selector(policy, index):
+    selector = (policy.get('spec') or {}).get('podSelector') or {}
+    match_labels, expressions = selector.get('matchLabels'), selector.get('matchExpressions')
+    if (match_labels or expressions) and not index.pods_matching(match_labels, expressions):
+        return ["Pod selector matches no pods"]
+    return []
+
+
+def networkpolicy_isolation(policy, index):
+    spec = policy.get('spec') or {}
+    issues = []
+    types = spec.get('policyTypes') or ['Ingress']
+    if 'Ingress' in types and not spec.get('ingress'):
+        issues.append("Blocks all ingress to selected pods")
+    if 'Egress' in types and not spec.get('egress'):
+        issues.append("Blocks all egress from selected pods")
+    return issues
+
+
+RULES = (
+    Rule('pods', pod_phase),
+    Rule('pods', pod_containers),
+    Rule('pods', pod_not_ready),
+    Rule('services', service_endpoints, uses=('endpoints', 'pods')),
+    Rule('services', service_selector),
+    Rule('deployments', replicas_ready),
+    Rule('deployments', scaled_to_zero('Deployment')),
+    Rule('statefulsets', replicas_ready),
+    Rule('statefulsets', scaled_to_zero('StatefulSet')),
+    Rule('statefulsets', statefulset_service, uses=('services',)),
+    Rule('pvcs', pvc_phase),
+    Rule('ingresses', ingress_routes, uses=('services',)),
+    Rule('networkpolicies', networkpolicy_selector, uses=('pods',)),
+    Rule('networkpolicies', networkpolicy_isolation),
+)
+
+
+def generation(objects):
+    """A token that changes whenever any object in a kind changes
+
+    Objects without a resourceVersion can't be compared, so the token is
+    then unique and nothing depending on the kind is reused.
+    """
+    stamps = []
+    for obj in objects:
+        metadata = obj['metadata']
+        if metadata.get('resourceVersion') is None:
+            return object()
+        stamps.append((metadata.get('uid') or metadata['name'], metadata['resourceVersion']))
+    return hash(tuple(stamps))
+
+
+class RuleEngine:
+    """Evaluates a rule table against snapshots, re-running only what changed
+
+    Each (object, rule) result is kept with the object's uid and
+    resourceVersion and, for rules that read other kinds, those kinds'
+    generation tokens. An unchanged object whose inputs are unchanged is
+    not evaluated again.
+    """
+
+    def __init__(self, rules=RULES):
+        self.rules = {}
+        for rule in rules:
+            self.rules.setdefault(rule.key, []).append(rule)
+        self.dependencies = sorted({kind for rule in rules for kind in rule.uses})
+        self.evaluations = 0
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def evaluate(self, snapshot):
+        """Issues of every object, as {state key: {name: [messages]}}"""
+        with self._lock:
+            tokens = {kind: generation(snapshot.get(kind)) for kind in self.dependencies}
+            index = SnapshotIndex(snapshot)
+            findings = {}
+            cache = {}
+
+            for key, rules in self.rules.items():
+                stamps = [tuple(tokens[kind] for kind in rule.uses) for rule in rules]
+                previous = self._cache.get(key, {})
+                current = cache[key] = {}
+                findings[key] = {}
+
+                for obj in snapshot.get(key):
+                    metadata = obj['metadata']
+                    version = metadata.get('resourceVersion')
+                    ident = metadata.get('uid') or metadata['name']
+                    cached = previous.get(ident) if version is not None else None
+
+                    results = []
+                    for i, rule in enumerate(rules):
+                        stamp = (version, stamps[i])
+                        if cached and cached[i][0] == stamp:
+                            results.append(cached[i])
+                        else:
+                            self.evaluations += 1
+                            results.append((stamp, rule.check(obj, index)))
+
+                    current[ident] = results
+                    findings[key][metadata['name']] = [msg for _, messages in results for msg in messages]
+
+            self._cache = cache
+            return findings
@@ -4,18 +4,65 @@ K8sQuest Visualization Server
 Provides real-time cluster state visualization with architecture diagrams
 """
 
+import hashlib
 import json
-import subprocess
+import queue
 import threading
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import time
+from http.server import BaseHTTPRequestHandler
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
-import os
 
-
-class K8sQuestVisualizerHandler(SimpleHTTPRequestHandler):
+try:
+    from visualizer.assets import AssetStore
+    from visualizer.collector import SnapshotCollector
+    from visualizer.grouping import collapse_pods, group_id, owner_index, pods_in_group, summarize_groups
+    from visualizer.http_pool import PooledHTTPServer, PooledRequestMixin
+    from visualizer.informer import NamespaceInformer
+    from visualizer.kube_client import default_client
+    from visualizer.metrics import (
+        CACHE_REQUESTS, CONTENT_TYPE, ISSUE_DETECTION_SECONDS, REGISTRY, RESPONSE_BYTES, SNAPSHOT_BUILD_SECONDS
+    )
+    from visualizer.projection import ContinueExpired, parse_query, project
+    from visualizer.rules import RuleEngine, is_pod_ready
+    from visualizer.snapshot import NAMESPACE, Snapshot, SnapshotBuilder, count_endpoint_addresses
+    from visualizer.stream import StreamHub
+    from visualizer.templates.registry import DiagramRegistry
+    from visualizer.timeline import TimelineLibrary, TimelineRecorder
+    from visualizer.topology import build_topology
+except ImportError:
+    from assets import AssetStore
+    from collector import SnapshotCollector
+    from grouping import collapse_pods, group_id, owner_index, pods_in_group, summarize_groups
+    from http_pool import PooledHTTPServer, PooledRequestMixin
+    from informer import NamespaceInformer
+    from kube_client import default_client
+    from metrics import (
+        CACHE_REQUESTS, CONTENT_TYPE, ISSUE_DETECTION_SECONDS, REGISTRY, RESPONSE_BYTES, SNAPSHOT_BUILD_SECONDS
+    )
+    from projection import ContinueExpired, parse_query, project
+    from rules import RuleEngine, is_pod_ready
+    from snapshot import NAMESPACE, Snapshot, SnapshotBuilder, count_endpoint_addresses
+    from stream import StreamHub
+    from templates.registry import DiagramRegistry
+    from timeline import TimelineLibrary, TimelineRecorder
+    from topology import build_topology
+
+# Per-request deadline: socket reads/writes, keep-alive idle time and
+# the wait for the collector's first snapshot
+REQUEST_TIMEOUT = 5
+
+# Idle seconds between SSE keep-alive comments
+STREAM_KEEPALIVE = 15
+
+
+class K8sQuestVisualizerHandler(PooledRequestMixin, BaseHTTPRequestHandler):
     """HTTP handler for K8sQuest visualization server"""
 
+    # Keep-alive: every response carries a Content-Length
+    protocol_version = 'HTTP/1.1'
+    timeout = REQUEST_TIMEOUT
+
     def __init__(self, *args, game_state_callback=None, **kwargs):
         self.game_state_callback = game_state_callback
         super().__init__(*args, **kwargs)
@@ -26,258 +73,419 @@ class K8sQuestVisualizerHandler(SimpleHTTPRequestHandler):
 
         # API endpoints
         if parsed_path.path == '/api/state':
-            self.serve_cluster_state()
+            self.serve_cluster_state(parse_qs(parsed_path.query))
+        elif parsed_path.path == '/api/stream':
+            self.serve_stream()
         elif parsed_path.path == '/api/level-diagram':
-            self.serve_level_diagram()
+            self.serve_level_diagram(parse_qs(parsed_path.query))
+        elif parsed_path.path == '/api/pods':
+            self.serve_pod_group(parse_qs(parsed_path.query))
+        elif parsed_path.path == '/metrics':
+            self.serve_metrics()
+        elif parsed_path.path == '/api/timelines':
+            self.serve_timelines()
+        elif parsed_path.path == '/api/timeline':
+            self.serve_timeline_frame(parse_qs(parsed_path.query))
         else:
             # Serve static files
-            super().do_GET()
+            self.serve_static(parsed_path.path)
 
-    def serve_cluster_state(self):
-        """Serve current cluster state and game progress"""
-        try:
-            # Get game state from callback
-            game_state = {}
-            if self.game_state_callback:
-                game_state = self.game_state_callback()
+    def do_HEAD(self):
+        """Handle HEAD requests for static files"""
+        self.serve_static(urlparse(self.path).path, head=True)
+
+    def serve_static(self, path, head=False):
+        """Serve a static file from memory, precompressed when the client accepts it"""
+        asset = self.server.assets.get(path)
+        if asset is None:
+            self.send_error(404, "File not found")
+            return
 
-            # Get Kubernetes cluster state
-            k8s_state = self.get_k8s_cluster_state()
+        if etag_matches(self.headers.get('If-None-Match'), asset.etag):
+            CACHE_REQUESTS.labels('static', 'hit').inc()
+            self.send_response(304)
+            self.send_header('ETag', asset.etag)
+            self.send_header('Cache-Control', asset.cache_control)
+            self.end_headers()
+            return
+
+        CACHE_REQUESTS.labels('static', 'miss').inc()
+        body, encoding = asset.negotiate(self.headers.get('Accept-Encoding'))
+        self.send_response(200)
+        self.send_header('Content-type', asset.content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', asset.etag)
+        self.send_header('Cache-Control', asset.cache_control)
+        self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+            RESPONSE_BYTES.labels('static').observe(len(body))
+
+    def serve_cluster_state(self, query=None):
+        """Serve the collector's latest cluster state and game progress
+
+        With kinds=, fields=, limit= or continue= the full state is
+        projected per request instead of sending the shared payload.
+        """
+        try:
+            projection = parse_query(query or {})
+        except ValueError as e:
+            self.send_error(400, f"Bad state query: {e}")
+            return
 
-            response = {
-                'game': game_state,
-                'cluster': k8s_state,
-                'timestamp': subprocess.check_output(['date', '+%s']).decode().strip()
-            }
+        try:
+            payload = self.server.collector.current(timeout=REQUEST_TIMEOUT)
+            if payload is None:
+                self.send_error(503, "Cluster state not collected yet")
+                return
+
+            if projection.empty:
+                body, etag = payload
+                serialize_ms = self.server.collector.serialize_ms
+            else:
+                cluster, game, base_etag = self.server.collector.detail_state()
+                query_hash = hashlib.sha1(urlparse(self.path).query.encode()).hexdigest()[:8]
+                etag = f'"{base_etag[1:-1]}-{query_hash}"'
+                body = None
+
+            if etag_matches(self.headers.get('If-None-Match'), etag):
+                CACHE_REQUESTS.labels('state', 'hit').inc()
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            CACHE_REQUESTS.labels('state', 'miss').inc()
+
+            if body is None:
+                started = time.perf_counter()
+                try:
+                    projected = project(cluster, projection, base_etag)
+                except ContinueExpired as e:
+                    self.send_error(410, str(e))
+                    return
+                body = json.dumps({
+                    'game': game,
+                    'cluster': projected,
+                    'timestamp': str(int(time.time()))
+                }).encode()
+                serialize_ms = (time.perf_counter() - started) * 1000
 
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
             self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Expose-Headers', 'X-Payload-Bytes, X-Serialize-Ms')
+            self.send_header('X-Payload-Bytes', str(len(body)))
+            self.send_header('X-Serialize-Ms', f'{serialize_ms:.2f}')
             self.end_headers()
-            self.wfile.write(json.dumps(response).encode())
+            self.wfile.write(body)
+            RESPONSE_BYTES.labels('state' if projection.empty else 'state_projection').observe(len(body))
 
         except Exception as e:
             self.send_error(500, f"Error getting cluster state: {str(e)}")
 
-    def serve_level_diagram(self):
-        """Serve diagram configuration for current level"""
-        try:
-            game_state = {}
-            if self.game_state_callback:
-                game_state = self.game_state_callback()
+    def serve_pod_group(self, query):
+        """Serve every pod of one group, for a client expanding a collapsed group"""
+        self.server.collector.current(timeout=REQUEST_TIMEOUT)
+        cluster = self.server.collector.detail()
+        pods = pods_in_group(cluster or {}, (query.get('group') or [''])[0])
+        if pods is None:
+            self.send_error(404, "No such pod group")
+            return
 
-            current_level = game_state.get('current_level', 1)
-            current_world = game_state.get('current_world', 1)
+        body = self.send_json({'pods': pods})
+        RESPONSE_BYTES.labels('pods').observe(len(body))
+
+    def send_json(self, data, status=200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+        return body
+
+    def serve_timelines(self):
+        """List the recorded timelines, newest first"""
+        timelines = self.server.timelines
+        if timelines is None:
+            self.send_error(404, "Timeline recording is off")
+            return
+        recorder = self.server.recorder
+        self.send_json({'timelines': timelines.list(), 'recording': recorder.current if recorder else None})
+
+    def serve_timeline_frame(self, query):
+        """Frame times of one timeline, or with ?frame=N the state at that frame"""
+        timelines = self.server.timelines
+        reader = timelines.reader((query.get('id') or [''])[0]) if timelines is not None else None
+        if reader is None:
+            self.send_error(404, "No such timeline")
+            return
 
-            # Get diagram template for this level
-            diagram_data = self.get_level_diagram_template(current_world, current_level)
+        if not query.get('frame'):
+            self.send_json({'frames': len(reader), 'times': reader.times})
+            return
+        try:
+            index = int(query['frame'][0])
+            # frame() reuses its state for the next call; serialize before letting go
+            body = self.send_json({'frame': index, 'time': reader.times[index], 'state': reader.frame(index)})
+        except (ValueError, IndexError):
+            self.send_error(400, "Bad frame number")
+            return
+        RESPONSE_BYTES.labels('timeline').observe(len(body))
+
+    def serve_metrics(self):
+        """Serve every metric in the Prometheus text exposition format"""
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header('Content-type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def serve_stream(self):
+        """Stream a full snapshot, then sequence-numbered deltas, as Server-Sent Events"""
+        hub = self.server.hub
+        # Each stream pins a worker; keep some free for everything else
+        if hub.client_count >= self.server.max_streams:
+            self.send_error(503, "Too many live streams")
+            return
+
+        # Make sure there is a snapshot to start from
+        self.server.collector.current(timeout=REQUEST_TIMEOUT)
+        q, first = hub.subscribe()
 
+        try:
             self.send_response(200)
-            self.send_header('Content-type', 'application/json')
+            self.send_header('Content-type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
             self.send_header('Access-Control-Allow-Origin', '*')
             self.end_headers()
-            self.wfile.write(json.dumps(diagram_data).encode())
+            self.wfile.write(b'retry: 2000\n\n')
+            if first:
+                self.wfile.write(first)
+            self.wfile.flush()
 
+            while True:
+                try:
+                    message = q.get(timeout=STREAM_KEEPALIVE)
+                except queue.Empty:
+                    message = b': keep-alive\n\n'
+                if message is None:
+                    break
+                self.wfile.write(message)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            hub.unsubscribe(q)
+            self.close_connection = True
+
+    def serve_level_diagram(self, query=None):
+        """Serve the precompiled diagram for the current level, or the one in ?world=&level="""
+        query = query or {}
+        try:
+            if query.get('level'):
+                world, level = (query.get('world') or [None])[0], query['level'][0]
+            else:
+                game_state = self.game_state_callback() if self.game_state_callback else {}
+                world, level = game_state.get('current_world'), game_state.get('current_level')
+
+            entry = self.server.diagrams.get(world, level)
         except Exception as e:
             self.send_error(500, f"Error getting diagram: {str(e)}")
+            return
+
+        if etag_matches(self.headers.get('If-None-Match'), entry.etag):
+            CACHE_REQUESTS.labels('diagram', 'hit').inc()
+            self.send_response(304)
+            self.send_header('ETag', entry.etag)
+            self.end_headers()
+            return
+        CACHE_REQUESTS.labels('diagram', 'miss').inc()
+
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(entry.body)))
+        self.send_header('ETag', entry.etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(entry.body)
+        RESPONSE_BYTES.labels('diagram').observe(len(entry.body))
 
     def get_k8s_cluster_state(self):
         """Query Kubernetes cluster for current state in k8squest namespace"""
-        state = {
-            'pods': [],
-            'services': [],
-            'deployments': [],
-            'configmaps': [],
-            'secrets': [],
-            'ingresses': [],
-            'networkpolicies': [],
-            'pvcs': [],
-            'statefulsets': []
-        }
-
-        namespace = 'k8squest'
-
-        try:
-            # Get pods with detailed status
-            pods_json = subprocess.check_output(
-                ['kubectl', 'get', 'pods', '-n', namespace, '-o', 'json'],
-                stderr=subprocess.DEVNULL
-            ).decode()
-            pods_data = json.loads(pods_json)
-
-            for pod in pods_data.get('items', []):
-                pod_info = {
-                    'name': pod['metadata']['name'],
-                    'status': pod['status'].get('phase', 'Unknown'),
-                    'ready': self.is_pod_ready(pod),
-                    'restarts': sum(cs.get('restartCount', 0) for cs in pod['status'].get('containerStatuses', [])),
-                    'conditions': [c['type'] for c in pod['status'].get('conditions', []) if c.get('status') == 'True'],
-                    'labels': pod['metadata'].get('labels', {})
-                }
-
-                # Check for issues
-                pod_info['issues'] = self.detect_pod_issues(pod)
-                state['pods'].append(pod_info)
-
-            # Get services
-            svc_json = subprocess.check_output(
-                ['kubectl', 'get', 'services', '-n', namespace, '-o', 'json'],
-                stderr=subprocess.DEVNULL
-            ).decode()
-            svc_data = json.loads(svc_json)
-
-            for svc in svc_data.get('items', []):
-                svc_info = {
-                    'name': svc['metadata']['name'],
-                    'type': svc['spec'].get('type', 'ClusterIP'),
-                    'clusterIP': svc['spec'].get('clusterIP'),
-                    'ports': svc['spec'].get('ports', []),
-                    'selector': svc['spec'].get('selector', {}),
-                    'endpoints': self.get_service_endpoints(svc['metadata']['name'], namespace)
-                }
-                svc_info['issues'] = self.detect_service_issues(svc_info)
-                state['services'].append(svc_info)
-
-            # Get deployments
-            deploy_json = subprocess.check_output(
-                ['kubectl', 'get', 'deployments', '-n', namespace, '-o', 'json'],
-                stderr=subprocess.DEVNULL
-            ).decode()
-            deploy_data = json.loads(deploy_json)
-
-            for deploy in deploy_data.get('items', []):
-                deploy_info = {
-                    'name': deploy['metadata']['name'],
-                    'replicas': deploy['spec'].get('replicas', 0),
-                    'ready_replicas': deploy['status'].get('readyReplicas', 0),
-                    'available_replicas': deploy['status'].get('availableReplicas', 0),
-                    'labels': deploy['metadata'].get('labels', {})
-                }
-                deploy_info['issues'] = self.detect_deployment_issues(deploy_info)
-                state['deployments'].append(deploy_info)
-
-            # Get other resources (simplified)
-            for resource_type in ['configmaps', 'secrets', 'ingresses', 'networkpolicies', 'persistentvolumeclaims', 'statefulsets']:
-                try:
-                    output = subprocess.check_output(
-                        ['kubectl', 'get', resource_type, '-n', namespace, '-o', 'json'],
-                        stderr=subprocess.DEVNULL
-                    ).decode()
-                    data = json.loads(output)
+        return get_k8s_cluster_state(informer=self.server.informer, builder=self.server.builder)
 
-                    key = 'pvcs' if resource_type == 'persistentvolumeclaims' else resource_type
-                    state[key] = [{'name': item['metadata']['name']} for item in data.get('items', [])]
-                except:
-                    pass
-
-        except Exception as e:
-            state['error'] = str(e)
+    def log_message(self, format, *args):
+        """Suppress log messages unless error"""
+        if self.server.verbose:
+            super().log_message(format, *args)
 
-        return state
 
-    def is_pod_ready(self, pod):
-        """Check if pod is ready"""
-        conditions = pod['status'].get('conditions', [])
-        for condition in conditions:
-            if condition.get('type') == 'Ready':
-                return condition.get('status') == 'True'
+def etag_matches(if_none_match, etag):
+    """Check an If-None-Match header against the current ETag"""
+    if not if_none_match or not etag:
         return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
 
-    def detect_pod_issues(self, pod):
-        """Detect issues with a pod"""
-        issues = []
-        status = pod['status']
-
-        # Check phase
-        if status.get('phase') in ['Failed', 'Unknown']:
-            issues.append(f"Pod in {status.get('phase')} state")
-
-        # Check container statuses
-        for cs in status.get('containerStatuses', []):
-            if cs.get('state', {}).get('waiting'):
-                reason = cs['state']['waiting'].get('reason', 'Unknown')
-                issues.append(f"Container waiting: {reason}")
-
-            if cs.get('restartCount', 0) > 0:
-                issues.append(f"Container restarted {cs['restartCount']} times")
-
-        # Check if pod is ready
-        if not self.is_pod_ready(pod):
-            issues.append("Pod not ready")
-
-        return issues
-
-    def detect_service_issues(self, svc_info):
-        """Detect issues with a service"""
-        issues = []
-
-        if svc_info['endpoints'] == 0:
-            issues.append("No endpoints - selector might not match any pods")
-
-        if not svc_info.get('selector'):
-            issues.append("No selector defined")
-
-        return issues
-
-    def detect_deployment_issues(self, deploy_info):
-        """Detect issues with a deployment"""
-        issues = []
 
-        if deploy_info['ready_replicas'] < deploy_info['replicas']:
-            issues.append(f"Only {deploy_info['ready_replicas']}/{deploy_info['replicas']} replicas ready")
+def get_k8s_cluster_state(namespace=NAMESPACE, informer=None, builder=None):
+    """Current state of the namespace, read from the informer cache once it has synced"""
+    start = time.perf_counter()
+    if informer is not None and informer.synced:
+        snapshot = informer.snapshot()
+        SNAPSHOT_BUILD_SECONDS.labels('informer').observe(time.perf_counter() - start)
+        return build_cluster_state(snapshot)
 
-        if deploy_info['replicas'] == 0:
-            issues.append("Deployment scaled to 0 replicas")
+    builder = builder or SnapshotBuilder(namespace)
+    try:
+        snapshot = builder.build()
+    except Exception as e:
+        state = build_cluster_state(Snapshot())
+        state['error'] = str(e)
+        return state
+    SNAPSHOT_BUILD_SECONDS.labels(snapshot.source).observe(time.perf_counter() - start)
+
+    state = build_cluster_state(snapshot)
+    statuses = list(snapshot.kind_status.values())
+    if statuses and all(status['status'] == 'failed' for status in statuses):
+        state['error'] = statuses[0].get('error', 'cluster unavailable')
+    return state
+
+
+# Issue detection shared by every refresh, so unchanged objects keep their findings
+RULE_ENGINE = RuleEngine()
+
+
+def build_cluster_state(snapshot, rule_engine=RULE_ENGINE):
+    """Summarize a snapshot into the cluster state served by /api/state"""
+    start = time.perf_counter()
+    issues = rule_engine.evaluate(snapshot)
+    ISSUE_DETECTION_SECONDS.observe(time.perf_counter() - start)
+    state = {
+        'pods': [],
+        'services': [],
+        'deployments': [],
+        'configmaps': [],
+        'secrets': [],
+        'ingresses': [],
+        'networkpolicies': [],
+        'pvcs': [],
+        'statefulsets': []
+    }
+
+    # Pods are grouped by the workload that owns them, through their ReplicaSet
+    replicaset_owners = owner_index(snapshot.get('replicasets'))
+
+    for pod in snapshot.get('pods'):
+        pod_info = {
+            'name': pod['metadata']['name'],
+            'status': pod['status'].get('phase', 'Unknown'),
+            'ready': is_pod_ready(pod),
+            'restarts': sum(cs.get('restartCount', 0) for cs in pod['status'].get('containerStatuses', [])),
+            'conditions': [c['type'] for c in pod['status'].get('conditions', []) if c.get('status') == 'True'],
+            'labels': pod['metadata'].get('labels', {}),
+            'issues': issues['pods'][pod['metadata']['name']],
+            'group': group_id(pod, replicaset_owners)
+        }
+        state['pods'].append(pod_info)
+    state['pod_groups'] = summarize_groups(state['pods'])
+
+    # Endpoints come from the same list call instead of one kubectl per service
+    endpoint_counts = count_endpoint_addresses(snapshot.get('endpoints'))
+
+    for svc in snapshot.get('services'):
+        svc_info = {
+            'name': svc['metadata']['name'],
+            'type': svc['spec'].get('type', 'ClusterIP'),
+            'clusterIP': svc['spec'].get('clusterIP'),
+            'ports': svc['spec'].get('ports', []),
+            'selector': svc['spec'].get('selector', {}),
+            'endpoints': endpoint_counts.get(svc['metadata']['name'], 0),
+            'issues': issues['services'][svc['metadata']['name']]
+        }
+        state['services'].append(svc_info)
+
+    for deploy in snapshot.get('deployments'):
+        deploy_info = {
+            'name': deploy['metadata']['name'],
+            'replicas': deploy['spec'].get('replicas', 0),
+            'ready_replicas': deploy['status'].get('readyReplicas', 0),
+            'available_replicas': deploy['status'].get('availableReplicas', 0),
+            'labels': deploy['metadata'].get('labels', {}),
+            'issues': issues['deployments'][deploy['metadata']['name']]
+        }
+        state['deployments'].append(deploy_info)
 
-        return issues
+    # Other resources (simplified)
+    for key in ['configmaps', 'secrets', 'ingresses', 'networkpolicies', 'pvcs', 'statefulsets']:
+        found = issues.get(key, {})
+        state[key] = []
+        for item in snapshot.get(key):
+            name = item['metadata']['name']
+            state[key].append({'name': name, 'issues': found[name]} if name in found else {'name': name})
 
-    def get_service_endpoints(self, service_name, namespace):
-        """Get number of endpoints for a service"""
-        try:
-            output = subprocess.check_output(
-                ['kubectl', 'get', 'endpoints', service_name, '-n', namespace, '-o', 'json'],
-                stderr=subprocess.DEVNULL
-            ).decode()
-            data = json.loads(output)
-
-            count = 0
-            for subset in data.get('subsets', []):
-                count += len(subset.get('addresses', []))
-            return count
-        except:
-            return 0
-
-    def get_level_diagram_template(self, world, level):
-        """Get diagram template for specific level"""
-        # Import diagram templates
-        from templates.diagrams import get_diagram_for_level
-
-        return get_diagram_for_level(world, level)
+    # The real object graph, so diagram placeholders can be bound to live objects
+    state['topology'] = build_topology(snapshot, {pod['name']: pod['group'] for pod in state['pods']})
 
-    def log_message(self, format, *args):
-        """Suppress log messages unless error"""
-        if self.server.verbose:
-            super().log_message(format, *args)
+    state['refresh'] = snapshot.stats()
+    state['kinds'] = snapshot.freshness()
+    return state
 
 
 class VisualizationServer:
     """K8sQuest visualization server manager"""
 
-    def __init__(self, port=8080, game_state_callback=None, verbose=False):
+    def __init__(self, port=8080, game_state_callback=None, verbose=False, watch=True, workers=8,
+                 client=None, timeline_dir=None, record_timelines=True):
         self.port = port
+        self.workers = workers
         self.game_state_callback = game_state_callback
         self.verbose = verbose
         self.server = None
         self.thread = None
         self.running = False
+        self.hub = StreamHub()
+
+        # Talk to the API server directly when the kubeconfig allows it; kubectl otherwise
+        self.client = client if client is not None else default_client()
+        self.builder = SnapshotBuilder(client=self.client)
+
+        # Every published change is appended to a per-level timeline for later replay
+        self.recorder = TimelineRecorder(timeline_dir) if timeline_dir and record_timelines else None
+        self.timelines = TimelineLibrary(timeline_dir) if timeline_dir else None
+
+        self.collector = SnapshotCollector(
+            lambda: get_k8s_cluster_state(informer=self.informer, builder=self.builder),
+            game_state_callback=game_state_callback,
+            hub=self.hub,
+            view=collapse_pods,
+            recorder=self.recorder
+        )
+
+        # Watch streams push changes to the collector as they happen
+        self.informer = NamespaceInformer(on_change=self.collector.wake, client=self.client) if watch else None
 
     def start(self):
         """Start the visualization server in a background thread"""
         if self.running:
             return
 
-        # Change to visualizer/static directory to serve files
-        os.chdir(Path(__file__).parent / 'static')
+        # Static files and level diagrams are compiled once, then served from memory
+        assets = AssetStore()
+        diagrams = DiagramRegistry()
 
         # Create handler with game state callback
         def handler(*args, **kwargs):
@@ -287,26 +495,76 @@ class VisualizationServer:
                 **kwargs
             )
 
-        self.server = HTTPServer(('localhost', self.port), handler)
+        # A fixed worker pool; /api/stream clients may hold at most half of it
+        self.server = PooledHTTPServer(('localhost', self.port), handler, workers=self.workers)
+        self.server.max_streams = max(1, self.workers // 2)
         self.server.verbose = self.verbose
+        self.server.assets = assets
+        self.server.diagrams = diagrams
+        self.server.collector = self.collector
+        self.server.hub = self.hub
+        self.server.informer = self.informer
+        self.server.builder = self.builder
+        self.server.recorder = self.recorder
+        self.server.timelines = self.timelines
+
+        # Scraped from /metrics; replaced if another server is started in this process
+        REGISTRY.gauge('k8squest_stream_clients', 'Connected /api/stream clients',
+                       callback=lambda: self.hub.client_count)
+        REGISTRY.gauge('k8squest_idle_connections', 'Keep-alive connections waiting for their next request',
+                       callback=lambda: self.server.parked_count)
+
+        # One collector refreshes the shared snapshot for every client
+        if self.informer:
+            self.informer.start()
+        self.collector.start()
 
         # Start server in background thread
         self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
         self.thread.start()
         self.running = True
 
+        # Port 0 asks the OS for a free port
+        self.port = self.server.server_address[1]
         return f"http://localhost:{self.port}"
 
+    def set_namespace(self, namespace):
+        """Follow another namespace, e.g. when a level is rebound to a fresh one from the pool"""
+        if namespace == self.builder.namespace:
+            return
+        self.builder.namespace = namespace
+        if self.informer:
+            self.informer.stop()
+            self.informer = NamespaceInformer(namespace=namespace, on_change=self.collector.wake,
+                                              client=self.client)
+            if self.running:
+                self.informer.start()
+        if self.server:
+            self.server.informer = self.informer
+        self.collector.wake()
+
     def stop(self):
         """Stop the visualization server"""
+        self.collector.stop()
+        self.hub.close()
+        if self.informer:
+            self.informer.stop()
+        if self.client:
+            self.client.close()
+        if self.recorder:
+            self.recorder.close()
         if self.server:
             self.server.shutdown()
+            self.server.server_close()
             self.running = False
+        if self.timelines:
+            self.timelines.close()
 
 
 def main():
     """Standalone server for testing"""
-    server = VisualizationServer(port=8080, verbose=True)
+    server = VisualizationServer(port=8080, verbose=True,
+                                 timeline_dir=Path(__file__).parent.parent / 'timelines')
     url = server.start()
     print(f"K8sQuest Visualization Server running at {url}")
     print("Press Ctrl+C to stop")
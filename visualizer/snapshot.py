@@ -0,0 +1,267 @@
+"""
+Cluster snapshot builder for the K8sQuest visualizer
+Lists every resource kind the visualizer shows, from the API server or a single kubectl call
+"""
+
+import json
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from visualizer.metrics import KUBE_REQUEST_SECONDS, kubectl_resource
+except ImportError:
+    from metrics import KUBE_REQUEST_SECONDS, kubectl_resource
+
+NAMESPACE = 'k8squest'
+
+# Deadline for a single kubectl call (seconds)
+KUBECTL_TIMEOUT = 4
+
+# Per-kind fallback queries running at once
+MAX_PARALLEL_QUERIES = 4
+
+# After the API server is unreachable, use kubectl for this long before retrying it (seconds)
+API_RETRY_INTERVAL = 30
+
+# State key -> (kubectl resource name, object kind)
+SNAPSHOT_KINDS = {
+    'pods': ('pods', 'Pod'),
+    'services': ('services', 'Service'),
+    'deployments': ('deployments', 'Deployment'),
+    'configmaps': ('configmaps', 'ConfigMap'),
+    'secrets': ('secrets', 'Secret'),
+    'ingresses': ('ingresses', 'Ingress'),
+    'networkpolicies': ('networkpolicies', 'NetworkPolicy'),
+    'pvcs': ('persistentvolumeclaims', 'PersistentVolumeClaim'),
+    'statefulsets': ('statefulsets', 'StatefulSet'),
+    'endpoints': ('endpoints', 'Endpoints'),
+    'replicasets': ('replicasets', 'ReplicaSet'),
+}
+
+KIND_TO_KEY = {kind: key for key, (_, kind) in SNAPSHOT_KINDS.items()}
+
+# State key -> API group prefix, for raw list and watch requests
+API_PREFIXES = {
+    'pods': '/api/v1',
+    'services': '/api/v1',
+    'deployments': '/apis/apps/v1',
+    'configmaps': '/api/v1',
+    'secrets': '/api/v1',
+    'ingresses': '/apis/networking.k8s.io/v1',
+    'networkpolicies': '/apis/networking.k8s.io/v1',
+    'pvcs': '/api/v1',
+    'statefulsets': '/apis/apps/v1',
+    'endpoints': '/api/v1',
+    'replicasets': '/apis/apps/v1',
+}
+
+
+# Kinds shown by name only: the API client lists just their metadata, so no
+# Secret or ConfigMap data is transferred or held in memory
+METADATA_ONLY_KINDS = {'configmaps', 'secrets'}
+
+
+class Snapshot:
+    """Objects from one refresh, grouped by state key, plus what the refresh cost"""
+
+    def __init__(self, items=None, kubectl_calls=0, duration_ms=0.0, source='list', kind_status=None,
+                 api_calls=0):
+        self.items = items if items is not None else {key: [] for key in SNAPSHOT_KINDS}
+        self.kubectl_calls = kubectl_calls
+        self.api_calls = api_calls
+        self.duration_ms = duration_ms
+        self.source = source
+        # State key -> {'status': 'fresh' | 'stale' | 'failed', 'latency_ms', ...}
+        self.kind_status = kind_status or {}
+
+    def get(self, key):
+        """Raw objects for a state key (e.g. 'pods')"""
+        return self.items.get(key, [])
+
+    def stats(self):
+        """Refresh cost, reported to the client alongside the state"""
+        return {
+            'source': self.source,
+            'kubectl_calls': self.kubectl_calls,
+            'api_calls': self.api_calls,
+            'duration_ms': round(self.duration_ms, 1),
+            'kind_latency_ms': {key: status.get('latency_ms') for key, status in self.kind_status.items()}
+        }
+
+    def freshness(self):
+        """Per-kind status without timings, so it only changes when a kind's health does"""
+        return {
+            key: {k: v for k, v in status.items() if k != 'latency_ms'}
+            for key, status in self.kind_status.items()
+        }
+
+
+def api_path(key, namespace=NAMESPACE):
+    """REST path of a namespaced collection, e.g. /api/v1/namespaces/k8squest/pods"""
+    resource = SNAPSHOT_KINDS[key][0]
+    return f"{API_PREFIXES[key]}/namespaces/{namespace}/{resource}"
+
+
+def run_kubectl(args, timeout=None):
+    """Run kubectl and return its stdout"""
+    start = time.perf_counter()
+    outcome = 'error'
+    try:
+        output = subprocess.check_output(['kubectl'] + args, stderr=subprocess.DEVNULL, timeout=timeout).decode()
+        outcome = 'ok'
+        return output
+    finally:
+        KUBE_REQUEST_SECONDS.labels('kubectl', kubectl_resource(args), outcome).observe(time.perf_counter() - start)
+
+
+def demultiplex(items):
+    """Split a mixed-kind List into per-kind lists keyed like the state dict"""
+    grouped = {key: [] for key in SNAPSHOT_KINDS}
+    for item in items:
+        key = KIND_TO_KEY.get(item.get('kind'))
+        if key:
+            grouped[key].append(item)
+    return grouped
+
+
+def fetch_snapshot(namespace=NAMESPACE, runner=run_kubectl):
+    """List every visualized kind in the namespace with one kubectl call"""
+    start = time.perf_counter()
+
+    resources = ','.join(resource for resource, _ in SNAPSHOT_KINDS.values())
+    output = runner(['get', resources, '-n', namespace, '-o', 'json'])
+    data = json.loads(output)
+
+    return Snapshot(
+        items=demultiplex(data.get('items', [])),
+        kubectl_calls=1,
+        duration_ms=(time.perf_counter() - start) * 1000
+    )
+
+
+class SnapshotBuilder:
+    """Builds snapshots that degrade per kind instead of failing as a whole
+
+    The single multi-kind list call is tried first, with a deadline. If it
+    errors out quickly (e.g. one kind is forbidden), each kind is queried
+    concurrently with its own deadline. If it times out, the API server is
+    not answering and every kind is served stale right away. A kind that
+    could not be fetched keeps its last good value (``stale``) or comes
+    back empty (``failed``). Last good values are kept per namespace, so
+    after ``namespace`` changes another namespace's objects are never
+    served as stale ones.
+
+    Given a KubeClient, every kind is listed straight from the API server
+    over pooled connections instead, and kubectl is only used while the
+    API server can't be reached.
+    """
+
+    def __init__(self, namespace=NAMESPACE, runner=run_kubectl, timeout=KUBECTL_TIMEOUT,
+                 max_workers=MAX_PARALLEL_QUERIES, client=None):
+        self.namespace = namespace
+        self.runner = runner
+        self.timeout = timeout
+        self.client = client
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='kubectl')
+        self._last_good = {}  # (namespace, key) -> (items, fetched_at)
+        self._api_retry_at = 0.0
+
+    def build(self):
+        start = time.perf_counter()
+        namespace = self.namespace  # may be rebound while this build runs
+        self._last_good = {k: v for k, v in self._last_good.items() if k[0] == namespace}
+        if self.client is not None and time.monotonic() >= self._api_retry_at:
+            results = self._query_kinds(self._get_kind, namespace)
+            unreachable = [r for r, _ in results.values() if isinstance(r, OSError)]
+            if len(unreachable) < len(results):
+                return self._merge(results, namespace, 0, (time.perf_counter() - start) * 1000,
+                                   source='api', api_calls=len(results))
+            self._api_retry_at = time.monotonic() + API_RETRY_INTERVAL
+
+        try:
+            snapshot = fetch_snapshot(namespace, runner=self._run)
+        except subprocess.TimeoutExpired as e:
+            elapsed = (time.perf_counter() - start) * 1000
+            results = {key: (e, elapsed) for key in SNAPSHOT_KINDS}
+            calls = 1
+        except Exception:
+            results = self._query_kinds(self._query_kind, namespace)
+            calls = 1 + len(SNAPSHOT_KINDS)
+        else:
+            now = time.time()
+            for key in SNAPSHOT_KINDS:
+                self._last_good[namespace, key] = (snapshot.items[key], now)
+                snapshot.kind_status[key] = {'status': 'fresh', 'latency_ms': round(snapshot.duration_ms, 1)}
+            return snapshot
+
+        return self._merge(results, namespace, calls, (time.perf_counter() - start) * 1000)
+
+    def _run(self, args):
+        return self.runner(args, timeout=self.timeout)
+
+    def _query_kind(self, key, namespace):
+        start = time.perf_counter()
+        try:
+            output = self._run(['get', SNAPSHOT_KINDS[key][0], '-n', namespace, '-o', 'json'])
+            result = json.loads(output).get('items', [])
+        except Exception as e:
+            result = e
+        return result, (time.perf_counter() - start) * 1000
+
+    def _get_kind(self, key, namespace):
+        start = time.perf_counter()
+        try:
+            result = self.client.list(api_path(key, namespace), timeout=self.timeout,
+                                      metadata_only=key in METADATA_ONLY_KINDS)['items']
+        except Exception as e:
+            result = e
+        return result, (time.perf_counter() - start) * 1000
+
+    def _query_kinds(self, query, namespace):
+        futures = {key: self._pool.submit(query, key, namespace) for key in SNAPSHOT_KINDS}
+        return {key: future.result() for key, future in futures.items()}
+
+    def _merge(self, results, namespace, calls, duration_ms, source='list', api_calls=0):
+        items = {}
+        kind_status = {}
+        now = time.time()
+
+        for key, (result, latency_ms) in results.items():
+            status = {'latency_ms': round(latency_ms, 1)}
+            if not isinstance(result, Exception):
+                items[key] = result
+                self._last_good[namespace, key] = (result, now)
+                status['status'] = 'fresh'
+            elif (namespace, key) in self._last_good:
+                items[key], fetched_at = self._last_good[namespace, key]
+                status.update(status='stale', fetched_at=int(fetched_at), error=describe_error(result))
+            else:
+                items[key] = []
+                status.update(status='failed', error=describe_error(result))
+            kind_status[key] = status
+
+        return Snapshot(items=items, kubectl_calls=calls, duration_ms=duration_ms, source=source,
+                        kind_status=kind_status, api_calls=api_calls)
+
+
+def describe_error(error):
+    """Short, user-facing description of a failed kubectl call"""
+    if isinstance(error, subprocess.TimeoutExpired):
+        return f"timed out after {error.timeout}s"
+    if isinstance(error, subprocess.CalledProcessError):
+        return f"kubectl exited with {error.returncode}"
+    if isinstance(error, FileNotFoundError):
+        return "kubectl not found"
+    return str(error)
+
+
+def count_endpoint_addresses(endpoints):
+    """Map endpoints name -> number of ready addresses"""
+    counts = {}
+    for ep in endpoints:
+        count = 0
+        for subset in ep.get('subsets') or []:
+            count += len(subset.get('addresses', []))
+        counts[ep['metadata']['name']] = count
+    return counts
@@ -78,7 +78,10 @@ const CONFIG = {
 // State Management
 // ============================================
 let currentState = null;
+let liveState = null;
+let currentStateEtag = null;
 let currentDiagram = null;
+let currentDiagramEtag = null;
 let previousDiagram = null;
 let svg = null;
 let tooltip = null;
@@ -91,7 +94,8 @@ let simulation = null;
 document.addEventListener('DOMContentLoaded', () => {
     initializeDiagram();
     initializeTooltip();
-    startAutoRefresh();
+    initializeTimeline();
+    startLiveUpdates();
 });
 
 /**
@@ -163,22 +167,189 @@ function initializeTooltip() {
 }
 
 /**
- * Start auto-refresh polling
+ * Start auto-refresh polling (used when Server-Sent Events are unavailable)
  */
 function startAutoRefresh() {
+    document.getElementById('update-mode').textContent = `${CONFIG.refreshInterval / 1000}s`;
+
     // Initial fetch
     fetchClusterState();
     fetchLevelDiagram();
 
-    // Set up interval
+    // Set up interval; the diagram is re-fetched when the level changes
     setInterval(() => {
         fetchClusterState();
     }, CONFIG.refreshInterval);
+}
 
-    // Re-fetch diagram every 30 seconds
-    setInterval(() => {
+// ============================================
+// Live Updates (Server-Sent Events)
+// ============================================
+
+const STREAM_CHANNEL = 'k8squest-stream';
+let streamSeq = null;
+let streamSource = null;
+let streamChannel = null;
+let isStreamLeader = false;
+let currentLevelKey = null;
+
+/**
+ * Start live updates: one /api/stream connection shared by every open tab
+ */
+function startLiveUpdates() {
+    if (!window.EventSource) {
+        startAutoRefresh();
+        return;
+    }
+
+    document.getElementById('update-mode').textContent = 'live';
+    fetchLevelDiagram();
+
+    if (window.BroadcastChannel && navigator.locks) {
+        streamChannel = new BroadcastChannel(STREAM_CHANNEL);
+        streamChannel.onmessage = (event) => handleChannelMessage(event.data);
+
+        // The tab holding the lock owns the EventSource; the others follow over the channel
+        navigator.locks.request('k8squest-stream-leader', () => {
+            isStreamLeader = true;
+            openStream();
+            return new Promise(() => {});  // Held until this tab closes
+        });
+        streamChannel.postMessage({ type: 'sync-request' });
+    } else {
+        openStream();
+    }
+}
+
+/**
+ * Open (or reopen) the SSE connection; the server always starts with a full snapshot
+ */
+function openStream() {
+    if (streamSource) {
+        streamSource.close();
+    }
+    streamSeq = null;
+    streamSource = new EventSource('/api/stream');
+
+    ['snapshot', 'delta', 'game'].forEach(type => {
+        streamSource.addEventListener(type, (event) => {
+            const message = { type, ...JSON.parse(event.data) };
+            if (streamChannel) {
+                streamChannel.postMessage(message);
+            }
+            applyStreamMessage(message);
+        });
+    });
+}
+
+/**
+ * Messages relayed by the leader tab
+ */
+function handleChannelMessage(message) {
+    if (message.type === 'sync-request') {
+        if (isStreamLeader && liveState && streamSeq !== null) {
+            streamChannel.postMessage({ type: 'snapshot', seq: streamSeq, state: liveState });
+        }
+        return;
+    }
+
+    if (!isStreamLeader) {
+        applyStreamMessage(message);
+    }
+}
+
+/**
+ * Apply a snapshot, delta or game message to the local state
+ */
+function applyStreamMessage(message) {
+    if (message.type === 'snapshot') {
+        streamSeq = message.seq;
+        setClusterState(message.state);
+    } else if (message.type === 'delta') {
+        if (streamSeq === null || message.base !== streamSeq) {
+            resyncStream();
+            return;
+        }
+        streamSeq = message.seq;
+        setClusterState(applyPatch(JSON.parse(JSON.stringify(liveState)), message.ops));
+    } else if (message.type === 'game') {
+        checkLevelChange(message.game);
+    }
+}
+
+/**
+ * A delta arrived out of sequence: start again from a full snapshot
+ */
+function resyncStream() {
+    streamSeq = null;
+    if (isStreamLeader || !streamChannel) {
+        openStream();
+    } else {
+        streamChannel.postMessage({ type: 'sync-request' });
+    }
+}
+
+/**
+ * Apply JSON-patch style add/remove/replace operations
+ */
+function applyPatch(doc, ops) {
+    ops.forEach(op => {
+        if (op.path === '') {
+            doc = op.value;
+            return;
+        }
+
+        const tokens = op.path.split('/').slice(1)
+            .map(t => t.replace(/~1/g, '/').replace(/~0/g, '~'));
+        const last = tokens.pop();
+        let target = doc;
+        tokens.forEach(t => {
+            target = target[Array.isArray(target) ? Number(t) : t];
+        });
+
+        if (op.op === 'remove') {
+            if (Array.isArray(target)) {
+                target.splice(Number(last), 1);
+            } else {
+                delete target[last];
+            }
+        } else {
+            target[Array.isArray(target) ? Number(last) : last] = op.value;
+        }
+    });
+    return doc;
+}
+
+/**
+ * Install a new live state; it is only drawn while no timeline is being replayed
+ */
+function setClusterState(data) {
+    liveState = data;
+    checkLevelChange(data.game);
+    if (!replay) {
+        renderState(data);
+    }
+}
+
+/**
+ * Draw a state (live or replayed)
+ */
+function renderState(data) {
+    const oldState = currentState;
+    currentState = data;
+    updateUI(data);
+    updateDiagram(oldState);
+}
+
+/**
+ * Re-fetch the diagram when the player moves to another level
+ */
+function checkLevelChange(game) {
+    const levelKey = `${(game || {}).current_world}/${(game || {}).current_level}`;
+    if (currentLevelKey !== null && levelKey !== currentLevelKey && !replay) {
         fetchLevelDiagram();
-    }, 30000);
+    }
+    currentLevelKey = levelKey;
 }
 
 // ============================================
@@ -190,13 +361,19 @@ function startAutoRefresh() {
  */
 async function fetchClusterState() {
     try {
-        const response = await fetch('/api/state');
+        // Revalidate against the shared snapshot; 304 means nothing changed
+        const headers = currentStateEtag ? { 'If-None-Match': currentStateEtag } : {};
+        const response = await fetch('/api/state', { headers });
+
+        if (response.status === 304) {
+            document.getElementById('last-update').textContent = new Date().toLocaleTimeString();
+            return;
+        }
+
         const data = await response.json();
+        currentStateEtag = response.headers.get('ETag');
 
-        const oldState = currentState;
-        currentState = data;
-        updateUI(data);
-        updateDiagram(oldState);
+        setClusterState(data);
 
     } catch (error) {
         console.error('Error fetching cluster state:', error);
@@ -204,24 +381,196 @@ async function fetchClusterState() {
 }
 
 /**
- * Fetch level diagram configuration from API
+ * Fetch level diagram configuration from API, for the current level or a given one
  */
-async function fetchLevelDiagram() {
+async function fetchLevelDiagram(game = null) {
     try {
-        const response = await fetch('/api/level-diagram');
-        const data = await response.json();
-
-        // Only update if diagram actually changed
-        if (JSON.stringify(data) !== JSON.stringify(currentDiagram)) {
-            currentDiagram = data;
-            updateDiagram();
+        // Diagrams are precompiled per level; 304 means this level's diagram is unchanged
+        const headers = currentDiagramEtag ? { 'If-None-Match': currentDiagramEtag } : {};
+        const query = game && game.current_level
+            ? `?world=${encodeURIComponent(game.current_world || '')}&level=${encodeURIComponent(game.current_level)}`
+            : '';
+        const response = await fetch(`/api/level-diagram${query}`, { headers });
+        if (response.status === 304) {
+            return;
         }
 
+        currentDiagram = await response.json();
+        currentDiagramEtag = response.headers.get('ETag');
+        updateDiagram();
+
     } catch (error) {
         console.error('Error fetching diagram:', error);
     }
 }
 
+// ============================================
+// Timeline Replay
+// ============================================
+
+let replay = null;
+let frameRequest = 0;
+
+/**
+ * Wire up the replay controls
+ */
+function initializeTimeline() {
+    document.getElementById('replay-toggle').addEventListener('click', toggleTimelineBar);
+    document.getElementById('timeline-select').addEventListener('change', event => {
+        if (event.target.value) {
+            startReplay(event.target.value);
+        }
+    });
+    document.getElementById('timeline-scrubber').addEventListener('input', event => {
+        if (replay) {
+            pauseReplay();
+            showReplayFrame(Number(event.target.value));
+        }
+    });
+    document.getElementById('timeline-play').addEventListener('click', toggleReplayPlayback);
+    document.getElementById('timeline-live').addEventListener('click', stopReplay);
+}
+
+/**
+ * Show or hide the replay bar, listing the recorded timelines when shown
+ */
+async function toggleTimelineBar() {
+    const bar = document.getElementById('timeline-bar');
+    if (!bar.hidden) {
+        stopReplay();
+        bar.hidden = true;
+        return;
+    }
+    bar.hidden = false;
+
+    const select = document.getElementById('timeline-select');
+    select.textContent = '';
+    try {
+        const response = await fetch('/api/timelines');
+        if (!response.ok) {
+            select.appendChild(new Option('Recording is off', ''));
+            return;
+        }
+        const { timelines } = await response.json();
+        select.appendChild(new Option(timelines.length ? 'Choose a recording…' : 'No recordings yet', ''));
+        timelines.forEach(timeline => {
+            const started = new Date(timeline.started * 1000).toLocaleString();
+            const label = `${timeline.level || 'no level'} · ${started} · ${timeline.frames} changes`;
+            select.appendChild(new Option(label, timeline.id));
+        });
+    } catch (error) {
+        console.error('Error listing timelines:', error);
+    }
+}
+
+/**
+ * Load a timeline's frame times and show its first frame
+ */
+async function startReplay(id) {
+    try {
+        const response = await fetch(`/api/timeline?id=${encodeURIComponent(id)}`);
+        if (!response.ok) {
+            return;
+        }
+        const { times } = await response.json();
+        pauseReplay();
+        replay = { id, times, index: 0, levelKey: null, timer: null };
+        document.body.classList.add('replaying');
+
+        const scrubber = document.getElementById('timeline-scrubber');
+        scrubber.max = Math.max(times.length - 1, 0);
+        scrubber.value = 0;
+        showReplayFrame(0);
+    } catch (error) {
+        console.error('Error loading timeline:', error);
+    }
+}
+
+/**
+ * Fetch and draw one frame; answers to superseded requests are dropped
+ */
+async function showReplayFrame(index) {
+    const request = ++frameRequest;
+    try {
+        const response = await fetch(`/api/timeline?id=${encodeURIComponent(replay.id)}&frame=${index}`);
+        const data = await response.json();
+        if (!replay || request !== frameRequest) {
+            return;
+        }
+
+        replay.index = index;
+        document.getElementById('timeline-scrubber').value = index;
+        document.getElementById('timeline-time').textContent = new Date(data.time * 1000).toLocaleTimeString();
+
+        const game = data.state.game || {};
+        const levelKey = `${game.current_world}/${game.current_level}`;
+        if (levelKey !== replay.levelKey) {
+            replay.levelKey = levelKey;
+            fetchLevelDiagram(game);
+        }
+        renderState(data.state);
+    } catch (error) {
+        console.error('Error loading timeline frame:', error);
+    }
+}
+
+/**
+ * Play the timeline forward, one change at a time, waiting at most a second between changes
+ */
+function toggleReplayPlayback() {
+    if (!replay) {
+        return;
+    }
+    if (replay.timer) {
+        pauseReplay();
+        return;
+    }
+
+    document.getElementById('timeline-play').textContent = '⏸';
+    const step = () => {
+        if (!replay || replay.index >= replay.times.length - 1) {
+            pauseReplay();
+            return;
+        }
+        const gap = replay.times[replay.index + 1] - replay.times[replay.index];
+        replay.timer = setTimeout(async () => {
+            await showReplayFrame(replay.index + 1);
+            if (replay && replay.timer) {
+                step();
+            }
+        }, Math.min(gap * 1000, 1000));
+    };
+    step();
+}
+
+function pauseReplay() {
+    if (replay && replay.timer) {
+        clearTimeout(replay.timer);
+        replay.timer = null;
+    }
+    document.getElementById('timeline-play').textContent = '▶';
+}
+
+/**
+ * Leave replay and show the live state again
+ */
+function stopReplay() {
+    if (!replay) {
+        return;
+    }
+    pauseReplay();
+    replay = null;
+    frameRequest++;
+    document.body.classList.remove('replaying');
+    document.getElementById('timeline-select').value = '';
+    document.getElementById('timeline-time').textContent = '--:--:--';
+
+    fetchLevelDiagram();
+    if (liveState) {
+        renderState(liveState);
+    }
+}
+
 // ============================================
 // UI Update Functions
 // ============================================
@@ -239,7 +588,7 @@ function updateUI(data) {
 
     // Update cluster stats
     const cluster = data.cluster || {};
-    updatePodsList(cluster.pods || []);
+    updatePodsList(cluster.pods || [], cluster.pod_groups || []);
     updateServicesList(cluster.services || []);
     updateDeploymentsList(cluster.deployments || []);
     updateOtherResources(cluster);
@@ -247,9 +596,14 @@ function updateUI(data) {
     // Update issues panel
     updateIssuesPanel(cluster);
 
-    // Update last update time
+    // Update last update time, flagging kinds that could not be refreshed
     const now = new Date();
-    document.getElementById('last-update').textContent = now.toLocaleTimeString();
+    const lastUpdate = document.getElementById('last-update');
+    const degraded = Object.entries(cluster.kinds || {})
+        .filter(([, kind]) => kind.status !== 'fresh')
+        .map(([name, kind]) => `${name}: ${kind.status}${kind.error ? ` (${kind.error})` : ''}`);
+    lastUpdate.textContent = now.toLocaleTimeString() + (degraded.length ? ' ⚠' : '');
+    lastUpdate.title = degraded.join('\n');
 
     // Update status indicator
     const hasIssues = detectIssues(cluster).length > 0;
@@ -270,53 +624,165 @@ function createElement(tag, className, text) {
 /**
  * Update pods list
  */
-function updatePodsList(pods) {
+function updatePodsList(pods, groups = []) {
     const container = document.getElementById('pods-list');
     container.textContent = '';
 
-    if (pods.length === 0) {
+    const collapsed = groups.filter(group => group.collapsed);
+    if (pods.length === 0 && collapsed.length === 0) {
         container.appendChild(createElement('div', 'no-resources', 'No pods found'));
         return;
     }
 
-    pods.forEach(pod => {
-        const div = createElement('div', 'resource-item');
-        div.setAttribute('role', 'listitem');
+    // Large workloads arrive as one summary each; their pods are fetched on expand
+    collapsed.forEach(group => container.appendChild(renderPodGroup(group)));
+    pods.forEach(pod => container.appendChild(renderPodItem(pod)));
+}
 
-        const header = createElement('div', 'resource-header');
-        const statusClass = getStatusClass(pod.status, pod.ready);
-        const statusBadge = createElement('span', `status-badge ${statusClass}`, pod.status);
-        const name = createElement('span', 'resource-name', pod.name);
+/**
+ * Render one pod entry
+ */
+function renderPodItem(pod) {
+    const div = createElement('div', 'resource-item');
+    div.setAttribute('role', 'listitem');
 
-        header.appendChild(statusBadge);
-        header.appendChild(name);
-        div.appendChild(header);
+    const header = createElement('div', 'resource-header');
+    const statusClass = getStatusClass(pod.status, pod.ready);
+    const statusBadge = createElement('span', `status-badge ${statusClass}`, pod.status);
+    const name = createElement('span', 'resource-name', pod.name);
 
-        if (pod.restarts > 0 || pod.issues) {
-            const meta = createElement('div', 'resource-meta');
+    header.appendChild(statusBadge);
+    header.appendChild(name);
+    div.appendChild(header);
 
-            if (pod.restarts > 0) {
-                const restartItem = createElement('span', 'meta-item');
-                const icon = createElement('span', 'meta-icon', '🔄');
-                restartItem.appendChild(icon);
-                restartItem.appendChild(document.createTextNode(` ${pod.restarts} restarts`));
-                meta.appendChild(restartItem);
-            }
+    if (pod.restarts > 0 || pod.issues) {
+        const meta = createElement('div', 'resource-meta');
 
-            div.appendChild(meta);
+        if (pod.restarts > 0) {
+            const restartItem = createElement('span', 'meta-item');
+            const icon = createElement('span', 'meta-icon', '🔄');
+            restartItem.appendChild(icon);
+            restartItem.appendChild(document.createTextNode(` ${pod.restarts} restarts`));
+            meta.appendChild(restartItem);
         }
 
-        if (pod.issues && pod.issues.length > 0) {
-            const issuesDiv = createElement('div', 'resource-issues');
-            pod.issues.forEach(issue => {
-                const issueText = createElement('div', '', `⚠ ${issue}`);
-                issuesDiv.appendChild(issueText);
-            });
-            div.appendChild(issuesDiv);
-        }
+        div.appendChild(meta);
+    }
 
-        container.appendChild(div);
+    if (pod.issues && pod.issues.length > 0) {
+        const issuesDiv = createElement('div', 'resource-issues');
+        pod.issues.forEach(issue => {
+            const issueText = createElement('div', '', `⚠ ${issue}`);
+            issuesDiv.appendChild(issueText);
+        });
+        div.appendChild(issuesDiv);
+    }
+
+    return div;
+}
+
+const POD_HEALTH_LABELS = {
+    ready: 'ready',
+    not_ready: 'not ready',
+    pending: 'pending',
+    failed: 'failed'
+};
+
+// Group id -> { key, pods } for collapsed groups the player has opened
+const expandedGroups = new Map();
+
+/**
+ * Render a collapsed pod group: counts, health histogram and top issues
+ */
+function renderPodGroup(group) {
+    const div = createElement('div', 'resource-item pod-group');
+    div.setAttribute('role', 'listitem');
+
+    const header = createElement('div', 'resource-header');
+    const statusClass = group.health.ready === group.count ? 'healthy' :
+        (group.health.failed > 0 ? 'error' : 'warning');
+    const statusBadge = createElement('span', `status-badge ${statusClass}`,
+        `${group.health.ready}/${group.count}`);
+    const name = createElement('span', 'resource-name', `${group.kind} ${group.name}`);
+    const expanded = expandedGroups.get(group.id);
+    const toggle = createElement('button', 'group-toggle', expanded ? '▾' : '▸');
+    toggle.setAttribute('aria-expanded', expanded ? 'true' : 'false');
+    toggle.setAttribute('aria-label', `Show pods of ${group.kind} ${group.name}`);
+    toggle.addEventListener('click', () => togglePodGroup(group.id));
+
+    header.appendChild(statusBadge);
+    header.appendChild(name);
+    header.appendChild(toggle);
+    div.appendChild(header);
+
+    const meta = createElement('div', 'resource-meta');
+    Object.entries(POD_HEALTH_LABELS).forEach(([key, label]) => {
+        if (group.health[key] > 0) {
+            meta.appendChild(createElement('span', 'meta-item', `${group.health[key]} ${label}`));
+        }
     });
+    if (group.restarts > 0) {
+        meta.appendChild(createElement('span', 'meta-item', `🔄 ${group.restarts} restarts`));
+    }
+    div.appendChild(meta);
+
+    if (group.issues.length > 0) {
+        const issuesDiv = createElement('div', 'resource-issues');
+        group.issues.forEach(({ issue, pods }) => {
+            issuesDiv.appendChild(createElement('div', '', `⚠ ${issue} (${pods} pods)`));
+        });
+        div.appendChild(issuesDiv);
+    }
+
+    if (expanded) {
+        // Re-fetch the members only when the group's summary has changed
+        const key = JSON.stringify([group.health, group.restarts, group.issues]);
+        if (expanded.key !== key) {
+            expanded.key = key;
+            fetchPodGroup(group.id);
+        }
+        const members = createElement('div', 'pod-group-members');
+        expanded.pods.forEach(pod => members.appendChild(renderPodItem(pod)));
+        div.appendChild(members);
+    }
+
+    return div;
+}
+
+/**
+ * Open or close a collapsed pod group
+ */
+function togglePodGroup(id) {
+    if (expandedGroups.has(id)) {
+        expandedGroups.delete(id);
+    } else {
+        expandedGroups.set(id, { key: null, pods: [] });
+    }
+    renderCurrentPods();
+}
+
+/**
+ * Fetch every pod of one group from the server
+ */
+async function fetchPodGroup(id) {
+    try {
+        const response = await fetch(`/api/pods?group=${encodeURIComponent(id)}`);
+        const expanded = expandedGroups.get(id);
+        if (!expanded) return;
+        if (!response.ok) {
+            expandedGroups.delete(id);
+        } else {
+            expanded.pods = (await response.json()).pods;
+        }
+        renderCurrentPods();
+    } catch (error) {
+        console.error('Error fetching pod group:', error);
+    }
+}
+
+function renderCurrentPods() {
+    const cluster = (currentState && currentState.cluster) || {};
+    updatePodsList(cluster.pods || [], cluster.pod_groups || []);
 }
 
 /**
@@ -491,6 +957,17 @@ function detectIssues(cluster) {
         }
     });
 
+    // Check collapsed pod groups: one entry per distinct issue
+    (cluster.pod_groups || []).filter(g => g.collapsed).forEach(group => {
+        group.issues.forEach(({ issue, pods }) => {
+            issues.push({
+                severity: group.health.failed > 0 ? 'high' : 'medium',
+                title: `${group.kind} ${group.name} (${pods}/${group.count} pods)`,
+                description: issue
+            });
+        });
+    });
+
     // Check services
     (cluster.services || []).forEach(svc => {
         if (svc.issues && svc.issues.length > 0) {
@@ -517,6 +994,25 @@ function detectIssues(cluster) {
         }
     });
 
+    // Check the other kinds the server analyzes
+    const otherKinds = {
+        statefulsets: 'StatefulSet',
+        pvcs: 'PVC',
+        ingresses: 'Ingress',
+        networkpolicies: 'NetworkPolicy'
+    };
+    Object.entries(otherKinds).forEach(([key, label]) => {
+        (cluster[key] || []).forEach(item => {
+            (item.issues || []).forEach(issue => {
+                issues.push({
+                    severity: 'medium',
+                    title: `${label} ${item.name}`,
+                    description: issue
+                });
+            });
+        });
+    });
+
     return issues;
 }
 
@@ -548,6 +1044,9 @@ function updateDiagram(oldState = null) {
     const h2 = createElement('h2', null, currentDiagram.title || 'Architecture Diagram');
     titleElem.appendChild(h2);
 
+    // Point placeholder nodes at the real objects they stand for
+    bindDiagramResources(currentDiagram, (currentState.cluster || {}).topology);
+
     // Check if diagram structure has changed
     const diagramChanged = hasDiagramChanged(previousDiagram, currentDiagram);
 
@@ -561,6 +1060,70 @@ function updateDiagram(oldState = null) {
     }
 }
 
+// Diagram node type -> topology node kind
+const TOPOLOGY_KINDS = {
+    pod: 'Pod',
+    'pod-group': 'PodGroup',
+    deployment: 'Deployment',
+    replicaset: 'ReplicaSet',
+    statefulset: 'StatefulSet',
+    service: 'Service',
+    ingress: 'Ingress',
+    pvc: 'PersistentVolumeClaim'
+};
+
+/**
+ * Bind diagram nodes without a resource_name to objects from the live topology
+ *
+ * A node connected to an already-bound node prefers that object's neighbours
+ * in the topology (e.g. the ReplicaSet owned by the bound Deployment); other
+ * nodes take the first unused object of their kind.
+ */
+function bindDiagramResources(diagram, topology) {
+    if (!diagram || !topology) return;
+
+    const byKind = {};
+    const neighbours = {};
+    topology.nodes.forEach(n => (byKind[n.kind] = byKind[n.kind] || []).push(n));
+    topology.edges.forEach(e => {
+        (neighbours[e.from] = neighbours[e.from] || []).push(e.to);
+        (neighbours[e.to] = neighbours[e.to] || []).push(e.from);
+    });
+
+    const used = new Set();
+    const boundIds = {};
+    (diagram.nodes || []).forEach(node => {
+        node.bound_name = null;
+        const kind = TOPOLOGY_KINDS[node.type];
+        if (!kind) return;
+        if (node.resource_name) {
+            boundIds[node.id] = `${kind}/${node.resource_name}`;
+            used.add(boundIds[node.id]);
+        }
+    });
+
+    (diagram.nodes || []).forEach(node => {
+        const kind = TOPOLOGY_KINDS[node.type];
+        if (!kind || node.resource_name) return;
+
+        const linked = (diagram.connections || [])
+            .filter(c => c.to === node.id || c.from === node.id)
+            .map(c => boundIds[c.to === node.id ? c.from : c.to])
+            .concat(node.parent ? [boundIds[node.parent]] : [])
+            .filter(Boolean);
+        const preferred = new Set(linked.flatMap(id => neighbours[id] || []));
+        const candidates = byKind[kind] || [];
+        const match = candidates.find(n => preferred.has(n.id) && !used.has(n.id)) ||
+            candidates.find(n => !used.has(n.id));
+
+        if (match) {
+            used.add(match.id);
+            boundIds[node.id] = match.id;
+            node.bound_name = match.name;
+        }
+    });
+}
+
 /**
  * Check if diagram structure has changed
  */
@@ -1055,21 +1618,34 @@ function getNodeStatus(node) {
 
     const cluster = currentState.cluster;
 
+    const resourceName = node.resource_name || node.bound_name;
+
+    // A pod bound to a real object shows that pod's health
+    if (node.type === 'pod' && resourceName) {
+        const pod = (cluster.pods || []).find(p => p.name === resourceName);
+        if (pod) {
+            if (pod.status !== 'Running' || !pod.ready) return 'error';
+            return pod.issues && pod.issues.length > 0 ? 'warning' : 'healthy';
+        }
+    }
+
     // Check pods
     if (node.type === 'pod' || node.type === 'pod-group') {
         const pods = cluster.pods || [];
+        const groups = (cluster.pod_groups || []).filter(g => g.collapsed);
         const unhealthyPods = pods.filter(p =>
             p.status !== 'Running' || !p.ready || (p.issues && p.issues.length > 0)
         );
-        if (unhealthyPods.length > 0) return 'error';
-        if (pods.length === 0) return 'unknown';
+        const unhealthyGroups = groups.filter(g => g.health.ready < g.count || g.issues.length > 0);
+        if (unhealthyPods.length > 0 || unhealthyGroups.length > 0) return 'error';
+        if (pods.length === 0 && groups.length === 0) return 'unknown';
         return 'healthy';
     }
 
     // Check services
     if (node.type === 'service') {
         const services = cluster.services || [];
-        const svc = services.find(s => node.resource_name ? s.name === node.resource_name : true);
+        const svc = services.find(s => resourceName ? s.name === resourceName : true);
         if (svc && svc.issues && svc.issues.length > 0) return 'error';
         if (svc && svc.endpoints === 0) return 'warning';
         if (services.length === 0) return 'unknown';
@@ -1079,7 +1655,7 @@ function getNodeStatus(node) {
     // Check deployments
     if (node.type === 'deployment') {
         const deployments = cluster.deployments || [];
-        const deploy = deployments.find(d => node.resource_name ? d.name === node.resource_name : true);
+        const deploy = deployments.find(d => resourceName ? d.name === resourceName : true);
         if (deploy && deploy.ready_replicas < deploy.replicas) return 'warning';
         if (deploy && deploy.ready_replicas === 0) return 'error';
         if (deployments.length === 0) return 'unknown';
@@ -0,0 +1,152 @@
+"""
+Server-Sent Events support for the K8sQuest visualizer
+Turns successive /api/state payloads into sequence-numbered JSON-patch deltas
+"""
+
+import json
+import queue
+import threading
+
+# Undelivered messages a slow client may accumulate before it is dropped
+SUBSCRIBER_BACKLOG = 64
+
+
+def escape_pointer(token):
+    """Escape one JSON pointer token (RFC 6901)"""
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def json_diff(old, new, path=''):
+    """JSON-patch style ops (add/remove/replace) turning ``old`` into ``new``
+
+    Dicts are compared key by key and equal-length lists item by item;
+    anything else that differs is replaced wholesale.
+    """
+    if old == new:
+        return []
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f"{path}/{escape_pointer(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{escape_pointer(key)}"
+            if key not in old:
+                ops.append({'op': 'add', 'path': child, 'value': value})
+            else:
+                ops.extend(json_diff(old[key], value, child))
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        ops = []
+        for index, (a, b) in enumerate(zip(old, new)):
+            ops.extend(json_diff(a, b, f"{path}/{index}"))
+        return ops
+
+    return [{'op': 'replace', 'path': path, 'value': new}]
+
+
+def unescape_pointer(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def apply_patch(doc, ops):
+    """Apply json_diff ops to ``doc`` in place and return the result"""
+    for op in ops:
+        if op['path'] == '':
+            doc = op['value']
+            continue
+        tokens = [unescape_pointer(t) for t in op['path'].split('/')[1:]]
+        last = tokens.pop()
+        target = doc
+        for token in tokens:
+            target = target[int(token)] if isinstance(target, list) else target[token]
+        if isinstance(target, list):
+            last = int(last)
+        if op['op'] == 'remove':
+            del target[last]
+        else:
+            target[last] = op['value']
+    return doc
+
+
+def format_event(event, data, seq=None):
+    """Encode one SSE message"""
+    lines = []
+    if seq is not None:
+        lines.append(f"id: {seq}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+class StreamHub:
+    """Fans state changes out to every connected /api/stream client"""
+
+    def __init__(self):
+        self.seq = 0
+        self.state = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @property
+    def client_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def subscribe(self):
+        """Register a client; returns its queue and the full-snapshot message to send first"""
+        q = queue.Queue(maxsize=SUBSCRIBER_BACKLOG)
+        with self._lock:
+            self._subscribers.add(q)
+            first = None
+            if self.state is not None:
+                first = format_event('snapshot', {'seq': self.seq, 'state': self.state}, self.seq)
+        return q, first
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def publish(self, state, game_changed=False):
+        """Broadcast the delta from the previous state (and a game message if it changed)"""
+        with self._lock:
+            previous = self.state
+            self.seq += 1
+            self.state = state
+
+            if previous is None:
+                messages = [format_event('snapshot', {'seq': self.seq, 'state': state}, self.seq)]
+            else:
+                ops = json_diff(previous, state)
+                messages = [format_event('delta', {'seq': self.seq, 'base': self.seq - 1, 'ops': ops}, self.seq)]
+            if game_changed:
+                messages.append(format_event('game', {'seq': self.seq, 'game': state.get('game', {})}))
+
+            for q in list(self._subscribers):
+                try:
+                    for message in messages:
+                        q.put_nowait(message)
+                except queue.Full:
+                    # Too far behind: drop it, EventSource reconnects and gets a fresh snapshot
+                    self._subscribers.discard(q)
+                    self._close(q)
+
+    def close(self):
+        """Disconnect every client"""
+        with self._lock:
+            for q in self._subscribers:
+                self._close(q)
+            self._subscribers.clear()
+
+    def _close(self, q):
+        try:
+            q.put_nowait(None)
+        except queue.Full:
+            while True:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    break
+            q.put_nowait(None)
@@ -0,0 +1,194 @@
+"""
+Diagram registry for K8sQuest levels
+Compiles each level's optional diagram.yaml (and the built-in templates) once, with layout and ETag
+"""
+
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+
+import yaml
+
+try:
+    from visualizer.templates.diagrams import get_default_diagram, get_diagram_for_level
+except ImportError:
+    from templates.diagrams import get_default_diagram, get_diagram_for_level
+
+# The engine's level catalog says which levels ship a diagram and which world holds a level
+try:
+    from engine.catalog import load_catalog
+except ImportError:
+    try:
+        from catalog import load_catalog
+    except ImportError:
+        load_catalog = None
+
+WORLDS_DIR = Path(__file__).parent.parent.parent / 'worlds'
+
+# Layered layout for nodes without coordinates
+LAYOUT_CENTER_X = 300
+LAYOUT_TOP = 80
+LAYOUT_ROW_HEIGHT = 110
+LAYOUT_COLUMN_WIDTH = 120
+
+# Used to place a bare level number in a world when no catalog is available
+LEVELS_PER_WORLD = 10
+
+
+class DiagramError(ValueError):
+    """A diagram.yaml that can't be compiled"""
+
+
+class DiagramEntry:
+    """A compiled diagram with its serialized body and ETag"""
+
+    __slots__ = ('diagram', 'body', 'etag', 'source')
+
+    def __init__(self, diagram, source):
+        self.diagram = diagram
+        self.source = source
+        self.body = json.dumps(diagram, separators=(',', ':')).encode()
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:16]}"'
+
+
+def parse_number(value, prefix):
+    """1, '1', 'world-1-basics' or 'level-1-pods' -> 1; anything else -> None"""
+    if isinstance(value, int):
+        return value
+    if not value:
+        return None
+    match = re.match(rf'(?:{prefix}-)?(\d+)', str(value))
+    return int(match.group(1)) if match else None
+
+
+def layout(nodes, connections):
+    """Give nodes without x/y a position: one row per depth in the connection graph"""
+    if all('x' in node and 'y' in node for node in nodes):
+        return
+
+    children = {}
+    has_parent = set()
+    for connection in connections:
+        children.setdefault(connection['from'], []).append(connection['to'])
+        has_parent.add(connection['to'])
+    for node in nodes:
+        if node.get('parent'):
+            children.setdefault(node['parent'], []).append(node['id'])
+            has_parent.add(node['id'])
+
+    depth = {}
+    frontier = [node['id'] for node in nodes if node['id'] not in has_parent] or [nodes[0]['id']]
+    for node_id in frontier:
+        depth[node_id] = 0
+    while frontier:
+        following = []
+        for node_id in frontier:
+            for child in children.get(node_id, []):
+                if child not in depth:
+                    depth[child] = depth[node_id] + 1
+                    following.append(child)
+        frontier = following
+
+    rows = {}
+    for node in nodes:
+        rows.setdefault(depth.get(node['id'], 0), []).append(node)
+    for row, members in rows.items():
+        start = LAYOUT_CENTER_X - (len(members) - 1) * LAYOUT_COLUMN_WIDTH / 2
+        for i, node in enumerate(members):
+            node.setdefault('x', round(start + i * LAYOUT_COLUMN_WIDTH))
+            node.setdefault('y', LAYOUT_TOP + row * LAYOUT_ROW_HEIGHT)
+
+
+def compile_diagram(data, default_title='K8sQuest Cluster'):
+    """Validate a diagram definition and fill in defaults and layout"""
+    if not isinstance(data, dict):
+        raise DiagramError("diagram must be a mapping")
+
+    nodes = []
+    for node in data.get('nodes') or []:
+        if not isinstance(node, dict) or not node.get('id') or not node.get('type'):
+            raise DiagramError(f"every node needs an id and a type: {node!r}")
+        node = dict(node)
+        node.setdefault('label', node['type'].capitalize())
+        nodes.append(node)
+    if not nodes:
+        raise DiagramError("diagram has no nodes")
+
+    ids = {node['id'] for node in nodes}
+    connections = []
+    for connection in data.get('connections') or []:
+        if connection.get('from') not in ids or connection.get('to') not in ids:
+            raise DiagramError(f"connection refers to an unknown node: {connection!r}")
+        connections.append(dict(connection))
+
+    layout(nodes, connections)
+    return {
+        'title': data.get('title') or default_title,
+        'nodes': nodes,
+        'connections': connections,
+        'expected_resources': list(data.get('expected_resources') or []),
+        'check_patterns': list(data.get('check_patterns') or []),
+    }
+
+
+class DiagramRegistry:
+    """Compiled diagrams keyed by (world, level)
+
+    Levels that ship a ``diagram.yaml`` are compiled when the registry is
+    created; other levels use the built-in templates, compiled on first use.
+    Every entry is immutable and carries its serialized body and ETag.
+    """
+
+    def __init__(self, worlds_dir=WORLDS_DIR):
+        self.worlds_dir = Path(worlds_dir)
+        self.catalog = load_catalog(self.worlds_dir) if load_catalog else None
+        self.errors = {}
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._default = DiagramEntry(compile_diagram(get_default_diagram()), 'default')
+        self.load()
+
+    def load(self):
+        """Compile every worlds/<world>/<level>/diagram.yaml"""
+        entries = {}
+        errors = {}
+        if self.catalog is not None:
+            paths = [self.catalog.path(level) / 'diagram.yaml' for level in self.catalog.levels if level['diagram']]
+        else:
+            paths = sorted(self.worlds_dir.glob('*/*/diagram.yaml'))
+        for path in paths:
+            world = parse_number(path.parent.parent.name, 'world')
+            level = parse_number(path.parent.name, 'level')
+            if world is None or level is None:
+                continue
+            try:
+                data = yaml.safe_load(path.read_text())
+                entries[(world, level)] = DiagramEntry(
+                    compile_diagram(data, f'World {world} - Level {level}'), str(path)
+                )
+            except (OSError, yaml.YAMLError, DiagramError) as e:
+                errors[str(path)] = str(e)
+
+        with self._lock:
+            self._entries = entries
+            self.errors = errors
+
+    def get(self, world, level):
+        """Entry for a world and level given as numbers or directory names"""
+        level = parse_number(level, 'level')
+        world = parse_number(world, 'world')
+        if level is None:
+            return self._default
+        if world is None:
+            owner = self.catalog.world_of(level) if self.catalog is not None else None
+            world = owner['number'] if owner else (level - 1) // LEVELS_PER_WORLD + 1
+
+        key = (world, level)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = DiagramEntry(compile_diagram(get_diagram_for_level(world, level)), 'template')
+            with self._lock:
+                entry = self._entries.setdefault(key, entry)
+        return entry
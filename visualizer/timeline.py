@@ -0,0 +1,316 @@
+"""
+Cluster timeline recording for the K8sQuest visualizer
+Appends every published state to a per-level file as compressed deltas with periodic keyframes
+"""
+
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+
+try:
+    from visualizer.stream import apply_patch, json_diff
+except ImportError:
+    from stream import apply_patch, json_diff
+
+MAGIC = b'K8QTL01\n'
+
+# Record header: type (K = keyframe, D = delta), payload length, unix time
+RECORD_HEADER = struct.Struct('<cId')
+KEYFRAME = b'K'
+DELTA = b'D'
+
+# A full state is written every this many records, bounding the deltas replayed per seek
+KEYFRAME_EVERY = 60
+
+COMPRESSION_LEVEL = 6
+
+TIMELINE_SUFFIX = '.k8qtl'
+TIMELINE_ID = re.compile(r'^[A-Za-z0-9_.-]+\.k8qtl$')
+
+# Timelines kept open (and mapped) by a library at once
+MAX_OPEN_READERS = 8
+
+TIMELINES_ENABLED = os.environ.get('K8SQUEST_TIMELINES', 'on').lower() != 'off'
+
+# A recorder deletes its oldest timelines beyond this many files or bytes
+MAX_TIMELINES = 50
+MAX_TIMELINE_BYTES = 100 * 1024 * 1024
+
+
+class TimelineError(ValueError):
+    """Not a timeline file"""
+
+
+def recorded_state(response):
+    """What is recorded of a published payload: game and cluster, without timings or timestamp"""
+    cluster = response.get('cluster') or {}
+    return {
+        'game': response.get('game') or {},
+        'cluster': {k: v for k, v in cluster.items() if k != 'refresh'}
+    }
+
+
+class TimelineWriter:
+    """Appends states to a timeline file
+
+    Each record is one write of a header and a zlib-compressed JSON payload:
+    the full state for a keyframe, or json_diff ops against the previous
+    state for a delta. A record cut short by a crash is ignored by readers.
+    """
+
+    def __init__(self, path, keyframe_every=KEYFRAME_EVERY):
+        self.path = Path(path)
+        self.keyframe_every = keyframe_every
+        self.frames = 0
+        self._previous = None
+        self._since_keyframe = 0
+        self._file = open(self.path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+            self._file.flush()
+
+    def append(self, state, timestamp=None):
+        """Record a state; returns False when it equals the previous one"""
+        if self._previous is None or self._since_keyframe >= self.keyframe_every:
+            kind, payload = KEYFRAME, state
+            self._since_keyframe = 0
+        else:
+            payload = json_diff(self._previous, state)
+            if not payload:
+                return False
+            kind = DELTA
+
+        data = zlib.compress(json.dumps(payload, separators=(',', ':')).encode(), COMPRESSION_LEVEL)
+        header = RECORD_HEADER.pack(kind, len(data), timestamp if timestamp is not None else time.time())
+        self._file.write(header + data)
+        self._file.flush()
+
+        self._previous = state
+        self._since_keyframe += 1
+        self.frames += 1
+        return True
+
+    def close(self):
+        self._file.close()
+
+
+class TimelineReader:
+    """Random access to the frames of a timeline file through a read-only memory map
+
+    Opening scans only the record headers. ``frame(i)`` decodes the nearest
+    keyframe at or before ``i`` and applies the deltas after it, continuing
+    from the last decoded frame when scrubbing forward.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.times = []
+        self._offsets = []
+        self._keyframes = []
+        self._file = open(self.path, 'rb')
+        self._map = None
+        self._mapped_size = 0
+        self._scanned = len(MAGIC)
+        self._cached = None
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def refresh(self):
+        """Pick up records appended since the last call"""
+        size = os.fstat(self._file.fileno()).st_size
+        if size == self._mapped_size:
+            return
+        if size < len(MAGIC):
+            if size:
+                raise TimelineError(f"{self.path.name} is not a timeline")
+            return
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mapped_size = size
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise TimelineError(f"{self.path.name} is not a timeline")
+
+        offset = self._scanned
+        while offset + RECORD_HEADER.size <= size:
+            kind, length, timestamp = RECORD_HEADER.unpack_from(self._map, offset)
+            if offset + RECORD_HEADER.size + length > size:
+                break  # still being written, or cut short
+            if kind == KEYFRAME:
+                self._keyframes.append(len(self._offsets))
+            self._offsets.append(offset)
+            self.times.append(timestamp)
+            offset += RECORD_HEADER.size + length
+        self._scanned = offset
+
+    def _payload(self, index):
+        offset = self._offsets[index]
+        _, length, _ = RECORD_HEADER.unpack_from(self._map, offset)
+        start = offset + RECORD_HEADER.size
+        return json.loads(zlib.decompress(self._map[start:start + length]))
+
+    def frame(self, index):
+        """The state at frame ``index``
+
+        The returned state is reused for the next call; serialize or copy
+        it before reading another frame.
+        """
+        with self._lock:
+            if not 0 <= index < len(self._offsets):
+                raise IndexError(f"frame {index} out of range")
+            keyframe = self._keyframes[bisect.bisect_right(self._keyframes, index) - 1]
+
+            if self._cached is not None and keyframe <= self._cached[0] <= index:
+                position, state = self._cached
+            else:
+                position, state = keyframe, self._payload(keyframe)
+            for i in range(position + 1, index + 1):
+                state = apply_patch(state, self._payload(i))
+            self._cached = (index, state)
+            return state
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+
+def safe_name(value):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', str(value)) if value else 'none'
+
+
+class TimelineRecorder:
+    """Records published states into one timeline file per level
+
+    A new file is started whenever the game's world or level changes, and
+    the oldest files are then deleted until at most ``max_files`` files and
+    ``max_bytes`` bytes are kept. If the disk fails, recording stops and
+    ``error`` says why; the visualizer keeps running.
+    """
+
+    def __init__(self, directory, keyframe_every=KEYFRAME_EVERY, max_files=MAX_TIMELINES,
+                 max_bytes=MAX_TIMELINE_BYTES):
+        self.directory = Path(directory)
+        self.keyframe_every = keyframe_every
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.error = None
+        self._writer = None
+        self._level = None
+        self._lock = threading.Lock()
+
+    @property
+    def current(self):
+        """Id of the file being written, if any"""
+        return self._writer.path.name if self._writer else None
+
+    def record(self, response):
+        """Append a published /api/state payload"""
+        if self.error:
+            return
+        state = recorded_state(response)
+        level = (state['game'].get('current_world'), state['game'].get('current_level'))
+        with self._lock:
+            try:
+                if self._writer is None or level != self._level:
+                    self._rotate(level)
+                self._writer.append(state)
+            except OSError as e:
+                self.error = str(e)
+                self._close()
+
+    def _rotate(self, level):
+        self._close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        name = f"{stamp}-{safe_name(level[0])}-{safe_name(level[1])}{TIMELINE_SUFFIX}"
+        self._writer = TimelineWriter(self.directory / name, self.keyframe_every)
+        self._level = level
+        self._prune()
+
+    def _prune(self):
+        """Delete the oldest finished timelines beyond the file and byte limits"""
+        finished = [(path, path.stat().st_size)
+                    for path in sorted(self.directory.glob(f'*{TIMELINE_SUFFIX}'), reverse=True)
+                    if path != self._writer.path]
+        kept, total = 1, self._writer.path.stat().st_size
+        for path, size in finished:
+            if kept < self.max_files and total + size <= self.max_bytes:
+                kept, total = kept + 1, total + size
+            else:
+                path.unlink()
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+class TimelineLibrary:
+    """The recorded timelines of one directory, opened on demand"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self._readers = {}
+        self._lock = threading.Lock()
+
+    def reader(self, timeline_id):
+        """Reader for a timeline id (its file name), or None if there is no such timeline"""
+        if not TIMELINE_ID.match(timeline_id or ''):
+            return None
+        path = self.directory / timeline_id
+        with self._lock:
+            reader = self._readers.get(timeline_id)
+            if reader is None:
+                if not path.is_file():
+                    return None
+                reader = TimelineReader(path)
+                if len(self._readers) >= MAX_OPEN_READERS:
+                    oldest = next(iter(self._readers))
+                    self._readers.pop(oldest).close()
+                self._readers[timeline_id] = reader
+            reader.refresh()
+            return reader
+
+    def list(self):
+        """Every timeline, newest first, with its level, frame count and time span"""
+        timelines = []
+        for path in sorted(self.directory.glob(f'*{TIMELINE_SUFFIX}'), reverse=True):
+            try:
+                reader = self.reader(path.name)
+                if reader is None or not len(reader):
+                    continue
+                game = reader.frame(0).get('game', {})
+            except (OSError, ValueError):
+                continue
+            timelines.append({
+                'id': path.name,
+                'world': game.get('current_world'),
+                'level': game.get('current_level'),
+                'player': game.get('player_name'),
+                'frames': len(reader),
+                'started': reader.times[0],
+                'ended': reader.times[-1],
+                'bytes': path.stat().st_size,
+            })
+        return timelines
+
+    def close(self):
+        with self._lock:
+            for reader in self._readers.values():
+                reader.close()
+            self._readers.clear()
@@ -0,0 +1,189 @@
+"""
+Live topology graph for the K8sQuest visualizer
+Derives the namespace's object graph from ownerReferences, label selectors and volume claims
+"""
+
+# State key -> node kind, for every kind that appears in the graph
+GRAPH_KINDS = {
+    'deployments': 'Deployment',
+    'statefulsets': 'StatefulSet',
+    'replicasets': 'ReplicaSet',
+    'pods': 'Pod',
+    'services': 'Service',
+    'ingresses': 'Ingress',
+    'pvcs': 'PersistentVolumeClaim',
+}
+
+
+class LabelIndex:
+    """Inverted index of ``key=value`` labels to object names
+
+    A selector is answered by intersecting the name sets of its labels,
+    smallest first, instead of testing every object against it.
+    """
+
+    def __init__(self, objects):
+        self.names = []
+        self.labels = {}
+        self._postings = {}
+        for obj in objects:
+            name = obj['metadata']['name']
+            labels = obj['metadata'].get('labels') or {}
+            self.names.append(name)
+            self.labels[name] = labels
+            for label in labels.items():
+                self._postings.setdefault(label, set()).add(name)
+
+    def match(self, match_labels, match_expressions=()):
+        """Names whose labels satisfy matchLabels and matchExpressions"""
+        postings = sorted((self._postings.get(label, set()) for label in (match_labels or {}).items()), key=len)
+        if postings:
+            names = set(postings[0])
+            for found in postings[1:]:
+                names &= found
+                if not names:
+                    break
+        else:
+            names = set(self.names)
+
+        if match_expressions:
+            names = {name for name in names
+                     if all(matches_expression(self.labels[name], e) for e in match_expressions)}
+        return names
+
+
+def matches_expression(labels, expression):
+    """One matchExpressions entry (In, NotIn, Exists, DoesNotExist)"""
+    key = expression.get('key')
+    operator = expression.get('operator')
+    values = expression.get('values') or []
+    if operator == 'In':
+        return labels.get(key) in values
+    if operator == 'NotIn':
+        return labels.get(key) not in values
+    if operator == 'Exists':
+        return key in labels
+    if operator == 'DoesNotExist':
+        return key not in labels
+    return False
+
+
+def controller_of(obj):
+    """(kind, name) of an object's controller, if it has one"""
+    refs = obj['metadata'].get('ownerReferences') or []
+    for ref in refs:
+        if ref.get('controller'):
+            return ref['kind'], ref['name']
+    if refs:
+        return refs[0]['kind'], refs[0]['name']
+    return None
+
+
+def node_id(kind, name):
+    return f'{kind}/{name}'
+
+
+def build_topology(snapshot, pod_groups=None, pod_index=None):
+    """Nodes and edges of the namespace, in one pass per kind
+
+    Edges: owner -> owned (Deployment -> ReplicaSet -> Pod, StatefulSet -> Pod),
+    Service -> Pod by selector, Ingress -> Service by backend and
+    Pod -> PersistentVolumeClaim by volume. ``pod_groups`` maps pod names
+    to their group id, which is recorded on the pod's node.
+    """
+    pod_groups = pod_groups or {}
+    nodes = []
+    present = set()
+    for key, kind in GRAPH_KINDS.items():
+        for obj in snapshot.get(key):
+            name = obj['metadata']['name']
+            nid = node_id(kind, name)
+            present.add(nid)
+            node = {'id': nid, 'kind': kind, 'name': name}
+            if kind == 'Pod' and pod_groups.get(name):
+                node['group'] = pod_groups[name]
+            nodes.append(node)
+
+    edges = []
+
+    def connect(source, target, edge_type):
+        if source in present and target in present:
+            edges.append({'from': source, 'to': target, 'type': edge_type})
+
+    for key in ('replicasets', 'pods'):
+        kind = GRAPH_KINDS[key]
+        for obj in snapshot.get(key):
+            owner = controller_of(obj)
+            if owner:
+                connect(node_id(*owner), node_id(kind, obj['metadata']['name']), 'owns')
+
+    pod_index = pod_index or LabelIndex(snapshot.get('pods'))
+    for svc in snapshot.get('services'):
+        selector = (svc.get('spec') or {}).get('selector')
+        if selector:
+            source = node_id('Service', svc['metadata']['name'])
+            for name in sorted(pod_index.match(selector)):
+                connect(source, node_id('Pod', name), 'selects')
+
+    for ingress in snapshot.get('ingresses'):
+        source = node_id('Ingress', ingress['metadata']['name'])
+        for service in sorted(ingress_services(ingress)):
+            connect(source, node_id('Service', service), 'routes')
+
+    for pod in snapshot.get('pods'):
+        source = node_id('Pod', pod['metadata']['name'])
+        for volume in (pod.get('spec') or {}).get('volumes') or []:
+            claim = (volume.get('persistentVolumeClaim') or {}).get('claimName')
+            if claim:
+                connect(source, node_id('PersistentVolumeClaim', claim), 'mounts')
+
+    return {'nodes': nodes, 'edges': edges}
+
+
+def ingress_backends(ingress):
+    """Every backend of an ingress: the default backend, then each rule path's"""
+    spec = ingress.get('spec') or {}
+    backends = [spec['defaultBackend']] if spec.get('defaultBackend') else []
+    for rule in spec.get('rules') or []:
+        for path in (rule.get('http') or {}).get('paths') or []:
+            backends.append(path.get('backend') or {})
+    return backends
+
+
+def ingress_services(ingress):
+    """Names of the services an ingress routes to"""
+    return {backend['service']['name'] for backend in ingress_backends(ingress)
+            if (backend.get('service') or {}).get('name')}
+
+
+def collapse_topology(topology, groups):
+    """Replace the pods of collapsed groups with one node per group"""
+    members = {}
+    for group in groups:
+        if group.get('collapsed'):
+            members[group['id']] = node_id('PodGroup', group['id'])
+    if not members:
+        return topology
+
+    replaced = {}
+    nodes = []
+    for node in topology['nodes']:
+        group = node.get('group')
+        if node['kind'] == 'Pod' and group in members:
+            replaced[node['id']] = members[group]
+        else:
+            nodes.append(node)
+    for group in groups:
+        if group['id'] in members:
+            nodes.append({'id': members[group['id']], 'kind': 'PodGroup', 'name': group['id'],
+                          'count': group['count']})
+
+    edges = []
+    seen = set()
+    for edge in topology['edges']:
+        source = replaced.get(edge['from'], edge['from'])
+        target = replaced.get(edge['to'], edge['to'])
+        if (source, target, edge['type']) not in seen:
+            seen.add((source, target, edge['type']))
+            edges.append({'from': source, 'to': target, 'type': edge['type']})
+    return {'nodes': nodes, 'edges': edges}